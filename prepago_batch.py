@@ -0,0 +1,326 @@
+"""
+Modo cartera: simula miles de créditos hipotecarios en una sola pasada.
+
+Los créditos se agrupan por calendario de prepago (frecuencia en meses). Dentro de cada grupo
+los tramos entre prepagos se resuelven en forma cerrada sobre matrices de un crédito por fila
+y un mes por columna; los grupos se reparten en bloques sobre un pool de procesos.
+"""
+
+# Importaciones
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from prepago_profile import stage
+from prepago_core import calculate_monthly_rate, french_amortization, plan_prepayment
+from prepago_export import export_chunks, export_frame, partition_path
+
+LOAN_COLUMNS = ['principal', 'annual_rate', 'total_months', 'start_date', 'annual_limit', 'frequency_months']
+SCHEDULE_COLUMNS = ['Amortizacion parcial', 'INTERES parcial', 'Prepago', 'SALDO']
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_PLOT_LIMIT = 100
+
+# Funciones de Carga y Validación
+def load_loans(path):
+    """Leer la cartera desde CSV o Parquet y validar sus columnas."""
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        loans = pd.read_parquet(path)
+    else:
+        loans = pd.read_csv(path)
+    return validate_loans(loans)
+
+def validate_loans(loans):
+    """Validar y normalizar los parámetros de cada crédito de la cartera."""
+    missing = [column for column in LOAN_COLUMNS if column not in loans.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en la cartera: {', '.join(missing)}.")
+
+    loans = loans.reset_index(drop=True).copy()
+    for column in ['principal', 'annual_rate', 'annual_limit']:
+        loans[column] = loans[column].astype(float)
+    for column in ['total_months', 'frequency_months']:
+        loans[column] = loans[column].astype(int)
+    loans['start_date'] = pd.to_datetime(loans['start_date']).fillna(pd.to_datetime(datetime.now().date()))
+
+    if (loans['principal'] <= 0).any():
+        raise ValueError("El monto/capital debe ser mayor a 0 en todos los créditos.")
+    if (loans['annual_rate'] <= 0).any():
+        raise ValueError("La tasa debe ser mayor a 0 en todos los créditos.")
+    if (loans['total_months'] <= 0).any():
+        raise ValueError("El plazo debe ser mayor a 0 en todos los créditos.")
+    if (loans['annual_limit'] < 0).any():
+        raise ValueError("El límite anual no puede ser negativo.")
+    if (~loans['frequency_months'].between(1, 12)).any():
+        raise ValueError("La frecuencia de prepago debe estar entre 1 y 12 meses.")
+    return loans
+
+# Motor Vectorizado por Bloque
+def simulate_chunk(principal, annual_rate, total_months, annual_limit, frequency_months, first_month=None):
+    """
+    Simular un bloque de créditos que comparten calendario de prepago.
+
+    Replica `prepayment_plan` fila por fila: la cuota se recalcula al inicio de cada tramo y
+    cada tramo se evalúa en forma cerrada para todos los créditos a la vez. Los prepagos caen
+    en `first_month`, `first_month + frequency_months`, ... (por defecto desde `frequency_months`).
+    Devuelve las matrices del cronograma (miles de UF, sin redondear) y los meses pagados.
+    """
+    first_month = first_month or frequency_months
+    principal = np.asarray(principal, dtype=float) * 1000
+    total_months = np.asarray(total_months, dtype=int)
+    monthly_rate = calculate_monthly_rate(np.asarray(annual_rate, dtype=float))
+    prepayment_cap = np.minimum(plan_prepayment(np.asarray(annual_limit, dtype=float) * 1000, frequency_months), principal)
+
+    loans, horizon = principal.size, int(total_months.max())
+    schedules = {column: np.zeros((loans, horizon)) for column in SCHEDULE_COLUMNS}
+    months_paid = np.zeros(loans, dtype=int)
+    remaining = principal.copy()
+    rate = monthly_rate[:, None]
+
+    stops = list(range(first_month, horizon + 1, frequency_months))
+    if not stops or stops[-1] != horizon:
+        stops.append(horizon)
+
+    month = 0
+    for stop in stops:
+        alive = (remaining > 0) & (total_months > month)
+        if not alive.any():
+            break
+        length = stop - month
+        payment = np.where(alive, french_amortization(remaining, monthly_rate, np.maximum(total_months - month, 1)), 0)[:, None]
+
+        growth = np.ones((loans, length))
+        growth[:, 1:] = np.cumprod(np.broadcast_to(1 + rate, (loans, length - 1)), axis=1)
+        opening = remaining[:, None] * growth - payment * (growth - 1) / rate
+        interest = opening * rate
+        capital = np.minimum(payment - interest, opening)
+        prepayment = np.zeros((loans, length))
+        due = alive & ((stop - first_month) % frequency_months == 0) & (stop <= total_months)
+        prepayment[:, -1] = np.where(due, np.minimum(prepayment_cap, opening[:, -1] - capital[:, -1]), 0)
+        closing = opening - capital - prepayment
+
+        # Un mes está vigente si cae dentro del plazo y no hay un pago total en un mes anterior del tramo
+        paid_off = closing <= 0
+        active = (alive[:, None]
+                  & (month + np.arange(length) < total_months[:, None])
+                  & (np.cumsum(paid_off, axis=1) - paid_off == 0))
+        schedules['Amortizacion parcial'][:, month:stop] = np.where(active, capital, 0) / 1000
+        schedules['INTERES parcial'][:, month:stop] = np.where(active, interest, 0) / 1000
+        schedules['Prepago'][:, month:stop] = np.where(active, prepayment, 0) / 1000
+        schedules['SALDO'][:, month:stop] = np.where(active, np.maximum(closing, 0), 0) / 1000
+
+        months_paid += active.sum(axis=1)
+        remaining = np.where(active[:, -1], closing[:, -1], 0)
+        month = stop
+
+    return schedules, months_paid
+
+def chunk_metrics(principal, annual_rate, total_months, schedules, months_paid):
+    """Calcular las métricas de `prepayment_plan` para cada crédito a partir de sus matrices."""
+    principal = np.asarray(principal, dtype=float)
+    total_months = np.asarray(total_months, dtype=int)
+    monthly_rate = calculate_monthly_rate(np.asarray(annual_rate, dtype=float))
+
+    total_interest = schedules['INTERES parcial'].sum(axis=1)
+    total_amortization = np.minimum((schedules['Amortizacion parcial'] + schedules['Prepago']).sum(axis=1), principal)
+    last = (np.arange(principal.size), np.maximum(months_paid - 1, 0))
+    last_opening = sum(schedules[column][last] for column in ['Amortizacion parcial', 'Prepago', 'SALDO']) * 1000
+    original_payment = french_amortization(principal * 1000, monthly_rate, total_months)
+
+    return {
+        'months_paid': months_paid,
+        'months_saved': total_months - months_paid,
+        'interest_saved': np.round((original_payment * total_months - total_interest * 1000) / 1000, 4),
+        'new_monthly_payment': np.round(french_amortization(last_opening, monthly_rate, total_months - months_paid + 1) / 1000, 4),
+        'total_interest': np.round(total_interest, 4),
+        'total_amortization': np.round(total_amortization, 4),
+        'total_prepaid': np.round(schedules['Prepago'].sum(axis=1), 4)
+    }
+
+def evaluate_chunk(principal, annual_rate, total_months, annual_limit, frequency_months, keep_schedules=True, first_month=None):
+    """Simular un bloque y resumirlo; las matrices solo viajan de vuelta si se solicitan."""
+    schedules, months_paid = simulate_chunk(principal, annual_rate, total_months, annual_limit, frequency_months, first_month)
+    metrics = chunk_metrics(principal, annual_rate, total_months, schedules, months_paid)
+    return (schedules if keep_schedules else None), metrics
+
+def payoff_dates(start_date, months_paid):
+    """Fecha de la última cuota de cada crédito, con el mismo calendario que `payment_dates`."""
+    start = pd.DatetimeIndex(start_date)
+    first = start + pd.offsets.MonthBegin(0)
+    shift = (first != start).astype(int)
+    last_month = first.values.astype('datetime64[M]') + np.maximum(months_paid - 1 - shift, 0)
+    return last_month.astype('datetime64[D]') + np.timedelta64(9, 'D')
+
+# Orquestación de la Cartera
+def map_chunks(arguments, workers=None):
+    """Evaluar bloques en serie o en un pool de procesos según su cantidad y `workers`."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(arguments) <= 1:
+        return [evaluate_chunk(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate_chunk, *zip(*arguments)))
+
+def simulate_portfolio(loans, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, keep_schedules=True):
+    """
+    Simular toda la cartera y devolver matrices de cronograma y métricas por crédito.
+
+    Los créditos se agrupan por `frequency_months` y se dividen en bloques de `chunk_size`
+    filas; con más de un bloque y `workers` distinto de 1, los bloques se evalúan en un
+    pool de procesos. Las matrices (miles de UF) tienen un crédito por fila y un mes por
+    columna; con `keep_schedules=False` solo se devuelven las métricas.
+    """
+    loans = validate_loans(loans)
+    horizon = int(loans['total_months'].max())
+
+    chunks = []
+    for frequency, group in loans.groupby('frequency_months').indices.items():
+        for start in range(0, group.size, chunk_size):
+            chunks.append((int(frequency), group[start:start + chunk_size]))
+
+    columns = [loans[column].to_numpy() for column in ['principal', 'annual_rate', 'total_months', 'annual_limit']]
+    arguments = [tuple(values[rows] for values in columns) + (frequency, keep_schedules) for frequency, rows in chunks]
+    results = map_chunks(arguments, workers)
+
+    schedules = {column: np.zeros((len(loans), horizon)) for column in SCHEDULE_COLUMNS} if keep_schedules else None
+    metrics = {}
+    for (_, rows), (chunk_schedules, chunk_result) in zip(chunks, results):
+        if keep_schedules:
+            width = chunk_schedules['SALDO'].shape[1]
+            for column in SCHEDULE_COLUMNS:
+                schedules[column][rows, :width] = chunk_schedules[column]
+        for name, values in chunk_result.items():
+            metrics.setdefault(name, np.zeros(len(loans), dtype=values.dtype))[rows] = values
+
+    metrics['payoff_date'] = payoff_dates(loans['start_date'], metrics['months_paid'])
+    return schedules, metrics
+
+def long_schedules(loan_ids, start_date, schedules, months_paid):
+    """Matrices de un bloque en formato largo: una fila por crédito y cuota pagada (miles de UF, 4 decimales)."""
+    active = np.arange(schedules['SALDO'].shape[1]) < months_paid[:, None]
+    loan_row, month = np.nonzero(active)
+    return pd.DataFrame({
+        'loan_id': np.asarray(loan_ids)[loan_row],
+        'NRO de cuota': month + 1,
+        'FECHA A PAGAR': payoff_dates(np.asarray(start_date)[loan_row], month + 1),
+        **{column: np.round(schedules[column][active], 4) for column in SCHEDULE_COLUMNS}
+    })
+
+def portfolio_chunks(loans, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generar (frecuencia, filas, matrices, meses pagados) bloque a bloque, en serie.
+
+    Cada bloque se simula recién al pedirlo y se descarta al avanzar, de modo que la memoria
+    depende de `chunk_size` y no del tamaño de la cartera. Los bloques de una misma frecuencia
+    salen consecutivos; `filas` son las posiciones de los créditos en la cartera validada.
+    """
+    loans = validate_loans(loans)
+    columns = [loans[column].to_numpy() for column in ['principal', 'annual_rate', 'total_months', 'annual_limit']]
+    for frequency, group in loans.groupby('frequency_months').indices.items():
+        for start in range(0, group.size, chunk_size):
+            rows = group[start:start + chunk_size]
+            schedules, months_paid = simulate_chunk(*(values[rows] for values in columns), int(frequency))
+            yield int(frequency), rows, schedules, months_paid
+
+def portfolio_schedule_chunks(loans, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generar (frecuencia, cronogramas del bloque en formato largo).
+
+    `loan_id` sale de la columna `loan_id` de la cartera si existe y, si no, es la fila del
+    crédito, igual que en el almacén (`prepago_store`) y en los gráficos de la cartera.
+    """
+    loans = validate_loans(loans)
+    loan_ids = loans['loan_id'].to_numpy() if 'loan_id' in loans.columns else np.arange(len(loans))
+    start_date = loans['start_date'].to_numpy()
+    for frequency, rows, schedules, months_paid in portfolio_chunks(loans, chunk_size):
+        yield frequency, long_schedules(loan_ids[rows], start_date[rows], schedules, months_paid)
+
+def export_portfolio_schedules(loans, output_path, chunk_size=DEFAULT_CHUNK_SIZE, partition=False, uf_table=None):
+    """
+    Exportar los cronogramas de toda la cartera sin mantenerlos en memoria.
+
+    Sin `partition`, todos los bloques van a `output_path`; con `partition`, cada grupo de
+    frecuencia se escribe en su propio archivo (`cronogramas_f12.csv`, ...). El formato sale de
+    la extensión (.csv, .xlsx, .parquet, .arrow). Con `uf_table` (ver `prepago_uf`) cada bloque
+    lleva además el valor UF y los montos en pesos. Devuelve las rutas escritas y el total de filas.
+    """
+    chunks = portfolio_schedule_chunks(loans, chunk_size)
+    if uf_table is not None:
+        from prepago_uf import add_clp_columns
+        chunks = ((frequency, add_clp_columns(frame, uf_table)) for frequency, frame in chunks)
+    if not partition:
+        return [output_path], export_chunks((frame for _, frame in chunks), output_path)
+    paths, rows = [], 0
+    for frequency, group in itertools.groupby(chunks, key=lambda item: item[0]):
+        paths.append(partition_path(output_path, f'f{frequency}'))
+        rows += export_chunks((frame for _, frame in group), paths[-1])
+    return paths, rows
+
+def export_portfolio_plots(loans, output_dir, limit=DEFAULT_PLOT_LIMIT, image_format='png',
+                           chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Graficar el saldo de los primeros `limit` créditos: uno por archivo y todos en una figura.
+
+    Solo se simulan los créditos graficados, y cada serie se reduce para dibujarse antes de
+    enviarse al pool de procesos de `render_figures`. Los archivos son 'loan_<id>.<formato>' y
+    'portfolio_balances.<formato>' en `output_dir`. Devuelve las rutas escritas.
+    """
+    from prepago_plots import downsample, image_path, render_figures
+
+    loans = validate_loans(loans).iloc[:limit]
+    loan_ids = loans['loan_id'].to_numpy() if 'loan_id' in loans.columns else np.arange(len(loans))
+    series = [None] * len(loans)
+    for _, rows, schedules, months_paid in portfolio_chunks(loans, chunk_size):
+        for row, balance, months in zip(rows, schedules['SALDO'], months_paid):
+            series[row] = downsample(np.arange(1, months + 1), balance[:months])
+
+    jobs = [('scenarios', ({loan_id: values}, f'Evolución del Saldo del Crédito {loan_id}'),
+             image_path(f'loan_{loan_id}', output_dir, image_format))
+            for loan_id, values in zip(loan_ids, series)]
+    jobs.append(('scenarios', (dict(zip(loan_ids, series)), f'Evolución del Saldo de {len(series)} Créditos'),
+                 image_path('portfolio_balances', output_dir, image_format)))
+    return render_figures(jobs, workers)
+
+def run_batch(input_path, output_path=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, schedules_path=None,
+              partition=False, store_path=None, plots_dir=None, plot_limit=DEFAULT_PLOT_LIMIT, plot_format='png',
+              uf_table=None):
+    """
+    Simular una cartera desde archivo y exportar las métricas por crédito.
+
+    Con `schedules_path` también se exportan los cronogramas por bloques (ver
+    `export_portfolio_schedules`, con montos en pesos si se entrega `uf_table`); devuelve además
+    las rutas escritas. Con `store_path` los cronogramas se guardan en un almacén en memoria
+    mapeada (ver `prepago_store`), y con `plots_dir` se grafican los primeros `plot_limit`
+    créditos (ver `export_portfolio_plots`).
+    """
+    with stage('batch'):
+        with stage('load_loans') as record:
+            loans = load_loans(input_path)
+            record['rows'] = len(loans)
+        with stage('simulate_portfolio') as record:
+            _, metrics = simulate_portfolio(loans, chunk_size=chunk_size, workers=workers, keep_schedules=False)
+            result = loans.assign(**metrics)
+            record['rows'] = len(result)
+
+        output_path = output_path or 'mortgage_portfolio.csv'
+        with stage('export') as record:
+            record['rows'] = export_frame(result, output_path)
+
+        schedule_paths = []
+        if schedules_path:
+            with stage('export_schedules') as record:
+                schedule_paths, record['rows'] = export_portfolio_schedules(loans, schedules_path, chunk_size, partition,
+                                                                                uf_table)
+        if store_path:
+            from prepago_store import write_portfolio_store
+            with stage('store') as record:
+                record['rows'] = len(write_portfolio_store(loans, store_path, chunk_size))
+                schedule_paths.append(store_path)
+        if plots_dir:
+            with stage('plots') as record:
+                plot_paths = export_portfolio_plots(loans, plots_dir, plot_limit, plot_format, chunk_size, workers)
+                record['rows'] = len(plot_paths)
+                schedule_paths.append(plots_dir)
+    return result, output_path, schedule_paths
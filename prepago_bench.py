@@ -0,0 +1,225 @@
+"""
+Suite de benchmarks del motor, con paridad numérica contra cronogramas de referencia (golden).
+
+Mide `french_amortization`, `generate_schedule`, `prepayment_plan`, el modo cartera, la
+exportación a CSV/XLSX, la conversión a pesos con la serie UF y los gráficos `plot_*` (incluido
+uno de 500 escenarios) sobre plazos de 120 a 480 meses y calendarios de prepago densos (mensuales)
+y dispersos (cada 24 meses o anuales). Los tiempos se comparan con una línea base guardada en
+`benchmarks/baseline.json`, y `SALDO` y `Acumulado de Interes` con los cronogramas de
+`benchmarks/golden.json`, de modo que una optimización no cambie resultados sin aviso.
+"""
+
+# Importaciones
+import json
+import os
+import platform
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_engine import generate_schedule, prepayment_plan
+from prepago_export import export_frame
+from prepago_plots import plot_comparison, plot_scenarios, plot_simulation, plot_summary
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+GOLDEN_PATH = os.path.join(BENCH_DIR, 'golden.json')
+DEFAULT_THRESHOLD = 0.30
+GOLDEN_COLUMNS = ['SALDO', 'Acumulado de Interes']
+GOLDEN_TOLERANCE = 1e-4  # Los cronogramas se publican redondeados a 4 decimales
+
+# Escenario de referencia (montos en UF)
+PRINCIPAL = 3000
+ANNUAL_RATE = 5.4
+ANNUAL_LIMIT = 100
+START_DATE = pd.Timestamp('2025-01-01')
+TERMS = [120, 240, 360, 480]
+CALENDARS = ['none', 'sparse', 'dense']
+PLAN_FREQUENCIES = {'sparse': 12, 'dense': 1}
+BATCH_SIZES = [100, 1000, 10000]
+QUICK_TERMS = [360]
+QUICK_BATCH_SIZES = [1000]
+
+# Casos de Prueba
+def prepayment_calendar(kind, total_months):
+    """Calendario de `generate_schedule` (escala interna): sin prepagos, cada 24 meses o mensual."""
+    if kind == 'sparse':
+        return {month: 100 * 1000 for month in range(24, total_months + 1, 24)}
+    if kind == 'dense':
+        return {month: 5 * 1000 for month in range(1, total_months + 1)}
+    return None
+
+def golden_cases(terms=TERMS):
+    """Casos de paridad: `generate_schedule` por calendario y `prepayment_plan` por frecuencia."""
+    cases = []
+    for months in terms:
+        for kind in CALENDARS:
+            cases.append({'name': f'generate_schedule[{months},{kind}]', 'function': 'generate_schedule',
+                          'total_months': months, 'calendar': kind})
+        for kind, frequency in PLAN_FREQUENCIES.items():
+            cases.append({'name': f'prepayment_plan[{months},{kind}]', 'function': 'prepayment_plan',
+                          'total_months': months, 'frequency_months': frequency})
+    return cases
+
+def run_case(case):
+    """Cronograma del caso con la fecha de inicio fija de los golden."""
+    if case['function'] == 'generate_schedule':
+        return generate_schedule(PRINCIPAL * 1000, ANNUAL_RATE, case['total_months'],
+                                 prepayment_calendar(case['calendar'], case['total_months']), START_DATE)[0]
+    return prepayment_plan(PRINCIPAL, ANNUAL_RATE, case['total_months'], ANNUAL_LIMIT, case['frequency_months'],
+                           START_DATE)[0]
+
+def sample_portfolio(size, seed=0):
+    """Cartera sintética con plazos de 120 a 480 meses y frecuencias de 1 a 12 meses."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'principal': rng.uniform(1000, 8000, size).round(2),
+        'annual_rate': rng.uniform(3.0, 7.0, size).round(2),
+        'total_months': rng.choice(TERMS, size),
+        'start_date': START_DATE,
+        'annual_limit': rng.uniform(0, 200, size).round(2),
+        'frequency_months': rng.choice([1, 3, 6, 12], size)
+    })
+
+def benchmark_cases(quick=False):
+    """Lista de (nombre, función sin argumentos) a cronometrar."""
+    from prepago_batch import simulate_portfolio
+    from prepago_sensitivity import sensitivity_grid
+    from prepago_uf import add_clp_columns, uf_table
+
+    terms = QUICK_TERMS if quick else TERMS
+    batch_sizes = QUICK_BATCH_SIZES if quick else BATCH_SIZES
+    monthly_rate = calculate_monthly_rate(ANNUAL_RATE)
+    cases = [('french_amortization[scalar]', lambda: french_amortization(PRINCIPAL * 1000, monthly_rate, 360))]
+    for size in batch_sizes:
+        principals = np.full(size, PRINCIPAL * 1000.0)
+        cases.append((f'french_amortization[vector={size}]',
+                      lambda principals=principals: french_amortization(principals, monthly_rate, 360)))
+
+    for case in golden_cases(terms):
+        cases.append((case['name'], lambda case=case: run_case(case)))
+
+    for size in batch_sizes:
+        loans = sample_portfolio(size)
+        cases.append((f'simulate_portfolio[{size}]',
+                      lambda loans=loans: simulate_portfolio(loans, workers=1, keep_schedules=False)))
+
+    # Grilla de sensibilidad de 50 tasas × 40 plazos × 20 límites, con prepago anual y mensual
+    rates, grid_terms, limits = np.linspace(2, 8, 50), np.linspace(120, 480, 40), np.linspace(0, 400, 20)
+    for kind, frequency in PLAN_FREQUENCIES.items():
+        cases.append((f'sensitivity_grid[50x40x20,{kind}]',
+                      lambda frequency=frequency: sensitivity_grid(PRINCIPAL, rates, grid_terms, limits, frequency)))
+
+    # Exportación y gráficos sobre el plazo más largo, con y sin prepago; también con --quick, para
+    # que esos casos tengan siempre una entrada en la línea base
+    months = TERMS[-1]
+    df_no_prepayment = run_case({'function': 'generate_schedule', 'total_months': months, 'calendar': 'none'})
+    df_prepayment = run_case({'function': 'prepayment_plan', 'total_months': months, 'frequency_months': 12})
+    # Serie UF diaria hasta 2030 (después se proyecta) para la conversión a pesos
+    days = pd.date_range('2020-01-01', '2030-12-31', freq='D')
+    uf = uf_table(days, 28000 * 1.03 ** (np.arange(days.size) / 365))
+    scenarios = {scenario: (df_no_prepayment['NRO de cuota'], df_no_prepayment['SALDO'] * (1 - scenario / 1000))
+                 for scenario in range(500)}
+    cases += [
+        (f'export_csv[{months}]', lambda: export_frame(df_no_prepayment, 'mortgage_summary.csv')),
+        (f'export_xlsx[{months}]', lambda: export_frame(df_no_prepayment, 'mortgage_summary.xlsx')),
+        (f'clp_columns[{months}]', lambda: add_clp_columns(df_prepayment, uf)),
+        (f'plot_summary[{months}]', lambda: plot_summary(df_no_prepayment)),
+        (f'plot_simulation[{months}]', lambda: plot_simulation(df_prepayment)),
+        (f'plot_comparison[{months}]', lambda: plot_comparison(df_no_prepayment, df_prepayment)),
+        (f'plot_scenarios[500x{months}]', lambda: plot_scenarios(scenarios))
+    ]
+    return cases
+
+# Medición de Tiempos
+def time_call(function, repeat=5):
+    """Mejor tiempo por llamada (segundos) entre `repeat` rondas de `timeit`."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def run_benchmarks(quick=False, pattern=None, repeat=5):
+    """
+    Cronometrar los casos cuyo nombre contiene `pattern`.
+
+    Los archivos exportados y los PNG se escriben en un directorio temporal. Si falta `openpyxl`,
+    el caso de exportación XLSX se omite con una advertencia.
+    """
+    timings = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for name, function in benchmark_cases(quick):
+                if pattern and pattern not in name:
+                    continue
+                try:
+                    timings[name] = time_call(function, repeat)
+                except ImportError:
+                    print(f"Advertencia: se omite '{name}' porque falta un módulo opcional (por ejemplo 'openpyxl').")
+        finally:
+            os.chdir(cwd)
+    return timings
+
+# Línea Base y Regresiones
+def environment_info():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'machine': platform.machine(), 'processor': platform.processor() or platform.system()}
+
+def save_baseline(timings, path=BASELINE_PATH):
+    """Guardar los tiempos actuales como nueva línea base."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment_info(), 'timings': timings}, file, indent=2)
+    return path
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)['timings']
+
+def compare_timings(timings, baseline, threshold=DEFAULT_THRESHOLD):
+    """Tabla de tiempos actuales vs. línea base; `regression` marca aumentos mayores a `threshold`."""
+    rows = []
+    for name, seconds in timings.items():
+        reference = baseline.get(name) if baseline else None
+        ratio = seconds / reference if reference else np.nan
+        rows.append({'benchmark': name, 'baseline_ms': reference * 1000 if reference else np.nan,
+                     'current_ms': seconds * 1000, 'ratio': ratio,
+                     'regression': bool(reference) and ratio > 1 + threshold})
+    return pd.DataFrame(rows, columns=['benchmark', 'baseline_ms', 'current_ms', 'ratio', 'regression'])
+
+# Paridad con Cronogramas de Referencia
+def capture_golden(terms=TERMS):
+    """Columnas de paridad de cada caso, con el motor actual."""
+    return [{**case, 'rows': len(df), **{column: df[column].tolist() for column in GOLDEN_COLUMNS}}
+            for case in golden_cases(terms) for df in [run_case(case)]]
+
+def save_golden(path=GOLDEN_PATH):
+    """Regenerar los golden; solo debe hacerse cuando un cambio de resultados es intencional."""
+    cases = capture_golden()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"cases": [\n' + ',\n'.join(json.dumps(case) for case in cases) + '\n]}\n')
+    return path
+
+def check_golden(path=GOLDEN_PATH, tolerance=GOLDEN_TOLERANCE):
+    """Comparar el motor actual con los golden y devolver la lista de diferencias encontradas."""
+    with open(path, encoding='utf-8') as file:
+        golden = json.load(file)['cases']
+    failures = []
+    for case in golden:
+        df = run_case(case)
+        if len(df) != case['rows']:
+            failures.append(f"{case['name']}: {len(df)} filas en vez de {case['rows']}")
+            continue
+        for column in GOLDEN_COLUMNS:
+            difference = np.abs(df[column].to_numpy() - np.asarray(case[column]))
+            if difference.max(initial=0) > tolerance:
+                month = int(df['NRO de cuota'].iloc[int(difference.argmax())])
+                failures.append(f"{case['name']}: '{column}' difiere en {difference.max():.6f} (cuota {month})")
+    return failures
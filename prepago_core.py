@@ -0,0 +1,43 @@
+"""
+Núcleo numérico del método francés, sin dependencias externas.
+
+Importarlo no carga NumPy, pandas ni matplotlib, de modo que cotizar una cuota en una invocación
+corta solo paga el arranque del intérprete. Las funciones aceptan escalares o arreglos de NumPy.
+
+Las funciones de salto (`remaining_balance`, `cumulative_principal`, `cumulative_interest`) dan
+el estado del crédito sin prepagos tras k cuotas en O(1), sin recorrer los meses anteriores.
+`plan_prepayment` es la regla del monto por prepago que comparten todos los modos.
+"""
+
+# Funciones de Cálculo
+def calculate_monthly_rate(annual_rate):
+    """Convertir tasa nominal anual a tasa efectiva mensual."""
+    return (1 + annual_rate / 100) ** (1 / 12) - 1
+
+def french_amortization(principal, monthly_rate, total_months):
+    """Calcular cuota mensual usando el método francés."""
+    return principal * (monthly_rate * (1 + monthly_rate) ** total_months) / ((1 + monthly_rate) ** total_months - 1)
+
+def plan_prepayment(annual_limit, frequency_months):
+    """
+    Monto de cada prepago de un plan con límite anual y frecuencia: límite × frecuencia / 12.
+
+    Si la frecuencia divide a 12 equivale a annual_limit / (12 // frecuencia); si no, el monto se
+    prorratea, de modo que lo prepagado en un año nunca supera el límite anual.
+    """
+    return annual_limit / (12 / frequency_months)
+
+# Funciones de Salto (estado tras k cuotas, sin prepagos)
+def remaining_balance(principal, monthly_rate, total_months, paid_months):
+    """Saldo tras `paid_months` cuotas (0 a `total_months`): P·((1+r)^N - (1+r)^k) / ((1+r)^N - 1)."""
+    growth = (1 + monthly_rate) ** total_months
+    return principal * (growth - (1 + monthly_rate) ** paid_months) / (growth - 1)
+
+def cumulative_principal(principal, monthly_rate, total_months, paid_months):
+    """Capital amortizado en las primeras `paid_months` cuotas."""
+    return principal - remaining_balance(principal, monthly_rate, total_months, paid_months)
+
+def cumulative_interest(principal, monthly_rate, total_months, paid_months):
+    """Intereses pagados en las primeras `paid_months` cuotas: k·C menos el capital amortizado."""
+    return (paid_months * french_amortization(principal, monthly_rate, total_months)
+            - cumulative_principal(principal, monthly_rate, total_months, paid_months))
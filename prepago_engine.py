@@ -0,0 +1,349 @@
+"""
+Motor de cronogramas: tramos en forma cerrada sobre NumPy y salida en DataFrames de pandas.
+
+Contiene `generate_schedule`, `prepayment_plan`, sus piezas vectorizadas (reutilizadas por el
+modo cartera, el optimizador y los escenarios "qué pasa si"), el resultado compacto
+`ScheduleResult` y la caché LRU de escenarios.
+"""
+
+# Importaciones
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from prepago_core import calculate_monthly_rate, french_amortization, plan_prepayment
+from prepago_profile import stage
+
+# Motor vectorizado de cronogramas
+def payment_dates(start_date, months):
+    """Fechas de pago (día 10) de los meses 1..months en una sola llamada vectorizada.
+
+    Equivale a ``start_date + MonthBegin(m) + Day(9)`` para m = 0..months-1: si la fecha
+    de inicio no cae en día 1, los dos primeros meses comparten la misma fecha.
+    """
+    first = start_date + pd.offsets.MonthBegin(0)
+    shift = 0 if first == start_date else 1
+    month_starts = np.datetime64(first.normalize().to_datetime64(), 'M') + np.maximum(np.arange(months) - shift, 0)
+    dates = month_starts.astype(f'datetime64[{first.unit}]') + np.timedelta64(9, 'D')
+    return pd.DatetimeIndex(dates + (first - first.normalize()).to_timedelta64())
+
+def segment_balances(balance, monthly_rate, payment, months):
+    """Saldos de apertura de un tramo con cuota fija, en forma cerrada.
+
+    b_j = B·(1+r)^j - C·((1+r)^j - 1)/r, con los factores (1+r)^j obtenidos por producto acumulado.
+    """
+    growth = np.ones(months)
+    growth[1:] = np.cumprod(np.full(months - 1, 1 + monthly_rate))
+    return balance * growth - payment * (growth - 1) / monthly_rate
+
+def prepayment_segments(prepayments, total_months):
+    """Ordenar los meses con prepago positivo dentro del plazo."""
+    months = sorted(int(period) for period, amount in prepayments.items()
+                    if amount > 0 and 1 <= int(period) <= total_months) if prepayments else []
+    return months + [total_months] if not months or months[-1] != total_months else months
+
+# Resultado Compacto del Cronograma
+RESULT_ARRAYS = ['interest', 'capital', 'total_payment', 'prepayment', 'closing', 'total_interest', 'total_principal']
+
+# Columnas mensuales del DataFrame y el arreglo interno que las respalda
+COLUMN_ARRAYS = {
+    'Amortizacion parcial': 'capital',
+    'Acumulado Amortizacion': 'total_principal',
+    'INTERES parcial': 'interest',
+    'Acumulado de Interes': 'total_interest',
+    'TOTAL CUOTA mensual': 'total_payment',
+    'Prepago': 'prepayment',
+    'SALDO': 'closing'
+}
+
+class ScheduleResult:
+    """
+    Cronograma como estructura de arreglos: un float64 contiguo por magnitud, un valor por mes,
+    en escala interna y a precisión completa.
+
+    `result['SALDO']` (y cada columna del DataFrame) devuelve el arreglo mensual almacenado, sin
+    copiarlo ni redondearlo. La escala a miles de UF con 4 decimales se aplica solo en `display`,
+    `to_frame` y `metrics`. `layout` define el formato de salida: 'schedule' (filas de
+    `generate_schedule`, dos por mes con prepago) o 'prepayment_plan' (una fila por mes).
+    """
+
+    __slots__ = ('layout', 'principal', 'monthly_rate', 'total_months', 'monthly_payment', 'start_date',
+                 'installment', *RESULT_ARRAYS)
+
+    def __init__(self, layout, principal, monthly_rate, total_months, monthly_payment, start_date, arrays):
+        self.layout = layout
+        self.principal = principal
+        self.monthly_rate = monthly_rate
+        self.total_months = total_months
+        self.monthly_payment = monthly_payment
+        self.start_date = start_date
+        for name in RESULT_ARRAYS:
+            setattr(self, name, np.ascontiguousarray(arrays[name], dtype=np.float64))
+        self.installment = np.arange(1, self.interest.size + 1, dtype=np.int32)
+
+    def __len__(self):
+        return self.installment.size
+
+    def __repr__(self):
+        return f"ScheduleResult(layout='{self.layout}', months={len(self)}, total_months={self.total_months})"
+
+    def __getitem__(self, column):
+        if column == 'NRO de cuota':
+            return self.installment
+        if column not in COLUMN_ARRAYS:
+            raise KeyError(f"Columna desconocida: '{column}'.")
+        return getattr(self, COLUMN_ARRAYS[column])
+
+    def display(self, column):
+        """Columna mensual en miles de UF redondeada a 4 decimales (calculada al pedirla)."""
+        values = self[column]
+        return values if column == 'NRO de cuota' else np.round(values / 1000, 4)
+
+    def arrays(self):
+        """Arreglos internos con las claves de `schedule_arrays` (sin copiarlos)."""
+        return {'months': len(self), 'monthly_payment': self.monthly_payment,
+                **{name: getattr(self, name) for name in RESULT_ARRAYS}}
+
+    def to_frame(self):
+        """DataFrame en miles de UF, idéntico al que devuelven `generate_schedule` y `prepayment_plan`."""
+        if self.layout == 'schedule':
+            return schedule_frame(self.arrays(), self.start_date)
+        return pd.DataFrame({
+            'NRO de cuota': np.arange(1, len(self) + 1),
+            'FECHA A PAGAR': payment_dates(self.start_date, len(self)),
+            **{column: self.display(column) for column in COLUMN_ARRAYS}
+        })
+
+    def metrics(self):
+        """Métricas del cronograma, con las claves de la función que lo generó."""
+        metrics = schedule_metrics(self.arrays(), self.principal, self.monthly_rate, self.total_months)
+        if self.layout == 'prepayment_plan':
+            metrics['total_amortization'] = metrics.pop('total_principal')
+        return metrics
+
+# Funciones de Generación de Cronograma
+def schedule_arrays(principal, monthly_rate, total_months, prepayments=None, checkpoint=None):
+    """
+    Resolver el cronograma de `generate_schedule` como arreglos, desde el inicio o desde un punto de control.
+
+    `checkpoint` describe el estado tras `month` cuotas: saldo, cuota vigente y acumulados de interés
+    y amortización. Cada tramo entre prepagos se resuelve en forma cerrada (decaimiento geométrico
+    del saldo) en lugar de iterar mes a mes.
+    """
+    checkpoint = checkpoint or {'month': 0, 'balance': principal, 'total_interest': 0.0, 'total_principal': 0.0,
+                                'monthly_payment': french_amortization(principal, monthly_rate, total_months)}
+    prepayments = prepayments or {}
+    month = checkpoint['month']
+    balance = checkpoint['balance']
+    monthly_payment = checkpoint['monthly_payment']
+    interests, capitals, payments, scheduled, prepaid, closings = [], [], [], [], [], []
+
+    for stop in prepayment_segments(prepayments, total_months):
+        if stop <= month:
+            continue
+        opening = segment_balances(balance, monthly_rate, monthly_payment, stop - month)
+        interest = opening * monthly_rate
+        capital = monthly_payment - interest
+        closing = opening - capital
+        prepayment = np.zeros(stop - month)
+        prepayment[-1] = prepayments.get(stop, 0)
+        closing[-1] -= prepayment[-1]
+        total_payment = np.full(stop - month, monthly_payment)
+        scheduled.append(total_payment.copy())
+
+        finished = np.flatnonzero(closing <= 0)
+        last = int(finished[0]) + 1 if finished.size else stop - month
+        if last == stop - month and prepayment[-1] > 0 and opening[-1] - prepayment[-1] > 0:
+            # La cuota se recalcula sobre el saldo tras el prepago, antes de restar la amortización.
+            monthly_payment = french_amortization(float(opening[-1] - prepayment[-1]), monthly_rate, total_months - stop)
+
+        interest, capital, closing, prepayment, total_payment = (
+            interest[:last], capital[:last], closing[:last], prepayment[:last], total_payment[:last])
+        scheduled[-1] = scheduled[-1][:last]
+        if finished.size and closing[-1] < 0:
+            capital[-1] += closing[-1]
+            total_payment[-1] = capital[-1] + interest[-1]
+            closing[-1] = 0
+
+        interests.append(interest)
+        capitals.append(capital)
+        payments.append(total_payment)
+        prepaid.append(prepayment)
+        closings.append(closing)
+        balance = closing[-1]
+        month += last
+        if finished.size:
+            break
+
+    interest = np.concatenate(interests or [np.zeros(0)])
+    capital = np.concatenate(capitals or [np.zeros(0)])
+    return {
+        'interest': interest,
+        'capital': capital,
+        'total_payment': np.concatenate(payments or [np.zeros(0)]),
+        'scheduled_payment': np.concatenate(scheduled or [np.zeros(0)]),
+        'prepayment': np.concatenate(prepaid or [np.zeros(0)]),
+        'closing': np.concatenate(closings or [np.zeros(0)]),
+        'total_interest': checkpoint['total_interest'] + np.cumsum(interest),
+        'total_principal': checkpoint['total_principal'] + np.cumsum(capital),
+        'months': month,
+        'monthly_payment': monthly_payment
+    }
+
+def schedule_frame(arrays, start_date):
+    """Construir el DataFrame de `generate_schedule` (miles de UF) a partir de sus arreglos."""
+    month = arrays['months']
+    capital, prepayment, closing = arrays['capital'], arrays['prepayment'], arrays['closing']
+
+    # Escalar valores a miles para la salida
+    display_balance = np.round(closing / 1000, 4)
+    display_capital = np.round(capital / 1000, 4)
+    display_interest = np.round(arrays['interest'] / 1000, 4)
+    display_total_payment = np.round(arrays['total_payment'] / 1000, 4)
+    display_total_principal = np.round(arrays['total_principal'] / 1000, 4)
+    display_total_interest = np.round(arrays['total_interest'] / 1000, 4)
+    display_prepayment = np.round(prepayment / 1000, 4)
+
+    # Los meses con prepago generan dos filas: la cuota ordinaria y el prepago
+    has_prepayment = prepayment > 0
+    rows = np.repeat(np.arange(month), 1 + has_prepayment)
+    is_prepayment_row = np.zeros(rows.size, dtype=bool)
+    is_prepayment_row[np.cumsum(1 + has_prepayment)[has_prepayment] - 1] = True
+    ordinary = rows[~is_prepayment_row]
+    extra = rows[is_prepayment_row]
+
+    def column(ordinary_values, prepayment_values):
+        values = np.empty(rows.size)
+        values[~is_prepayment_row] = ordinary_values[ordinary]
+        values[is_prepayment_row] = prepayment_values[extra]
+        return values
+
+    return pd.DataFrame({
+        'NRO de cuota': rows + 1,
+        'FECHA A PAGAR': payment_dates(start_date, month)[rows],
+        'Amortizacion parcial': column(display_capital, display_prepayment),
+        'Acumulado Amortizacion': column(
+            np.where(has_prepayment, np.round(display_total_principal - display_capital, 4), display_total_principal),
+            display_total_principal),
+        'INTERES parcial': column(display_interest, np.zeros(month)),
+        'Acumulado de Interes': column(
+            np.where(has_prepayment, np.round(display_total_interest - display_interest, 4), display_total_interest),
+            display_total_interest),
+        'TOTAL CUOTA mensual': column(display_total_payment, display_prepayment),
+        'SALDO': column(display_balance, np.round((closing + capital + prepayment) / 1000, 4))
+    })
+
+def schedule_metrics(arrays, principal, monthly_rate, total_months):
+    """Métricas de `generate_schedule` a partir de sus arreglos."""
+    total_interest = float(arrays['total_interest'][-1])
+    return {
+        'months_saved': total_months - arrays['months'],
+        'interest_saved': round((french_amortization(principal, monthly_rate, total_months) * total_months - total_interest) / 1000, 4),
+        'new_monthly_payment': round(arrays['monthly_payment'] / 1000, 4),
+        'total_interest': round(total_interest / 1000, 4),
+        'total_principal': round(float(arrays['total_principal'][-1]) / 1000, 4)
+    }
+
+def schedule_result(principal, annual_rate, total_months, prepayments=None, start_date=None):
+    """Cronograma de `generate_schedule` como `ScheduleResult`, sin construir el DataFrame."""
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    arrays = schedule_arrays(principal, monthly_rate, total_months, prepayments)
+    return ScheduleResult('schedule', principal, monthly_rate, total_months, arrays['monthly_payment'], start_date, arrays)
+
+def generate_schedule(principal, annual_rate, total_months, prepayments=None, start_date=None):
+    """Generar cronograma de amortización con o sin prepagos, usando el método francés estándar."""
+    with stage('schedule_arrays') as record:
+        result = schedule_result(principal, annual_rate, total_months, prepayments, start_date)
+        record['rows'] = len(result)
+    with stage('schedule_frame') as record:
+        df = result.to_frame()
+        record['rows'] = len(df)
+    return df, result.metrics()
+
+def prepayment_result(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
+    """
+    Plan de prepago de `prepayment_plan` como `ScheduleResult` (escala interna, sin redondear).
+
+    La cuota se recalcula tras cada prepago; entre prepagos es constante, por lo que cada tramo
+    se resuelve en forma cerrada.
+    """
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    remaining_principal = principal * 1000  # Mantener escala en miles de UF
+    month = 0
+
+    prepayment_amount = plan_prepayment(annual_limit * 1000, frequency_months)
+    prepayments = {}
+    for i in range(frequency_months, total_months + 1, frequency_months):
+        prepayments[i] = min(prepayment_amount, remaining_principal)
+
+    openings, interests, capitals, prepaid, closings = [], [], [], [], []
+    for stop in prepayment_segments(prepayments, total_months):
+        monthly_payment = french_amortization(float(remaining_principal), monthly_rate, total_months - month)
+        opening = segment_balances(remaining_principal, monthly_rate, monthly_payment, stop - month)
+        interest = opening * monthly_rate
+        capital = np.minimum(monthly_payment - interest, opening)
+        prepayment = np.zeros(stop - month)
+        prepayment[-1] = min(prepayments.get(stop, 0), opening[-1] - capital[-1])
+        closing = opening - capital - prepayment
+
+        finished = np.flatnonzero(closing <= 0)
+        last = int(finished[0]) + 1 if finished.size else stop - month
+        openings.append(opening[:last])
+        interests.append(interest[:last])
+        capitals.append(capital[:last])
+        prepaid.append(prepayment[:last])
+        closings.append(closing[:last])
+        remaining_principal = closing[last - 1]
+        month += last
+        if finished.size:
+            break
+
+    opening = np.concatenate(openings)
+    interest = np.concatenate(interests)
+    capital = np.concatenate(capitals)
+    prepayment = np.concatenate(prepaid)
+    closing = np.concatenate(closings)
+    monthly_payment = french_amortization(float(opening[-1]), monthly_rate, total_months - month + 1)
+    return ScheduleResult('prepayment_plan', principal * 1000, monthly_rate, total_months, monthly_payment, start_date, {
+        'interest': interest,
+        'capital': capital,
+        'total_payment': capital + interest,
+        'prepayment': prepayment,
+        'closing': np.maximum(closing, 0),
+        'total_interest': np.cumsum(interest),
+        'total_principal': np.minimum(np.cumsum(capital + prepayment), principal * 1000)
+    })
+
+def prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
+    """Genera cronograma de amortización con prepagos periódicos según límite anual y frecuencia."""
+    with stage('schedule_arrays') as record:
+        result = prepayment_result(principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
+        record['rows'] = len(result)
+    with stage('schedule_frame') as record:
+        df = result.to_frame()
+        record['rows'] = len(df)
+    return df, result.metrics()
+
+# Caché de Escenarios
+SCHEDULE_CACHE_SIZE = 256
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _cached_schedule(principal, annual_rate, total_months, calendar, start_date):
+    return generate_schedule(principal, annual_rate, total_months, dict(calendar), start_date)
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _cached_prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date):
+    return prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
+
+def cached_schedule(principal, annual_rate, total_months, prepayments=None, start_date=None):
+    """`generate_schedule` con caché LRU por (capital, tasa, plazo, calendario de prepagos, fecha)."""
+    calendar = tuple(sorted((int(period), float(amount)) for period, amount in (prepayments or {}).items() if amount > 0))
+    df, metrics = _cached_schedule(float(principal), float(annual_rate), int(total_months), calendar, start_date)
+    return df.copy(), dict(metrics)
+
+def cached_prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
+    """`prepayment_plan` con caché LRU por sus parámetros."""
+    df, metrics = _cached_prepayment_plan(float(principal), float(annual_rate), int(total_months),
+                                          float(annual_limit), int(frequency_months), start_date)
+    return df.copy(), dict(metrics)
@@ -0,0 +1,123 @@
+"""
+Exportación por bloques de cronogramas a CSV, XLSX, Parquet y Arrow.
+
+Los escritores reciben un iterable de DataFrames con las mismas columnas (bloques de un cronograma
+largo o de una cartera completa) y escriben cada bloque apenas llega, sin materializar el resultado.
+El XLSX usa el modo write-only de openpyxl, que escribe las filas en un archivo temporal en vez de
+mantener el árbol de celdas en memoria. openpyxl y pyarrow se importan solo al usarse; si faltan,
+se lanza ImportError (igual que `DataFrame.to_excel`).
+"""
+
+# Importaciones
+import os
+
+CHUNK_ROWS = 50000
+EXCEL_MAX_ROWS = 1048576  # Límite de filas de una hoja, incluido el encabezado
+OPTIONAL_MODULES = {'.xlsx': 'openpyxl', '.parquet': 'pyarrow', '.pq': 'pyarrow', '.arrow': 'pyarrow',
+                    '.feather': 'pyarrow'}
+
+# Funciones de Bloques
+def frame_chunks(df, rows=CHUNK_ROWS):
+    """Recorrer un DataFrame en bloques de `rows` filas (vistas, sin copiar)."""
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start:start + rows]
+
+def column_values(chunk):
+    """Filas del bloque como tuplas de tipos nativos de Python (fechas como Timestamp)."""
+    return zip(*(chunk[column].tolist() for column in chunk.columns))
+
+# Escritores por Formato
+def write_csv(chunks, path):
+    """Escribir los bloques en un CSV, con el encabezado solo en el primero."""
+    rows, header = 0, True
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        for chunk in chunks:
+            chunk.to_csv(file, header=header, index=False)
+            rows += len(chunk)
+            header = False
+    return rows
+
+def write_xlsx(chunks, path, sheet_name='Sheet1'):
+    """
+    Escribir los bloques con openpyxl en modo write-only.
+
+    Al llenarse una hoja se continúa en otra (`Sheet1_2`, ...) con el mismo encabezado.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, sheets, rows = None, 0, 0, 0
+    for chunk in chunks:
+        for values in column_values(chunk):
+            if sheet is None or sheet_rows == EXCEL_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(sheet_name if sheets == 1 else f'{sheet_name}_{sheets}')
+                sheet.append(list(chunk.columns))
+                sheet_rows = 1
+            sheet.append(values)
+            sheet_rows += 1
+            rows += 1
+        if sheet is None:
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(list(chunk.columns))
+            sheets, sheet_rows = 1, 1
+    workbook.save(path)
+    return rows
+
+def write_parquet(chunks, path):
+    """Escribir cada bloque como un row group de Parquet."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, rows = None, 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def write_arrow(chunks, path):
+    """Escribir los bloques en formato Arrow IPC (Feather v2), legible con memoria mapeada."""
+    import pyarrow as pa
+
+    writer, rows = None, 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+WRITERS = {'.csv': write_csv, '.xlsx': write_xlsx, '.parquet': write_parquet, '.pq': write_parquet,
+           '.arrow': write_arrow, '.feather': write_arrow}
+
+# Exportación
+def export_chunks(chunks, path):
+    """Escribir los bloques en `path` según su extensión y devolver las filas escritas."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Formato de exportación no soportado: '{extension}'. Use uno de: {', '.join(WRITERS)}.")
+    directory = os.path.dirname(str(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return WRITERS[extension](chunks, path)
+
+def export_frame(df, path, rows=CHUNK_ROWS):
+    """Exportar un DataFrame ya calculado, por bloques de `rows` filas."""
+    return export_chunks(frame_chunks(df, rows), path)
+
+def partition_path(path, group):
+    """Archivo de una partición: ('cronogramas.csv', 'f12') -> 'cronogramas_f12.csv'."""
+    root, extension = os.path.splitext(str(path))
+    return f'{root}_{group}{extension}'
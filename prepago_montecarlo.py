@@ -0,0 +1,160 @@
+"""
+Motor Monte Carlo: tasas estocásticas (créditos variables o mixtos) e inflación de la UF.
+
+Genera N trayectorias con un modelo configurable y semilla fija, y recorre la recurrencia del
+método francés mes a mes de forma vectorizada sobre todas las trayectorias a la vez, con y sin
+prepago. Solo se guardan acumuladores por trayectoria (no cronogramas completos), de modo que la
+memoria crece con el número de trayectorias y no con trayectorias × meses.
+"""
+
+# Importaciones
+import numpy as np
+
+from prepago_core import calculate_monthly_rate, french_amortization, plan_prepayment
+
+# Parámetros por defecto del modelo (tasas e inflación anuales en %)
+DEFAULT_MODEL = {
+    'fixed_months': 60,           # Meses iniciales a tasa fija (crédito mixto)
+    'reset_months': 12,           # Meses entre cada reajuste de tasa posterior
+    'mean_rate': None,            # Tasa de largo plazo (por defecto, la tasa inicial)
+    'reversion': 0.3,             # Velocidad anual de reversión a la media (Vasicek)
+    'rate_volatility': 1.0,       # Volatilidad anual de la tasa (puntos porcentuales)
+    'rate_floor': 0.1,            # Tasa mínima admitida en los reajustes
+    'inflation_mean': 3.0,        # Inflación UF anual esperada
+    'inflation_volatility': 1.0,  # Volatilidad anual de la inflación UF
+    'seed': 0
+}
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Funciones del Modelo
+def reset_rates(rng, rates, months, config):
+    """Avanzar la tasa anual `months` meses con la discretización exacta de Vasicek."""
+    kappa, sigma, theta = config['reversion'], config['rate_volatility'], config['mean_rate']
+    horizon = months / 12
+    decay = np.exp(-kappa * horizon)
+    spread = sigma * np.sqrt((1 - decay ** 2) / (2 * kappa)) if kappa > 0 else sigma * np.sqrt(horizon)
+    rates = theta + (rates - theta) * decay + spread * rng.standard_normal(rates.size)
+    return np.maximum(rates, config['rate_floor'])
+
+def uf_growth(rng, paths, config):
+    """Factor de reajuste mensual de la UF (log-normal, media anual `inflation_mean`)."""
+    drift = np.log(1 + config['inflation_mean'] / 100) / 12
+    volatility = config['inflation_volatility'] / 100 / np.sqrt(12)
+    return np.exp(drift - volatility ** 2 / 2 + volatility * rng.standard_normal(paths))
+
+# Simulación
+def validate_simulation(annual_limit, frequency_months, paths):
+    """Validar los parámetros del plan y la cantidad de trayectorias antes de simular."""
+    if annual_limit < 0:
+        raise ValueError("El límite de prepago anual no puede ser negativo.")
+    if not 1 <= frequency_months <= 12:
+        raise ValueError("La frecuencia de prepago debe estar entre 1 y 12 meses.")
+    if paths < 1:
+        raise ValueError("La cantidad de trayectorias debe ser mayor a 0.")
+
+def simulate_paths(principal, annual_rate, total_months, annual_limit, frequency_months, paths=10000,
+                   model=None, invest_rates=(5.0,)):
+    """
+    Simular `paths` trayectorias de tasa e inflación, con y sin el plan de prepago.
+
+    Usa la misma semántica que `prepayment_plan` (montos en UF, prepago de `plan_prepayment` cada
+    `frequency_months` meses), pero la cuota se recalcula también en cada reajuste de tasa.
+    Devuelve métricas por trayectoria (miles de UF) y el saldo medio de cada mes en ambos escenarios.
+    """
+    config = {**DEFAULT_MODEL, **(model or {})}
+    if config['mean_rate'] is None:
+        config['mean_rate'] = annual_rate
+    validate_simulation(annual_limit, frequency_months, paths)
+    rng = np.random.default_rng(config['seed'])
+
+    prepayment_amount = min(plan_prepayment(annual_limit * 1000, frequency_months), principal * 1000)
+    rates = np.full(paths, float(annual_rate))
+    monthly_rate = calculate_monthly_rate(rates)
+    uf_index = np.ones(paths)
+    discount = [(1 + rate / 100) ** (1 / 12) for rate in invest_rates]
+
+    # Escenario 0: sin prepago; escenario 1: con prepago
+    balance = [np.full(paths, principal * 1000.0), np.full(paths, principal * 1000.0)]
+    payment = [np.zeros(paths), np.zeros(paths)]
+    total_interest = [np.zeros(paths), np.zeros(paths)]
+    months_paid = [np.zeros(paths, dtype=np.int32), np.zeros(paths, dtype=np.int32)]
+    total_prepaid = np.zeros(paths)
+    interest_nominal = [np.zeros(paths), np.zeros(paths)]
+    advantage = [np.zeros(paths) for _ in invest_rates]
+    mean_balance = np.zeros((2, total_months))
+
+    last_reset = 0
+    for month in range(total_months):
+        reset = month >= config['fixed_months'] and (month - config['fixed_months']) % config['reset_months'] == 0
+        if reset:
+            rates = reset_rates(rng, rates, month - last_reset, config)
+            monthly_rate = calculate_monthly_rate(rates)
+            last_reset = month
+        uf_index *= uf_growth(rng, paths, config)
+
+        cash_flow = []
+        for scenario in (0, 1):
+            # La cuota se recalcula al inicio, en cada reajuste y después de cada prepago
+            if month == 0 or reset or (scenario == 1 and month % frequency_months == 0):
+                payment[scenario] = french_amortization(balance[scenario], monthly_rate, total_months - month)
+            opening = balance[scenario]
+            interest = opening * monthly_rate
+            capital = np.minimum(payment[scenario] - interest, opening)
+            prepayment = 0
+            if scenario == 1 and (month + 1) % frequency_months == 0:
+                prepayment = np.minimum(prepayment_amount, opening - capital)
+                total_prepaid += prepayment
+            balance[scenario] = (opening - capital) - prepayment
+
+            total_interest[scenario] += interest
+            interest_nominal[scenario] += interest * uf_index
+            months_paid[scenario] += opening > 0
+            mean_balance[scenario, month] = balance[scenario].mean()
+            cash_flow.append(capital + interest + prepayment)
+
+        # Flujo liberado por el prepago, reajustado por la UF simulada y descontado al X% nominal
+        for values, factor in zip(advantage, discount):
+            values += (cash_flow[0] - cash_flow[1]) * uf_index / factor ** (month + 1)
+
+    return {
+        'total_interest': total_interest[1] / 1000,
+        'total_interest_no_prepayment': total_interest[0] / 1000,
+        'interest_saved': (total_interest[0] - total_interest[1]) / 1000,
+        'interest_saved_nominal': (interest_nominal[0] - interest_nominal[1]) / 1000,
+        'months_saved': months_paid[0] - months_paid[1],
+        'total_prepaid': total_prepaid / 1000,
+        'final_uf_index': uf_index,
+        **{f'prepay_advantage_{rate:g}': values / 1000 for rate, values in zip(invest_rates, advantage)}
+    }, mean_balance / 1000
+
+def summarize_paths(metrics, percentiles=PERCENTILES):
+    """Resumir cada métrica por trayectoria en media, desviación y percentiles."""
+    summary = {}
+    for name, values in metrics.items():
+        stats = {'mean': float(values.mean()), 'std': float(values.std())}
+        stats.update({f'p{q}': float(value) for q, value in zip(percentiles, np.percentile(values, percentiles))})
+        if name.startswith('prepay_advantage_'):
+            stats['prob_positive'] = float((values > 0).mean())
+        summary[name] = stats
+    return summary
+
+def monte_carlo(principal, annual_rate, total_months, annual_limit, frequency_months, paths=10000,
+                model=None, invest_rates=(5.0,), batch_paths=100000):
+    """
+    Ejecutar la simulación por lotes de trayectorias y devolver el resumen estadístico.
+
+    `prob_positive` en cada `prepay_advantage_X` es la probabilidad de que prepagar supere a
+    invertir el mismo monto al X% anual. Cada lote usa una semilla derivada de la del modelo.
+    """
+    validate_simulation(annual_limit, frequency_months, paths)
+    config = {**DEFAULT_MODEL, **(model or {})}
+    seeds = np.random.SeedSequence(config['seed']).spawn(-(-paths // batch_paths))
+    batches, balance = [], np.zeros((2, total_months))
+    for index, seed in enumerate(seeds):
+        size = min(batch_paths, paths - index * batch_paths)
+        metrics, mean_balance = simulate_paths(principal, annual_rate, total_months, annual_limit, frequency_months,
+                                               size, {**config, 'seed': seed}, invest_rates)
+        batches.append(metrics)
+        balance += mean_balance * size / paths
+    metrics = {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+    return summarize_paths(metrics), balance
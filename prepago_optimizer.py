@@ -0,0 +1,96 @@
+"""
+Optimizador de estrategias de prepago: límite anual × frecuencia × mes del primer prepago.
+
+Antes del primer prepago todas las estrategias siguen el cronograma sin prepago, por lo que ese
+prefijo se calcula una sola vez. Cada candidato continúa como un "subcrédito" desde el saldo del
+prefijo, y todos los candidatos de una misma frecuencia comparten calendario relativo, de modo
+que se evalúan juntos en un bloque vectorizado (y los bloques, en paralelo).
+"""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_engine import segment_balances
+from prepago_batch import DEFAULT_CHUNK_SIZE, map_chunks
+
+OBJECTIVES = {
+    'interest_saved': 'interest_saved',
+    'months_per_uf': 'months_saved_per_uf'
+}
+
+# Funciones de Cálculo
+def baseline_prefix(principal, annual_rate, total_months):
+    """Saldo al inicio de cada mes e interés acumulado del escenario sin prepago (escala interna)."""
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    payment = french_amortization(principal * 1000, monthly_rate, total_months)
+    opening = segment_balances(principal * 1000, monthly_rate, payment, total_months)
+    return opening, np.concatenate(([0.0], np.cumsum(opening * monthly_rate)))
+
+def pareto_mask(candidates):
+    """Marcar los candidatos no dominados en (UF prepagadas ↓, intereses ahorrados ↑)."""
+    ordered = candidates.sort_values(['total_prepaid', 'interest_saved'], ascending=[True, False])
+    saved = ordered['interest_saved'].to_numpy()
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], saved[:-1])))
+    return pd.Series(saved > best_before, index=ordered.index).reindex(candidates.index)
+
+def optimize_prepayments(principal, annual_rate, total_months, annual_limits, frequencies=range(1, 13),
+                         first_months=range(1, 13), objective='interest_saved', workers=None,
+                         chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluar la grilla de estrategias y devolver el ranking completo y el frente de Pareto.
+
+    El ranking incluye la columna booleana `pareto`; el frente se ordena por UF prepagadas.
+
+    `objective` puede ser 'interest_saved' (intereses ahorrados, como en `prepayment_plan`) o
+    'months_per_uf' (meses ahorrados por UF prepagada). Montos en UF, como en `prepayment_plan`.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo inválido. Use uno de: {', '.join(OBJECTIVES)}.")
+    frequencies = sorted({int(frequency) for frequency in frequencies})
+    if not frequencies or frequencies[0] < 1 or frequencies[-1] > 12:
+        raise ValueError("La frecuencia de prepago debe estar entre 1 y 12 meses.")
+    annual_limits = np.asarray(sorted({float(limit) for limit in annual_limits}))
+    if annual_limits.size == 0 or (annual_limits <= 0).any():
+        raise ValueError("Los límites anuales deben ser mayores a 0.")
+    first_months = np.asarray(sorted({int(month) for month in first_months if 1 <= int(month) <= total_months}))
+    if first_months.size == 0:
+        raise ValueError("Los meses del primer prepago deben estar dentro del plazo.")
+
+    opening, cumulative_interest = baseline_prefix(principal, annual_rate, total_months)
+    first_grid, limit_grid = (grid.ravel() for grid in np.meshgrid(first_months, annual_limits, indexing='ij'))
+
+    # Cada candidato parte desde el saldo del prefijo común, con su primer prepago en el mes relativo 1.
+    # El monto por prepago sale de `plan_prepayment`, la misma regla del modo cartera y del solver.
+    arguments, groups = [], []
+    for frequency in frequencies:
+        for start in range(0, first_grid.size, chunk_size):
+            rows = slice(start, start + chunk_size)
+            arguments.append((opening[first_grid[rows] - 1] / 1000, np.full(limit_grid[rows].size, annual_rate),
+                              total_months - first_grid[rows] + 1, limit_grid[rows], frequency, False, 1))
+            groups.append((frequency, rows))
+
+    frames = []
+    original_payment = french_amortization(principal * 1000, calculate_monthly_rate(annual_rate), total_months)
+    for (frequency, rows), (_, metrics) in zip(groups, map_chunks(arguments, workers)):
+        first = first_grid[rows]
+        months_paid = first - 1 + metrics['months_paid']
+        total_interest = cumulative_interest[first - 1] / 1000 + metrics['total_interest']
+        frames.append(pd.DataFrame({
+            'annual_limit': limit_grid[rows],
+            'frequency_months': frequency,
+            'first_month': first,
+            'months_saved': total_months - months_paid,
+            'interest_saved': np.round((original_payment * total_months / 1000) - total_interest, 4),
+            'total_interest': np.round(total_interest, 4),
+            'total_prepaid': metrics['total_prepaid']
+        }))
+
+    candidates = pd.concat(frames, ignore_index=True)
+    candidates['months_saved_per_uf'] = np.divide(
+        candidates['months_saved'], candidates['total_prepaid'],
+        out=np.zeros(len(candidates)), where=candidates['total_prepaid'].to_numpy() > 0)
+    candidates['pareto'] = pareto_mask(candidates)
+    ranking = candidates.sort_values([OBJECTIVES[objective], 'total_prepaid'], ascending=[False, True], ignore_index=True)
+    return ranking, ranking[ranking['pareto']].sort_values('total_prepaid', ignore_index=True)
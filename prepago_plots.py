@@ -0,0 +1,262 @@
+"""
+Gráficos de cronogramas y escenarios (PNG, SVG, PDF o JPG según la extensión del archivo).
+
+Se usa la API orientada a objetos de matplotlib con el canvas Agg, sin pyplot: no hay estado global
+ni interfaz gráfica, y cada proceso reutiliza una `Figure` por tamaño (se limpia entre gráficos en
+vez de crearla de nuevo). Las series largas se reducen antes de dibujarse (`downsample`) y muchos
+escenarios en una figura se dibujan como una sola `LineCollection`. Para muchos gráficos por
+corrida, `render_figures` reparte los trabajos en un pool de procesos.
+"""
+
+# Importaciones
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from prepago_profile import stage
+
+DISPLAY_POINTS = 2000  # Puntos por serie a partir de los cuales se reduce para dibujar
+LEGEND_LIMIT = 10  # Escenarios con leyenda; sobre este número se usa una escala de color
+PLOT_FORMATS = ['png', 'svg', 'pdf', 'jpg']
+
+# Etiquetas de las métricas de `prepago_sensitivity.sensitivity_grid`
+SENSITIVITY_LABELS = {
+    'monthly_payment': 'Cuota mensual (UF)',
+    'baseline_interest': 'Intereses sin prepago (UF)',
+    'total_interest': 'Intereses totales con prepago (UF)',
+    'interest_reduction': 'Intereses evitados por el prepago (UF)',
+    'months_saved': 'Meses ahorrados',
+    'total_prepaid': 'Total prepagado (UF)'
+}
+
+# Series de los gráficos de resumen y comparación: (columna, etiqueta, color)
+SUMMARY_SERIES = [
+    ('SALDO', 'Saldo', 'blue'),
+    ('Acumulado Amortizacion', 'Amortización acumulada', 'green'),
+    ('Acumulado de Interes', 'Intereses acumulados', 'red')
+]
+
+# Funciones de Apoyo
+def downsample(x, y, max_points=DISPLAY_POINTS):
+    """
+    Reducir una serie a unos `max_points` puntos conservando su forma.
+
+    La serie se divide en tramos y de cada uno se dejan el mínimo y el máximo (en su orden), además
+    del primer y último punto, de modo que los picos (como la caída de un prepago) siguen visibles.
+    Las series cortas se devuelven sin cambios.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    if y.size <= max_points:
+        return x, y
+    width = -(-y.size // max(max_points // 2, 1))
+    buckets = -(-y.size // width)
+    # El último tramo se completa repitiendo el último valor, que ya está entre los puntos conservados
+    blocks = np.pad(y, (0, buckets * width - y.size), mode='edge').reshape(buckets, width)
+    offsets = np.arange(buckets) * width
+    keep = np.concatenate([[0, y.size - 1], offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)])
+    keep = np.unique(np.minimum(keep, y.size - 1))
+    return x[keep], y[keep]
+
+def image_path(name, output_dir=None, image_format='png'):
+    """Ruta de un gráfico: ('mortgage_summary', 'graficos', 'svg') -> 'graficos/mortgage_summary.svg'."""
+    if image_format not in PLOT_FORMATS:
+        raise ValueError(f"Formato de imagen inválido: '{image_format}'. Use uno de: {', '.join(PLOT_FORMATS)}.")
+    return os.path.join(output_dir or '', f'{name}.{image_format}')
+
+# Figuras reutilizables por proceso, una por (tamaño, layout)
+_figures = {}
+
+def reusable_figure(size, layout=None):
+    """Figura Agg del tamaño pedido, limpia; se crea solo la primera vez en cada proceso."""
+    figure = _figures.get((size, layout))
+    if figure is None:
+        figure = _figures[(size, layout)] = Figure(figsize=size, layout=layout)
+        FigureCanvasAgg(figure)
+    else:
+        figure.clear()
+    return figure
+
+def fit_layout(figure):
+    """
+    Ajustar los márgenes con `tight_layout` una sola vez.
+
+    `tight_layout` deja un layout marcador en la figura que obliga a `savefig` a dibujarla dos
+    veces; como los márgenes ya quedaron calculados, se quita.
+    """
+    figure.tight_layout()
+    figure.set_layout_engine('none')
+
+# Funciones de Dibujo (reciben la figura y los datos)
+def draw_summary(figure, df):
+    """Saldo, amortización acumulada e intereses acumulados en un solo gráfico."""
+    ax = figure.subplots()
+    for column, label, color in SUMMARY_SERIES:
+        ax.plot(*downsample(df['NRO de cuota'], df[column]), label=label, color=color)
+    ax.set_xlabel('Mes')
+    ax.set_ylabel('miles de UF')
+    ax.set_title('Evolución del Saldo, Amortización e Intereses Acumulados')
+    ax.grid(True)
+    ax.legend()
+    fit_layout(figure)
+
+def draw_simulation(figure, df):
+    """Evolución del saldo y de la cuota total, sin las filas de prepago."""
+    regular = (df['Amortizacion parcial'] != df['TOTAL CUOTA mensual']).to_numpy()
+    months = df['NRO de cuota'].to_numpy()[regular]
+    balance_ax, payment_ax = figure.subplots(1, 2)
+
+    # Gráfico de saldo
+    balance_ax.plot(*downsample(months, df['SALDO'].to_numpy()[regular]), label='Saldo', color='blue')
+    balance_ax.set_xlabel('Mes')
+    balance_ax.set_ylabel('Saldo (miles de UF)')
+    balance_ax.set_title('Evolución del Saldo')
+    balance_ax.grid(True)
+    balance_ax.legend()
+
+    # Gráfico de cuota total
+    payment_ax.plot(*downsample(months, df['TOTAL CUOTA mensual'].to_numpy()[regular]), label='Cuota Total',
+                    color='green')
+    payment_ax.set_xlabel('Mes')
+    payment_ax.set_ylabel('Cuota Total (miles de UF)')
+    payment_ax.set_title('Evolución de la Cuota Total')
+    payment_ax.grid(True)
+    payment_ax.legend()
+    fit_layout(figure)
+
+def draw_comparison(figure, df_no_prepayment, df_prepayment):
+    """Curvas de ambos escenarios: sin prepago en línea continua y con prepago en línea discontinua."""
+    ax = figure.subplots()
+    for df, scenario, linestyle in [(df_no_prepayment, 'sin prepago', 'solid'), (df_prepayment, 'con prepago', 'dashed')]:
+        for column, label, color in SUMMARY_SERIES:
+            ax.plot(*downsample(df['NRO de cuota'], df[column]), label=f'{label} ({scenario})', color=color,
+                    linestyle=linestyle)
+    ax.set_xlabel('Mes')
+    ax.set_ylabel('miles de UF')
+    ax.set_title('Comparación de Escenarios: Sin Prepago vs. Con Prepago')
+    ax.grid(True)
+    ax.legend()
+    fit_layout(figure)
+
+def draw_scenarios(figure, series, title='Evolución del Saldo por Escenario', ylabel='Saldo (miles de UF)'):
+    """
+    Muchos escenarios en un gráfico: `series` es {nombre: (meses, valores)}.
+
+    Hasta LEGEND_LIMIT escenarios se dibujan como líneas con leyenda; sobre eso, todas las curvas
+    van en una sola `LineCollection` coloreada por orden, que se dibuja de una vez. Los márgenes
+    son fijos (sin `tight_layout`), porque este gráfico se repite por crédito en las corridas grandes.
+    """
+    ax = figure.subplots()
+    curves = [np.column_stack(downsample(x, y)) for x, y in series.values()]
+    if len(curves) <= LEGEND_LIMIT:
+        for name, curve in zip(series, curves):
+            ax.plot(curve[:, 0], curve[:, 1], label=str(name))
+        if curves:
+            ax.legend()
+    else:
+        lines = LineCollection(curves, array=np.arange(len(curves)), cmap='viridis', linewidths=0.6, alpha=0.6)
+        ax.add_collection(lines)
+        ax.autoscale_view()
+        figure.colorbar(lines, ax=ax, label='Escenario (orden)')
+    ax.set_xlabel('Mes')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    figure.subplots_adjust(left=0.08, right=0.97, bottom=0.08, top=0.93)
+
+def draw_sensitivity(figure, grid, metric='total_interest', panels=4):
+    """Heatmaps tasa × plazo de una métrica, con hasta `panels` límites y una escala de color común."""
+    values, axes = grid[metric], grid['axes']
+    limits = sensitivity_panels(values, panels)
+    subplots = figure.subplots(1, len(limits), sharey=True, squeeze=False)
+    for ax, limit in zip(subplots[0], limits):
+        data = values if limit is None else values[:, :, limit]
+        image = ax.pcolormesh(axes['total_months'], axes['annual_rate'], data, shading='nearest', cmap='viridis',
+                              vmin=values.min(), vmax=values.max())
+        ax.set_xlabel('Plazo (meses)')
+        if limit is not None:
+            ax.set_title(f"Límite {axes['annual_limit'][limit]:g} UF/año")
+    subplots[0][0].set_ylabel('Tasa anual (%)')
+    figure.colorbar(image, ax=subplots[0].tolist(), label=SENSITIVITY_LABELS.get(metric, metric))
+    figure.suptitle(f"Sensibilidad: {SENSITIVITY_LABELS.get(metric, metric)} (crédito de {grid['principal']:g} UF, "
+                    f"prepago cada {grid['frequency_months']} meses)")
+
+def sensitivity_panels(values, panels):
+    """Índices de los límites a dibujar (equiespaciados), o [None] si la métrica no tiene ese eje."""
+    if values.ndim != 3:
+        return [None]
+    return np.unique(np.linspace(0, values.shape[2] - 1, min(panels, values.shape[2])).round().astype(int))
+
+# Tipos de gráfico: función de dibujo, tamaño (pulgadas) y layout de la figura
+PLOTS = {
+    'summary': (draw_summary, (10, 6), None),
+    'simulation': (draw_simulation, (12, 6), None),
+    'comparison': (draw_comparison, (14, 8), None),
+    'scenarios': (draw_scenarios, (12, 7), None),
+    'sensitivity': (draw_sensitivity, (7.5, 5), 'constrained')
+}
+
+# Funciones de Renderizado
+def render(kind, data, path, size=None):
+    """Dibujar un gráfico de tipo `kind` con los argumentos `data` y guardarlo en `path` (el formato sale de la extensión)."""
+    if kind not in PLOTS:
+        raise ValueError(f"Tipo de gráfico inválido: '{kind}'. Use uno de: {', '.join(PLOTS)}.")
+    draw, default_size, layout = PLOTS[kind]
+    figure = reusable_figure(size or default_size, layout)
+    draw(figure, *data)
+    directory = os.path.dirname(str(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with stage('savefig'):
+        figure.savefig(path)
+    return path
+
+def render_job(job):
+    """Renderizar un trabajo (tipo, datos, ruta[, tamaño]) en un proceso del pool."""
+    return render(*job)
+
+def render_figures(jobs, workers=None):
+    """
+    Renderizar muchos gráficos: `jobs` es una lista de (tipo, datos, ruta[, tamaño]).
+
+    Con un solo trabajo o `workers=1` se dibujan en serie; si no, en un pool de procesos donde cada
+    proceso reutiliza sus figuras. Devuelve las rutas en el orden de `jobs`.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+# Funciones de Visualización
+def plot_summary(df, path='mortgage_summary.png'):
+    """Generar gráfico único con saldo, amortización acumulada e intereses acumulados."""
+    return render('summary', (df,), path)
+
+def plot_simulation(df, path='mortgage_simulation.png'):
+    """Generar gráficos de evolución de saldo y cuota."""
+    return render('simulation', (df,), path)
+
+def plot_comparison(df_no_prepayment, df_prepayment, path='mortgage_comparison.png'):
+    """Genera un gráfico comparativo de los dos escenarios."""
+    return render('comparison', (df_no_prepayment, df_prepayment), path)
+
+def plot_scenarios(series, path='mortgage_scenarios.png', title='Evolución del Saldo por Escenario',
+                   ylabel='Saldo (miles de UF)'):
+    """Graficar muchos escenarios ({nombre: (meses, valores)}) en una sola figura."""
+    return render('scenarios', (series, title, ylabel), path)
+
+def plot_sensitivity(grid, metric='total_interest', path=None, panels=4):
+    """
+    Heatmap tasa × plazo de una métrica de `sensitivity_grid`.
+
+    Las métricas con eje de límites se dibujan en hasta `panels` paneles (límites equiespaciados de
+    la grilla) con una escala de color común. Por defecto se guarda en 'mortgage_sensitivity_<métrica>.png'.
+    """
+    columns = len(sensitivity_panels(grid[metric], panels))
+    return render('sensitivity', (grid, metric, panels), path or f'mortgage_sensitivity_{metric}.png',
+                  size=(4.5 * columns + 1.5, 5))
@@ -0,0 +1,131 @@
+"""
+Instrumentación opcional por etapas: tiempo de reloj, filas y memoria máxima de cada etapa.
+
+Se activa con la variable de entorno PREPAGO_PROFILE=<archivo> o con la opción --profile de la
+línea de comandos. PREPAGO_PROFILE_FORMAT (o --profile-format) elige 'json' (lista de etapas) o
+'chrome' (Trace Event, para chrome://tracing o Perfetto); el archivo se escribe al terminar.
+
+Desactivada, `stage` devuelve un contexto vacío con un registro nuevo que se descarta, de modo
+que el costo por etapa es una llamada a función y puede quedar en el código de producción.
+Activada, la memoria se mide con `tracemalloc` (que sí agrega costo) y es la máxima adicional al
+inicio de la etapa. Se guardan a lo sumo las últimas `MAX_RECORDS` etapas, para que un proceso
+largo (`serve`, `stream`) no acumule memoria sin límite; el perfil informa cuántas se descartaron.
+"""
+
+# Importaciones
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+
+PROFILE_ENV = 'PREPAGO_PROFILE'
+FORMAT_ENV = 'PREPAGO_PROFILE_FORMAT'
+FORMATS = ['json', 'chrome']
+MAX_RECORDS = 100_000
+
+_settings = {'path': None, 'format': 'json'}
+_records = deque(maxlen=MAX_RECORDS)
+_counts = {'recorded': 0}
+_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+
+# Etapas
+class Stage:
+    """Contexto que mide una etapa; su `__enter__` devuelve el registro para agregar campos (p. ej. `rows`)."""
+
+    def __init__(self, name, fields):
+        self.record = {'name': name, **fields}
+        self.memory = self.peak = self.start = 0
+
+    def __enter__(self):
+        stack = open_stages()
+        self.record.setdefault('flow', stack[0].record['flow'] if stack else self.record['name'])
+        fold_peak(stack)
+        self.memory = self.peak = tracemalloc.get_traced_memory()[0]
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, exc, traceback):
+        end = time.perf_counter()
+        stack = open_stages()
+        fold_peak(stack)
+        stack.pop()
+        self.record.update(start=self.start - _origin, duration=end - self.start, depth=len(stack),
+                           thread=threading.get_ident(), peak_memory=self.peak - self.memory)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        with _lock:
+            _records.append(self.record)
+            _counts['recorded'] += 1
+        return False
+
+def open_stages():
+    """Pila de etapas abiertas del hilo actual."""
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+def fold_peak(stack):
+    """Traspasar el máximo de memoria observado a las etapas abiertas y reiniciar la medición."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for open_stage in stack:
+        open_stage.peak = max(open_stage.peak, peak)
+    if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+; en 3.8 el máximo es el del proceso
+        tracemalloc.reset_peak()
+
+def stage(name, **fields):
+    """Medir un bloque `with`; sin instrumentación activa no registra nada."""
+    if _settings['path'] is None:
+        return nullcontext({})
+    return Stage(name, fields)
+
+# Configuración y Salida
+def enabled():
+    return _settings['path'] is not None
+
+def configure(path, profile_format=None):
+    """Activar la instrumentación y escribir `path` al salir del programa."""
+    profile_format = profile_format or _settings['format']
+    if profile_format not in FORMATS:
+        raise ValueError(f"Formato de perfil inválido: '{profile_format}'. Use uno de: {', '.join(FORMATS)}.")
+    if _settings['path'] is None:
+        atexit.register(write_profile)
+    _settings.update(path=path, format=profile_format)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def chrome_trace(records, dropped=0):
+    """Registros en formato Trace Event (eventos completos 'X', microsegundos)."""
+    pid = os.getpid()
+    return {'displayTimeUnit': 'ms', 'otherData': {'dropped_stages': dropped}, 'traceEvents': [{
+        'name': record['name'], 'cat': record['flow'], 'ph': 'X', 'pid': pid, 'tid': record['thread'],
+        'ts': round(record['start'] * 1e6, 3), 'dur': round(record['duration'] * 1e6, 3),
+        'args': {key: value for key, value in record.items()
+                 if key not in ('name', 'flow', 'start', 'duration', 'thread', 'depth')}
+    } for record in records]}
+
+def write_profile(path=None):
+    """Escribir las etapas registradas en el formato configurado y devolver la ruta."""
+    path = path or _settings['path']
+    with _lock:
+        records = sorted(_records, key=lambda record: record['start'])
+        dropped = _counts['recorded'] - len(records)
+    if _settings['format'] == 'chrome':
+        content = chrome_trace(records, dropped)
+    else:
+        content = {'pid': os.getpid(), 'dropped_stages': dropped, 'stages': records}
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(content, file, indent=1, default=str)
+    return path
+
+# Los procesos del pool heredan el entorno; solo el proceso principal registra y escribe el perfil
+if os.environ.get(PROFILE_ENV):
+    import multiprocessing
+    if multiprocessing.parent_process() is None:
+        configure(os.environ[PROFILE_ENV], os.environ.get(FORMAT_ENV) or 'json')
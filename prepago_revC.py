@@ -7,20 +7,29 @@ rev c [25-07-2025]:
 """
 
 # Importaciones
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+# pandas, NumPy y matplotlib se cargan al primer uso: el motor vive en prepago_engine.py y los
+# gráficos en prepago_plots.py, de modo que cotizar una cuota solo importa el núcleo.
 from datetime import datetime
+import argparse
+import importlib
 import os
 
-# Funciones de Cálculo
-def calculate_monthly_rate(annual_rate):
-    """Convertir tasa nominal anual a tasa efectiva mensual."""
-    return (1 + annual_rate / 100) ** (1 / 12) - 1
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_profile import stage
 
-def french_amortization(principal, monthly_rate, total_months):
-    """Calcular cuota mensual usando el método francés."""
-    return principal * (monthly_rate * (1 + monthly_rate) ** total_months) / ((1 + monthly_rate) ** total_months - 1)
+# Exportación de cronogramas y gráficos (opciones globales --output-dir, --formats, --plot-format y
+# de indexación UF --uf, --uf-value y --uf-inflation)
+EXPORT_FORMATS = {'csv': 'CSV', 'xlsx': 'Excel', 'parquet': 'Parquet', 'arrow': 'Arrow'}
+export_settings = {'output_dir': None, 'formats': ['csv', 'xlsx'], 'plot_format': 'png', 'uf_path': None,
+                   'uf_value': None, 'uf_inflation': 3.0}
+
+# Nombres que vivían en este módulo y ahora se cargan al pedirse (ver `__getattr__`)
+LAZY_EXPORTS = {
+    **dict.fromkeys(['payment_dates', 'segment_balances', 'prepayment_segments', 'schedule_arrays', 'schedule_frame',
+                     'schedule_metrics', 'generate_schedule', 'prepayment_plan', 'SCHEDULE_CACHE_SIZE',
+                     'cached_schedule', 'cached_prepayment_plan'], 'prepago_engine'),
+    **dict.fromkeys(['plot_summary', 'plot_simulation', 'plot_comparison'], 'prepago_plots')
+}
 
 # Funciones de Validación
 def validate_inputs(principal, annual_rate, total_months, start_date=None, prepayments_input=None):
@@ -32,6 +41,7 @@ def validate_inputs(principal, annual_rate, total_months, start_date=None, prepa
     if total_months <= 0:
         raise ValueError("El plazo debe ser mayor a 0.")
     
+    import pandas as pd
     if start_date:
         try:
             start_date = pd.to_datetime(start_date)
@@ -55,173 +65,80 @@ def validate_inputs(principal, annual_rate, total_months, start_date=None, prepa
     
     return start_date, prepayments
 
-# Funciones de Generación de Cronograma
-def generate_schedule(principal, annual_rate, total_months, prepayments=None, start_date=None):
-    """Generar cronograma de amortización con o sin prepagos, usando el método francés estándar."""
-    monthly_rate = calculate_monthly_rate(annual_rate)
-    monthly_payment = french_amortization(principal, monthly_rate, total_months)
-    
-    balance = principal
-    schedule = []
-    month = 0
-    total_interest = 0
-    total_principal = 0
-    
-    while balance > 0 and month < total_months:
-        # Calcular interés
-        interest = balance * monthly_rate
-        total_interest += interest
-        
-        # Obtener prepago para el período
-        prepayment = prepayments.get(month + 1, 0) if prepayments else 0
-        
-        # Calcular pago de capital
-        capital_payment = monthly_payment - interest
-        total_payment = monthly_payment
-        
-        if prepayment > 0:
-            balance -= prepayment
-            if balance > 0:
-                monthly_payment = french_amortization(balance, monthly_rate, total_months - month - 1)
-        
-        balance -= capital_payment
-        if balance < 0:
-            capital_payment += balance
-            total_payment = capital_payment + interest
-            balance = 0
-        
-        total_principal += capital_payment
-        
-        # Escalar valores a miles para la salida
-        display_balance = round(balance / 1000, 4)
-        display_capital = round(capital_payment / 1000, 4)
-        display_interest = round(interest / 1000, 4)
-        display_total_payment = round(total_payment / 1000, 4)
-        display_total_principal = round(total_principal / 1000, 4)
-        display_total_interest = round(total_interest / 1000, 4)
-        display_prepayment = round(prepayment / 1000, 4)
-        
-        if prepayment > 0:
-            schedule.append({
-                'NRO de cuota': month + 1,
-                'FECHA A PAGAR': start_date + pd.offsets.MonthBegin(month) + pd.offsets.Day(9),
-                'Amortizacion parcial': display_capital,
-                'Acumulado Amortizacion': round(display_total_principal - display_capital, 4),
-                'INTERES parcial': display_interest,
-                'Acumulado de Interes': round(display_total_interest - display_interest, 4),
-                'TOTAL CUOTA mensual': display_total_payment,
-                'SALDO': display_balance
-            })
-            schedule.append({
-                'NRO de cuota': month + 1,
-                'FECHA A PAGAR': start_date + pd.offsets.MonthBegin(month) + pd.offsets.Day(9),
-                'Amortizacion parcial': display_prepayment,
-                'Acumulado Amortizacion': display_total_principal,
-                'INTERES parcial': 0,
-                'Acumulado de Interes': display_total_interest,
-                'TOTAL CUOTA mensual': display_prepayment,
-                'SALDO': round((balance + capital_payment + prepayment) / 1000, 4)
-            })
-        else:
-            schedule.append({
-                'NRO de cuota': month + 1,
-                'FECHA A PAGAR': start_date + pd.offsets.MonthBegin(month) + pd.offsets.Day(9),
-                'Amortizacion parcial': display_capital,
-                'Acumulado Amortizacion': display_total_principal,
-                'INTERES parcial': display_interest,
-                'Acumulado de Interes': display_total_interest,
-                'TOTAL CUOTA mensual': display_total_payment,
-                'SALDO': display_balance
-            })
-        
-        month += 1
-        if balance <= 0:
-            break
-    
-    df = pd.DataFrame(schedule)
-    return df, {
-        'months_saved': total_months - month,
-        'interest_saved': round((french_amortization(principal, monthly_rate, total_months) * total_months - total_interest) / 1000, 4),
-        'new_monthly_payment': round(monthly_payment / 1000, 4),
-        'total_interest': round(total_interest / 1000, 4),
-        'total_principal': round(total_principal / 1000, 4)
-    }
-
-# Funciones de Visualización
-def plot_summary(df):
-    """Generar gráfico único con saldo, amortización acumulada e intereses acumulados."""
-    plt.figure(figsize=(10, 6))
-    
-    # Graficar saldo
-    plt.plot(df['NRO de cuota'], df['SALDO'], label='Saldo', color='blue')
-    
-    # Graficar amortización acumulada
-    plt.plot(df['NRO de cuota'], df['Acumulado Amortizacion'], label='Amortización acumulada', color='green')
-    
-    # Graficar intereses acumulados
-    plt.plot(df['NRO de cuota'], df['Acumulado de Interes'], label='Intereses acumulados', color='red')
-    
-    plt.xlabel('Mes')
-    plt.ylabel('miles de UF')
-    plt.title('Evolución del Saldo, Amortización e Intereses Acumulados')
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('mortgage_summary.png')
-    plt.close()
-
-def plot_simulation(df):
-    """Generar gráficos de evolución de saldo y cuota."""
-    plt.figure(figsize=(12, 6))
-    
-    # Gráfico de saldo
-    plt.subplot(1, 2, 1)
-    plt.plot(df[df['Amortizacion parcial'] != df['TOTAL CUOTA mensual']]['NRO de cuota'], 
-             df[df['Amortizacion parcial'] != df['TOTAL CUOTA mensual']]['SALDO'], 
-             label='Saldo', color='blue')
-    plt.xlabel('Mes')
-    plt.ylabel('Saldo (miles de UF)')
-    plt.title('Evolución del Saldo')
-    plt.grid(True)
-    plt.legend()
-    
-    # Gráfico de cuota total
-    plt.subplot(1, 2, 2)
-    plt.plot(df[df['Amortizacion parcial'] != df['TOTAL CUOTA mensual']]['NRO de cuota'], 
-             df[df['Amortizacion parcial'] != df['TOTAL CUOTA mensual']]['TOTAL CUOTA mensual'], 
-             label='Cuota Total', color='green')
-    plt.xlabel('Mes')
-    plt.ylabel('Cuota Total (miles de UF)')
-    plt.title('Evolución de la Cuota Total')
-    plt.grid(True)
-    plt.legend()
-    
-    plt.tight_layout()
-    plt.savefig('mortgage_simulation.png')
-    plt.close()
-
-def plot_comparison(df_no_prepayment, df_prepayment):
-    """Genera un gráfico comparativo de los dos escenarios."""
-    plt.figure(figsize=(14, 8))
-
-    # Trazar las curvas para el escenario sin prepago
-    plt.plot(df_no_prepayment['NRO de cuota'], df_no_prepayment['SALDO'], label='Saldo (sin prepago)', color='blue', linestyle='solid')
-    plt.plot(df_no_prepayment['NRO de cuota'], df_no_prepayment['Acumulado Amortizacion'], label='Amortización acumulada (sin prepago)', color='green', linestyle='solid')
-    plt.plot(df_no_prepayment['NRO de cuota'], df_no_prepayment['Acumulado de Interes'], label='Intereses acumulados (sin prepago)', color='red', linestyle='solid')
-
-    # Trazar las curvas para el escenario con prepago
-    plt.plot(df_prepayment['NRO de cuota'], df_prepayment['SALDO'], label='Saldo (con prepago)', color='blue', linestyle='dashed')
-    plt.plot(df_prepayment['NRO de cuota'], df_prepayment['Acumulado Amortizacion'], label='Amortización acumulada (con prepago)', color='green', linestyle='dashed')
-    plt.plot(df_prepayment['NRO de cuota'], df_prepayment['Acumulado de Interes'], label='Intereses acumulados (con prepago)', color='red', linestyle='dashed')
-
-    plt.xlabel('Mes')
-    plt.ylabel('miles de UF')
-    plt.title('Comparación de Escenarios: Sin Prepago vs. Con Prepago')
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('mortgage_comparison.png')
-    plt.close()
+# Flujos de Cálculo sin Interacción (compartidos por el menú y el modo streaming)
+def summary_flow(principal, annual_rate, total_months, start_date=None):
+    """Flujo 1: cronograma sin prepagos y sus métricas."""
+    from prepago_engine import generate_schedule
+    with stage('summary'):
+        with stage('validate_inputs'):
+            start_date, _ = validate_inputs(principal, annual_rate, total_months, start_date)
+        return generate_schedule(principal * 1000, annual_rate, total_months, prepayments=None, start_date=start_date)
+
+def prepayment_flow(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
+    """Flujo 2: plan de prepago con límite anual y frecuencia semestral o anual."""
+    from prepago_engine import prepayment_plan
+    with stage('prepayment_plan'):
+        with stage('validate_inputs'):
+            if annual_limit <= 0:
+                raise ValueError("El límite anual debe ser mayor a 0.")
+            if frequency_months not in [6, 12]:
+                raise ValueError("Frecuencia de prepago debe ser 6 (semestral) o 12 (anual).")
+            start_date, _ = validate_inputs(principal, annual_rate, total_months, start_date)
+        return prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
+
+def comparison_flow(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
+    """Flujo 3: escenarios sin y con prepago, servidos desde la caché de escenarios."""
+    from prepago_engine import cached_prepayment_plan, cached_schedule
+    with stage('comparison'):
+        with stage('validate_inputs'):
+            start_date, _ = validate_inputs(principal, annual_rate, total_months, start_date)
+        return (cached_schedule(principal * 1000, annual_rate, total_months, prepayments=None, start_date=start_date),
+                cached_prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date))
+
+def plot_path(name):
+    """Ruta de un gráfico del menú: '<output_dir>/<name>.<plot_format>'."""
+    from prepago_plots import image_path
+    return image_path(name, export_settings['output_dir'], export_settings['plot_format'])
+
+def uf_indexation():
+    """
+    Tabla UF de las opciones --uf (serie diaria) o --uf-value (valor de hoy), o None sin conversión.
+
+    Las fechas posteriores a la serie se proyectan con --uf-inflation. Con --uf-value también las
+    anteriores a hoy (créditos ya iniciados): se retroproyectan descontando la misma inflación.
+    """
+    if not (export_settings['uf_path'] or export_settings['uf_value']):
+        return None
+    from prepago_uf import load_uf_table, uf_table
+    if export_settings['uf_path']:
+        return load_uf_table(export_settings['uf_path'], export_settings['uf_inflation'])
+    return uf_table([datetime.now().date()], [export_settings['uf_value']], export_settings['uf_inflation'],
+                    backcast=True)
+
+def export_schedule(schedule_df, name, flow):
+    """
+    Exportar el cronograma por bloques en cada formato configurado, como '<output_dir>/<name>.<formato>'.
+
+    Con indexación UF configurada se agregan el valor UF y los montos en pesos de cada fecha.
+    """
+    from prepago_export import export_frame
+
+    table = uf_indexation()
+    if table is not None:
+        from prepago_uf import add_clp_columns
+        with stage('clp_columns', flow=flow):
+            schedule_df = add_clp_columns(schedule_df, table)
+
+    for export_format in export_settings['formats']:
+        path = os.path.join(export_settings['output_dir'] or '', f'{name}.{export_format}')
+        try:
+            with stage(f'export_{export_format}', flow=flow) as record:
+                record['rows'] = export_frame(schedule_df, path)
+            print(f"Cronograma exportado a '{path}'")
+        except ImportError as e:
+            module = e.name or 'openpyxl'
+            print(f"Advertencia: No se pudo exportar a {EXPORT_FORMATS[export_format]} porque falta el módulo "
+                  f"'{module}'. Instálalo con 'pip install {module}'.")
 
 # Funciones de Interfaz de Usuario la 1 y la 2 *importante
 def mortgage_summary():
@@ -233,11 +150,8 @@ def mortgage_summary():
         total_months = int(input("Plazo en meses: "))
         start_date = input("Fecha de inicio (YYYY-MM-DD, dejar en blanco para hoy): ").strip() or None
         
-        # Validar entradas
-        start_date, _ = validate_inputs(principal, annual_rate, total_months, start_date)
-        
-        # Generar cronograma sin prepagos
-        schedule_df, metrics = generate_schedule(principal * 1000, annual_rate, total_months, prepayments=None, start_date=start_date)
+        # Validar entradas y generar cronograma sin prepagos
+        schedule_df, metrics = summary_flow(principal, annual_rate, total_months, start_date)
         
         # Mostrar resultados
         print("\nCronograma de Amortización:")
@@ -247,19 +161,15 @@ def mortgage_summary():
         print(f"Total intereses pagados (miles de UF): {metrics['total_interest']:.4f}")
         print(f"Total amortización (miles de UF): {metrics['total_principal']:.4f}")
         
-        # Exportar a CSV
-        schedule_df.to_csv('mortgage_summary.csv', index=False)
-        print("\nCronograma exportado a 'mortgage_summary.csv'")
-        # Exportar a Excel con manejo de error si falta openpyxl
-        try:
-            schedule_df.to_excel('mortgage_summary.xlsx', index=False)
-            print("Cronograma exportado a 'mortgage_summary.xlsx'")
-        except ImportError:
-            print("Advertencia: No se pudo exportar a Excel porque falta el módulo 'openpyxl'. Instálalo con 'pip install openpyxl'.")
+        # Exportar en los formatos configurados (CSV y Excel por defecto)
+        print()
+        export_schedule(schedule_df, 'mortgage_summary', 'summary')
         
         # Generar gráfico
-        plot_summary(schedule_df)
-        print("Gráfico generado en 'mortgage_summary.png'")
+        with stage('plot', flow='summary'):
+            from prepago_plots import plot_summary
+            path = plot_summary(schedule_df, plot_path('mortgage_summary'))
+        print(f"Gráfico generado en '{path}'")
     
     except ValueError as e:
         print(f"Error: {e}")
@@ -267,66 +177,6 @@ def mortgage_summary():
         print(f"Error inesperado: {e}")
 
 
-def prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date=None):
-    """
-    Genera cronograma de amortización con prepagos periódicos según límite anual y frecuencia.
-    """
-    monthly_rate = calculate_monthly_rate(annual_rate)
-    schedule = []
-    remaining_principal = principal * 1000  # Mantener escala en miles de UF
-    month = 0
-    total_interest = 0
-    total_amortization = 0
-
-    prepayment_amount = annual_limit * 1000 / (12 // frequency_months)
-    prepayments = {}
-    for i in range(frequency_months, total_months + 1, frequency_months):
-        prepayments[i] = min(prepayment_amount, remaining_principal)
-
-    while remaining_principal > 0 and month < total_months:
-        month += 1
-        interest = remaining_principal * monthly_rate
-        monthly_payment = french_amortization(remaining_principal, monthly_rate, total_months - month + 1)
-        capital_payment = min(monthly_payment - interest, remaining_principal)
-        total_payment = capital_payment + interest
-
-        prepayment = prepayments.get(month, 0)
-        if prepayment > 0:
-            prepayment = min(prepayment, remaining_principal - capital_payment)
-            remaining_principal -= prepayment
-            total_amortization += prepayment
-
-        remaining_principal -= capital_payment
-        total_amortization += capital_payment
-        total_interest += interest
-
-        if total_amortization > principal * 1000:
-            total_amortization = principal * 1000
-
-        schedule.append({
-            'NRO de cuota': month,
-            'FECHA A PAGAR': start_date + pd.offsets.MonthBegin(month - 1) + pd.offsets.Day(9),
-            'Amortizacion parcial': round(capital_payment / 1000, 4),
-            'Acumulado Amortizacion': round(total_amortization / 1000, 4),
-            'INTERES parcial': round(interest / 1000, 4),
-            'Acumulado de Interes': round(total_interest / 1000, 4),
-            'TOTAL CUOTA mensual': round(total_payment / 1000, 4),
-            'Prepago': round(prepayment / 1000, 4),
-            'SALDO': round(max(remaining_principal, 0) / 1000, 4)
-        })
-
-        if remaining_principal <= 0:
-            break
-      
-    df = pd.DataFrame(schedule)
-    return df, {
-        'months_saved': total_months - month,
-        'interest_saved': round((french_amortization(principal * 1000, calculate_monthly_rate(annual_rate), total_months) * total_months - total_interest) / 1000, 4),
-        'new_monthly_payment': round(monthly_payment / 1000, 4),
-        'total_interest': round(total_interest / 1000, 4),
-        'total_amortization': round(total_amortization / 1000, 4)
-    }
-
 def prepayment_plan_summary():
     """Wrapper interactivo para el plan de prepago."""
     print("\n--- Plan de prepago modular ---")
@@ -338,14 +188,7 @@ def prepayment_plan_summary():
         annual_limit = float(input("Límite de prepago anual (UF): "))
         frequency_months = int(input("Frecuencia de prepago en meses (por ejemplo, 6 o 12): "))
 
-        if annual_limit <= 0:
-            raise ValueError("El límite anual debe ser mayor a 0.")
-        if frequency_months not in [6, 12]:
-            raise ValueError("Frecuencia de prepago debe ser 6 (semestral) o 12 (anual).")
-
-        start_date, _ = validate_inputs(principal, annual_rate, total_months, start_date)
-
-        schedule_df, metrics = prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
+        schedule_df, metrics = prepayment_flow(principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
 
         print("\nCronograma de Amortización (primeros 24 meses y últimos 5 meses):")
         print(schedule_df.head(24).to_string(index=False))
@@ -358,16 +201,12 @@ def prepayment_plan_summary():
         print(f"Intereses totales pagados (UF): {metrics['total_interest']:.4f}")
         print(f"Total amortización (UF): {metrics['total_amortization']:.4f}")
 
-        schedule_df.to_csv('mortgage_prepayment_plan.csv', index=False)
-        print("\nCronograma exportado a 'mortgage_prepayment_plan.csv'")
-        # Exportar a Excel con manejo de error si falta openpyxl
-        try:
-            schedule_df.to_excel('mortgage_prepayment_plan.xlsx', index=False)
-            print("Cronograma exportado a 'mortgage_prepayment_plan.xlsx'")
-        except ImportError:
-            print("Advertencia: No se pudo exportar a Excel porque falta el módulo 'openpyxl'. Instálalo con 'pip install openpyxl'.")
-        plot_simulation(schedule_df)
-        print("Gráficos generados en 'mortgage_simulation.png'")
+        print()
+        export_schedule(schedule_df, 'mortgage_prepayment_plan', 'prepayment_plan')
+        with stage('plot', flow='prepayment_plan'):
+            from prepago_plots import plot_simulation
+            path = plot_simulation(schedule_df, plot_path('mortgage_simulation'))
+        print(f"Gráficos generados en '{path}'")
 
     except ValueError as e:
         print(f"Error: {e}")
@@ -385,15 +224,15 @@ def compare_scenarios_and_plot():
         frequency_months = int(input("Frecuencia de prepago en meses (por ejemplo, 6 o 12): "))
         start_date = input("Fecha de inicio (YYYY-MM-DD, dejar en blanco para hoy): ").strip() or None
 
-        start_date_validated, _ = validate_inputs(principal, annual_rate, total_months, start_date)
-
         # Generar datos para ambos escenarios
-        df_no_prepayment, metrics_no_prepayment = generate_schedule(principal * 1000, annual_rate, total_months, prepayments=None, start_date=start_date_validated)
-        df_prepayment, metrics_prepayment = prepayment_plan(principal, annual_rate, total_months, annual_limit, frequency_months, start_date_validated)
+        (df_no_prepayment, metrics_no_prepayment), (df_prepayment, metrics_prepayment) = comparison_flow(
+            principal, annual_rate, total_months, annual_limit, frequency_months, start_date)
 
         # Generar y guardar el gráfico comparativo
-        plot_comparison(df_no_prepayment, df_prepayment)
-        print("\nGráfico de comparación de escenarios generado en 'mortgage_comparison.png'")
+        with stage('plot', flow='comparison'):
+            from prepago_plots import plot_comparison
+            path = plot_comparison(df_no_prepayment, df_prepayment, plot_path('mortgage_comparison'))
+        print(f"\nGráfico de comparación de escenarios generado en '{path}'")
         
         # Opcionalmente, mostrar un resumen comparativo en la consola
         print("\n--- Resumen Comparativo ---")
@@ -412,8 +251,402 @@ def compare_scenarios_and_plot():
         print(f"Error inesperado: {e}")
 
 
-def main():
+def portfolio_batch(input_path, output_path=None, chunk_size=None, workers=None, schedules_path=None, partition=False,
+                    store_path=None, plots_dir=None, plot_limit=None):
+    """Función 4: Simula una cartera completa desde CSV o Parquet."""
+    print("\n--- Simulación de Cartera ---")
+    try:
+        from prepago_batch import DEFAULT_CHUNK_SIZE, DEFAULT_PLOT_LIMIT, run_batch
+
+        start = datetime.now()
+        result, output_path, schedule_paths = run_batch(input_path, output_path, chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+                                                        workers=workers, schedules_path=schedules_path, partition=partition,
+                                                        store_path=store_path, plots_dir=plots_dir,
+                                                        plot_limit=plot_limit or DEFAULT_PLOT_LIMIT,
+                                                        plot_format=export_settings['plot_format'],
+                                                        uf_table=uf_indexation())
+        elapsed = (datetime.now() - start).total_seconds()
+
+        print(f"Créditos simulados: {len(result)} en {elapsed:.2f} s")
+        print(f"Meses ahorrados (promedio): {result['months_saved'].mean():.1f}")
+        print(f"Intereses ahorrados (total, miles de UF): {result['interest_saved'].sum():.4f}")
+        print(f"\nMétricas exportadas a '{output_path}'")
+        for path in schedule_paths:
+            print(f"{'Gráficos' if path == plots_dir else 'Cronogramas'} exportados a '{path}'")
+    except ImportError as e:
+        module = e.name or 'pyarrow'
+        print(f"Advertencia: No se pudo leer/escribir el archivo porque falta el módulo '{module}'. Instálalo con 'pip install {module}'.")
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def prepayment_optimizer(principal, annual_rate, total_months, annual_limits, frequencies, first_months,
+                         objective='interest_saved', top=10, output_path=None, workers=None):
+    """Función 5: Busca la mejor estrategia de prepago sobre una grilla de candidatos."""
+    print("\n--- Optimizador de Estrategias de Prepago ---")
+    try:
+        from prepago_optimizer import optimize_prepayments
+
+        validate_inputs(principal, annual_rate, total_months)
+        ranking, pareto = optimize_prepayments(principal, annual_rate, total_months, annual_limits, frequencies,
+                                               first_months, objective=objective, workers=workers)
+
+        print(f"\nCandidatos evaluados: {len(ranking)}")
+        print(f"\nMejores {top} estrategias ({objective}):")
+        print(ranking.head(top).to_string(index=False))
+        print(f"\nFrente de Pareto (UF prepagadas vs. intereses ahorrados): {len(pareto)} estrategias")
+        print(pareto.tail(top).to_string(index=False))
+
+        output_path = output_path or 'mortgage_optimizer.csv'
+        ranking.to_csv(output_path, index=False)
+        print(f"\nRanking exportado a '{output_path}'")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def monte_carlo_summary(principal, annual_rate, total_months, annual_limit, frequency_months, paths, model,
+                        invest_rates, output_path=None):
+    """Función 6: Distribución de resultados del prepago bajo tasas e inflación UF estocásticas."""
+    print("\n--- Simulación Monte Carlo ---")
+    try:
+        import pandas as pd
+        from prepago_montecarlo import monte_carlo
+
+        validate_inputs(principal, annual_rate, total_months)
+        summary, _ = monte_carlo(principal, annual_rate, total_months, annual_limit, frequency_months,
+                                 paths=paths, model=model, invest_rates=invest_rates)
+
+        print(f"\nTrayectorias simuladas: {paths}")
+        table = pd.DataFrame(summary).T
+        print(table.drop(columns='prob_positive', errors='ignore').to_string(float_format=lambda value: f"{value:.4f}"))
+        for rate in invest_rates:
+            probability = summary[f'prepay_advantage_{rate:g}']['prob_positive']
+            print(f"Probabilidad de que prepagar supere invertir al {rate:g}%: {probability:.1%}")
+
+        if output_path:
+            table.to_csv(output_path)
+            print(f"\nResumen exportado a '{output_path}'")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def benchmark_suite(quick=False, pattern=None, threshold=None, save=False, update_golden=False, repeat=5):
+    """Función 7: Mide tiempos contra la línea base y verifica paridad con los cronogramas golden."""
+    print("\n--- Benchmarks del Motor ---")
+    from prepago_bench import (BASELINE_PATH, DEFAULT_THRESHOLD, GOLDEN_PATH, check_golden, compare_timings,
+                               load_baseline, run_benchmarks, save_baseline, save_golden)
+
+    ok = True
+    if update_golden:
+        print(f"Cronogramas golden regenerados en '{save_golden()}'")
+    elif os.path.exists(GOLDEN_PATH):
+        failures = check_golden()
+        for failure in failures:
+            print(f"Error de paridad: {failure}")
+        print(f"Paridad golden: {'OK' if not failures else f'{len(failures)} diferencias'}")
+        ok = not failures
+    else:
+        print(f"Advertencia: no existe '{GOLDEN_PATH}'. Genérelo con --update-golden.")
+
+    timings = run_benchmarks(quick=quick, pattern=pattern, repeat=repeat)
+    baseline = load_baseline()
+    threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+    report = compare_timings(timings, baseline, threshold)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+
+    if save:
+        print(f"\nLínea base guardada en '{save_baseline({**(baseline or {}), **timings})}'")
+    elif baseline is None:
+        print(f"\nAdvertencia: no existe '{BASELINE_PATH}'. Guárdela con --save-baseline.")
+    else:
+        regressions = report[report['regression']]
+        for _, row in regressions.iterrows():
+            print(f"Regresión: {row['benchmark']} es {row['ratio']:.2f}x la línea base (umbral {1 + threshold:.2f}x)")
+        ok = ok and regressions.empty
+    return ok
+
+def loan_solver(principal, annual_rate, total_months, paid_months=0, annual_limit=None, frequency_months=12,
+                target_month=None, refinance_cost=None, new_term=None):
+    """Función 8: Saldo tras k cuotas, mes de pago total, prepago requerido y tasa de equilibrio."""
+    print("\n--- Solver de Prepago y Refinanciamiento ---")
+    try:
+        import numpy as np
+        from prepago_solver import (break_even_rate, loan_position, payoff_month, required_frequency,
+                                    required_prepayment)
+
+        validate_inputs(principal, annual_rate, total_months)
+        position = loan_position(principal, annual_rate, total_months, paid_months)
+        print(f"\nTras {paid_months} cuotas (sin prepagos):")
+        print(f"Saldo pendiente (UF): {float(position['balance']):.4f}")
+        print(f"Intereses pagados (UF): {float(position['paid_interest']):.4f}")
+        print(f"Capital amortizado (UF): {float(position['paid_principal']):.4f}")
+
+        if annual_limit:
+            month = int(payoff_month(principal, annual_rate, total_months, annual_limit, frequency_months))
+            print(f"\nCon {annual_limit:g} UF al año cada {frequency_months} meses, el crédito termina en el mes {month} "
+                  f"({total_months - month} meses ahorrados)")
+        if target_month:
+            limit = float(required_prepayment(principal, annual_rate, total_months, frequency_months, target_month))
+            if np.isnan(limit):
+                print(f"\nNo hay prepagos cada {frequency_months} meses antes del mes {target_month}")
+            else:
+                print(f"\nPara terminar en el mes {target_month} con prepagos cada {frequency_months} meses: "
+                      f"{limit:.4f} UF al año")
+            if annual_limit:
+                frequency = int(required_frequency(principal, annual_rate, total_months, annual_limit, target_month))
+                print(f"Con {annual_limit:g} UF al año: " + (f"prepagar cada {frequency} meses" if frequency
+                                                              else "ninguna frecuencia alcanza el objetivo"))
+        if refinance_cost is not None:
+            rate = float(break_even_rate(principal, annual_rate, total_months, paid_months, refinance_cost, new_term))
+            term = new_term or total_months - paid_months
+            if np.isnan(rate):
+                print(f"\nRefinanciar con un costo de {refinance_cost:g} UF no conviene a ninguna tasa")
+            else:
+                print(f"\nRefinanciar a {term} meses con un costo de {refinance_cost:g} UF conviene bajo {rate:.4f}% anual")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def store_lookup(store_path, loan_id=None, month=None, column='SALDO'):
+    """Función 9: Consulta el cronograma de un crédito o un mes de toda la cartera en un almacén."""
+    print("\n--- Consulta del Almacén de Resultados ---")
+    try:
+        from prepago_store import open_store
+
+        store = open_store(store_path)
+        print(f"Almacén: {len(store)} créditos, horizonte de {store.meta['horizon']} meses")
+        if loan_id is not None and month is not None:
+            print(f"Crédito {loan_id}, mes {month}, '{column}' (miles de UF): {store.value(loan_id, month, column):.4f}")
+        elif loan_id is not None:
+            print(f"\nCronograma del crédito {loan_id}:")
+            print(store.to_frame(loan_id).to_string(index=False))
+        elif month is not None:
+            values = store.month(month, column)
+            print(f"Mes {month}, '{column}' (miles de UF): total {values.sum():.4f}, "
+                  f"promedio {values.mean():.4f}, créditos vigentes {(store.months_paid >= month).sum()}")
+        else:
+            print("Indique --loan, --month o ambos.")
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def sensitivity_analysis(principal, annual_rates, terms, annual_limits, frequency_months=12,
+                         metrics=('total_interest', 'months_saved'), output_path=None):
+    """Función 10: Grilla tasa × plazo × límite de prepago con heatmaps PNG por métrica."""
+    print("\n--- Análisis de Sensibilidad ---")
+    try:
+        from prepago_sensitivity import GRID_METRICS, grid_frame, sensitivity_grid
+
+        invalid = [metric for metric in metrics if metric not in GRID_METRICS]
+        if invalid:
+            raise ValueError(f"Métrica inválida: {', '.join(invalid)}. Use una de: {', '.join(GRID_METRICS)}.")
+        start = datetime.now()
+        with stage('sensitivity'):
+            grid = sensitivity_grid(principal, annual_rates, terms, annual_limits, frequency_months)
+        elapsed = (datetime.now() - start).total_seconds()
+        shape = grid['total_interest'].shape
+        print(f"Grilla de {shape[0]} tasas × {shape[1]} plazos × {shape[2]} límites "
+              f"({grid['total_interest'].size} escenarios) en {elapsed:.3f} s")
+        print(f"Meses ahorrados: máximo {grid['months_saved'].max()}, promedio {grid['months_saved'].mean():.1f}")
+
+        with stage('plot', flow='sensitivity'):
+            from prepago_plots import plot_sensitivity
+            for metric in metrics:
+                path = plot_sensitivity(grid, metric, plot_path(f'mortgage_sensitivity_{metric}'))
+                print(f"Heatmap de '{metric}' generado en '{path}'")
+        if output_path:
+            grid_frame(grid).to_csv(output_path, index=False)
+            print(f"\nGrilla exportada a '{output_path}'")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error inesperado: {e}")
+
+def __getattr__(name):
+    """Compatibilidad: `prepago_revC.generate_schedule`, `prepago_revC.plot_summary`, etc. cargan su módulo al pedirse."""
+    if name not in LAZY_EXPORTS:
+        raise AttributeError(f"module 'prepago_revC' has no attribute '{name}'")
+    return getattr(importlib.import_module(LAZY_EXPORTS[name]), name)
+
+def parse_int_list(text):
+    """Convertir '1-12' o '3,6,12' en una lista de enteros."""
+    values = []
+    for part in text.split(','):
+        low, _, high = part.partition('-')
+        values.extend(range(int(low), int(high or low) + 1))
+    return values
+
+def parse_export_formats(text):
+    """Convertir 'csv,xlsx' en la lista de formatos de exportación."""
+    formats = [value.strip().lower() for value in text.split(',') if value.strip()]
+    invalid = [value for value in formats if value not in EXPORT_FORMATS]
+    if invalid:
+        raise argparse.ArgumentTypeError(f"Formato inválido: {', '.join(invalid)}. Use: {', '.join(EXPORT_FORMATS)}.")
+    return formats
+
+def parse_axis(text):
+    """Convertir '3:7:50' (inicio:fin:cantidad) o '3,4.5,6' en los valores de un eje de la grilla."""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return [float(start) + (float(stop) - float(start)) * i / max(int(count) - 1, 1) for i in range(int(count))]
+    return [float(value) for value in text.split(',')]
+
+def build_parser():
+    """Definir los subcomandos no interactivos de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Simulador de Crédito Hipotecario")
+    parser.add_argument('--profile', help="Registrar tiempo, filas y memoria por etapa en este archivo JSON")
+    parser.add_argument('--profile-format', choices=['json', 'chrome'], help="Formato del perfil (por defecto json)")
+    parser.add_argument('--output-dir', help="Directorio de los cronogramas y gráficos del menú (por defecto, el actual)")
+    parser.add_argument('--formats', type=parse_export_formats, default=['csv', 'xlsx'],
+                        help="Formatos de exportación del menú separados por coma: csv, xlsx, parquet, arrow")
+    parser.add_argument('--plot-format', choices=['png', 'svg', 'pdf', 'jpg'], default='png',
+                        help="Formato de imagen de los gráficos (por defecto png)")
+    parser.add_argument('--uf', help="Serie diaria de la UF (.csv o .parquet, columnas date y uf) para agregar montos en pesos")
+    parser.add_argument('--uf-value', type=float, help="Valor de la UF de hoy, si no hay serie diaria")
+    parser.add_argument('--uf-inflation', dest='uf_inflation', type=float, default=3.0,
+                        help="Inflación UF anual (%%) para proyectar fuera de la serie o desde --uf-value (por defecto 3)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    batch = subparsers.add_parser('batch', help="Simular una cartera de créditos desde CSV o Parquet")
+    batch.add_argument('input', help="Archivo de créditos (.csv o .parquet)")
+    batch.add_argument('-o', '--output', help="Archivo de métricas (.csv o .parquet, por defecto 'mortgage_portfolio.csv')")
+    batch.add_argument('--chunk-size', type=int, help="Créditos por bloque del pool de procesos")
+    batch.add_argument('--workers', type=int, help="Procesos del pool (1 para ejecutar en serie)")
+    batch.add_argument('--schedules', help="Exportar también los cronogramas por bloques (.csv, .xlsx, .parquet o .arrow)")
+    batch.add_argument('--partition', action='store_true', help="Un archivo de cronogramas por frecuencia de prepago")
+    batch.add_argument('--store', help="Directorio del almacén de cronogramas en memoria mapeada (ver 'lookup')")
+    batch.add_argument('--plots', help="Directorio de gráficos de saldo por crédito y de la cartera")
+    batch.add_argument('--plot-limit', type=int, help="Créditos a graficar con --plots (por defecto 100)")
+
+    optimize = subparsers.add_parser('optimize', help="Buscar la mejor estrategia de prepago")
+    optimize.add_argument('--principal', type=float, required=True, help="Monto del crédito (UF)")
+    optimize.add_argument('--rate', type=float, required=True, help="Tasa nominal anual (%%)")
+    optimize.add_argument('--months', type=int, required=True, help="Plazo en meses")
+    optimize.add_argument('--limits', type=lambda text: [float(value) for value in text.split(',')], required=True,
+                          help="Límites de prepago anual a evaluar (UF), separados por coma")
+    optimize.add_argument('--frequencies', type=parse_int_list, default=list(range(1, 13)),
+                          help="Frecuencias en meses, por ejemplo '1-12' o '6,12'")
+    optimize.add_argument('--first-months', type=parse_int_list, default=list(range(1, 13)),
+                          help="Meses candidatos del primer prepago, por ejemplo '1-24'")
+    optimize.add_argument('--objective', choices=['interest_saved', 'months_per_uf'], default='interest_saved')
+    optimize.add_argument('--top', type=int, default=10, help="Estrategias a mostrar")
+    optimize.add_argument('-o', '--output', help="Archivo CSV del ranking (por defecto 'mortgage_optimizer.csv')")
+    optimize.add_argument('--workers', type=int, help="Procesos del pool (1 para ejecutar en serie)")
+
+    montecarlo = subparsers.add_parser('montecarlo', help="Simular tasas e inflación UF estocásticas")
+    montecarlo.add_argument('--principal', type=float, required=True, help="Monto del crédito (UF)")
+    montecarlo.add_argument('--rate', type=float, required=True, help="Tasa nominal anual inicial (%%)")
+    montecarlo.add_argument('--months', type=int, required=True, help="Plazo en meses")
+    montecarlo.add_argument('--limit', type=float, required=True, help="Límite de prepago anual (UF)")
+    montecarlo.add_argument('--frequency', type=int, default=12, help="Frecuencia de prepago en meses")
+    montecarlo.add_argument('--paths', type=int, default=10000, help="Número de trayectorias")
+    montecarlo.add_argument('--seed', type=int, default=0, help="Semilla del generador aleatorio")
+    montecarlo.add_argument('--fixed-months', type=int, default=60, help="Meses a tasa fija antes del primer reajuste")
+    montecarlo.add_argument('--reset-months', type=int, default=12, help="Meses entre reajustes de tasa")
+    montecarlo.add_argument('--rate-volatility', type=float, default=1.0, help="Volatilidad anual de la tasa (pp)")
+    montecarlo.add_argument('--inflation', type=float, default=3.0, help="Inflación UF anual esperada (%%)")
+    montecarlo.add_argument('--inflation-volatility', type=float, default=1.0, help="Volatilidad anual de la inflación UF (%%)")
+    montecarlo.add_argument('--invest-rates', type=lambda text: [float(value) for value in text.split(',')], default=[5.0],
+                            help="Rentabilidades alternativas a comparar (%%), separadas por coma")
+    montecarlo.add_argument('-o', '--output', help="Archivo CSV con el resumen estadístico")
+
+    subparsers.add_parser('stream', help="Procesar solicitudes JSON por línea desde stdin (NDJSON)")
+
+    serve = subparsers.add_parser('serve', help="Servicio HTTP local para la interfaz web (index.html)")
+    serve.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (por defecto 127.0.0.1)")
+    serve.add_argument('--port', type=int, default=8000, help="Puerto de escucha (por defecto 8000)")
+
+    bench = subparsers.add_parser('bench', help="Benchmarks del motor con paridad contra cronogramas golden")
+    bench.add_argument('--quick', action='store_true', help="Solo plazo de 360 meses y cartera de 1000 créditos")
+    bench.add_argument('--filter', help="Medir solo los benchmarks cuyo nombre contiene este texto")
+    bench.add_argument('--threshold', type=float, help="Aumento relativo tolerado antes de fallar (por defecto 0.30)")
+    bench.add_argument('--repeat', type=int, default=5, help="Rondas de medición por benchmark (se usa la mejor)")
+    bench.add_argument('--save-baseline', action='store_true', help="Guardar los tiempos medidos como línea base")
+    bench.add_argument('--update-golden', action='store_true', help="Regenerar los cronogramas golden (cambio intencional)")
+
+    solve = subparsers.add_parser('solve', help="Saldo tras k cuotas, prepago requerido y tasa de equilibrio")
+    solve.add_argument('--principal', type=float, required=True, help="Monto del crédito (UF)")
+    solve.add_argument('--rate', type=float, required=True, help="Tasa nominal anual (%%)")
+    solve.add_argument('--months', type=int, required=True, help="Plazo en meses")
+    solve.add_argument('--paid-months', type=int, default=0, help="Cuotas ya pagadas")
+    solve.add_argument('--limit', type=float, help="Límite de prepago anual (UF) para calcular el mes de pago total")
+    solve.add_argument('--frequency', type=int, default=12, help="Frecuencia de prepago en meses")
+    solve.add_argument('--target-month', type=int, help="Mes en que se quiere terminar de pagar")
+    solve.add_argument('--refinance-cost', type=float, help="Costo de refinanciar (UF) para la tasa de equilibrio")
+    solve.add_argument('--new-term', type=int, help="Plazo del refinanciamiento (por defecto, el plazo restante)")
+
+    lookup = subparsers.add_parser('lookup', help="Consultar un almacén de cronogramas creado con 'batch --store'")
+    lookup.add_argument('store', help="Directorio del almacén")
+    lookup.add_argument('--loan', help="Identificador del crédito")
+    lookup.add_argument('--month', type=int, help="Mes a consultar (desde 1)")
+    lookup.add_argument('--column', default='SALDO', help="Columna: 'Amortizacion parcial', 'INTERES parcial', 'Prepago' o 'SALDO'")
+
+    sensitivity = subparsers.add_parser('sensitivity', help="Grilla tasa × plazo × límite de prepago con heatmaps")
+    sensitivity.add_argument('--principal', type=float, required=True, help="Monto del crédito (UF)")
+    sensitivity.add_argument('--rates', type=parse_axis, default='2:8:50',
+                             help="Tasas anuales (%%): 'inicio:fin:cantidad' o lista separada por coma")
+    sensitivity.add_argument('--terms', type=parse_axis, default='120:480:40', help="Plazos en meses, mismo formato")
+    sensitivity.add_argument('--limits', type=parse_axis, default='0:400:20', help="Límites anuales de prepago (UF)")
+    sensitivity.add_argument('--frequency', type=int, default=12, help="Frecuencia de prepago en meses")
+    sensitivity.add_argument('--metrics', type=lambda text: text.split(','), default=['total_interest', 'months_saved'],
+                             help="Métricas a graficar, separadas por coma")
+    sensitivity.add_argument('-o', '--output', help="Archivo CSV con la grilla en formato largo")
+    return parser
+
+def main(argv=None):
     """Menú principal para seleccionar la función."""
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from prepago_profile import configure
+        configure(args.profile, args.profile_format)
+    export_settings.update(output_dir=args.output_dir, formats=args.formats, plot_format=args.plot_format,
+                           uf_path=args.uf, uf_value=args.uf_value, uf_inflation=args.uf_inflation)
+    if args.command == 'batch':
+        portfolio_batch(args.input, args.output, args.chunk_size, args.workers, args.schedules, args.partition, args.store,
+                        args.plots, args.plot_limit)
+        return
+    if args.command == 'optimize':
+        prepayment_optimizer(args.principal, args.rate, args.months, args.limits, args.frequencies, args.first_months,
+                             args.objective, args.top, args.output, args.workers)
+        return
+    if args.command == 'montecarlo':
+        model = {'seed': args.seed, 'fixed_months': args.fixed_months, 'reset_months': args.reset_months,
+                 'rate_volatility': args.rate_volatility, 'inflation_mean': args.inflation,
+                 'inflation_volatility': args.inflation_volatility}
+        monte_carlo_summary(args.principal, args.rate, args.months, args.limit, args.frequency, args.paths, model,
+                            args.invest_rates, args.output)
+        return
+    if args.command == 'stream':
+        from prepago_stream import run_stream
+        run_stream()
+        return
+    if args.command == 'serve':
+        from prepago_server import run_server
+        run_server(args.host, args.port)
+        return
+    if args.command == 'bench':
+        if not benchmark_suite(args.quick, args.filter, args.threshold, args.save_baseline, args.update_golden, args.repeat):
+            raise SystemExit(1)
+        return
+    if args.command == 'solve':
+        loan_solver(args.principal, args.rate, args.months, args.paid_months, args.limit, args.frequency,
+                    args.target_month, args.refinance_cost, args.new_term)
+        return
+    if args.command == 'lookup':
+        store_lookup(args.store, args.loan, args.month, args.column)
+        return
+    if args.command == 'sensitivity':
+        sensitivity_analysis(args.principal, args.rates, args.terms, args.limits, args.frequency, args.metrics,
+                             args.output)
+        return
+
     print("\n=== Simulador de Crédito Hipotecario ===")
     print("¿Qué función desea utilizar?")
     print("1. Resumen de tu crédito hipotecario actual")
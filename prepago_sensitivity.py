@@ -0,0 +1,76 @@
+"""
+Análisis de sensibilidad: tasa × plazo × límite de prepago como arreglos N-dimensionales.
+
+Los ejes se combinan por broadcasting de NumPy (tasas en el eje 0, plazos en el eje 1 y límites
+anuales en el eje 2). La cuota y los intereses sin prepago salen en forma cerrada de
+`calculate_monthly_rate` y `french_amortization` sobre la grilla tasa × plazo; solo el escenario
+con prepago recorre la recurrencia, y la recorre tramo a tramo entre prepagos para toda la grilla a
+la vez (`prepago_solver.plan_metrics`). Montos en UF, semántica de `prepayment_plan`.
+"""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_solver import plan_metrics
+
+AXES = ['annual_rate', 'total_months', 'annual_limit']
+
+# Métricas de la grilla y sus ejes
+GRID_METRICS = {
+    'monthly_payment': ['annual_rate', 'total_months'],
+    'baseline_interest': ['annual_rate', 'total_months'],
+    'total_interest': AXES,
+    'interest_reduction': AXES,
+    'months_saved': AXES,
+    'total_prepaid': AXES
+}
+
+# Funciones de Cálculo
+def sensitivity_grid(principal, annual_rates, terms, annual_limits, frequency_months=12):
+    """
+    Calcular las métricas de la grilla y devolverlas con sus ejes.
+
+    `monthly_payment` y `baseline_interest` (sin prepago) tienen forma (tasas, plazos); el resto,
+    (tasas, plazos, límites). `interest_reduction` es la diferencia de intereses totales entre el
+    escenario sin prepago y con prepago.
+    """
+    axes = {
+        'annual_rate': np.asarray(annual_rates, dtype=float),
+        'total_months': np.asarray(terms, dtype=float).round().astype(np.int64),
+        'annual_limit': np.asarray(annual_limits, dtype=float)
+    }
+    if principal <= 0:
+        raise ValueError("El monto/capital debe ser mayor a 0.")
+    if any(values.ndim != 1 or values.size == 0 for values in axes.values()):
+        raise ValueError("Cada eje de la grilla debe ser una lista no vacía de valores.")
+    if (axes['annual_rate'] <= 0).any() or (axes['total_months'] <= 0).any() or (axes['annual_limit'] < 0).any():
+        raise ValueError("Las tasas y plazos deben ser mayores a 0 y los límites no pueden ser negativos.")
+
+    rates = axes['annual_rate'][:, None, None]
+    terms = axes['total_months'][None, :, None]
+    limits = axes['annual_limit'][None, None, :]
+    payment = french_amortization(principal, calculate_monthly_rate(rates), terms)
+    baseline_interest = payment * terms - principal
+    plan = plan_metrics(principal, rates, terms, limits, frequency_months)
+    return {
+        'axes': axes,
+        'principal': principal,
+        'frequency_months': frequency_months,
+        'monthly_payment': payment[:, :, 0],
+        'baseline_interest': baseline_interest[:, :, 0],
+        'total_interest': plan['total_interest'],
+        'interest_reduction': baseline_interest - plan['total_interest'],
+        'months_saved': terms - plan['months_paid'],
+        'total_prepaid': plan['total_prepaid']
+    }
+
+def grid_frame(grid):
+    """Grilla en formato largo: una fila por combinación tasa × plazo × límite."""
+    axes = grid['axes']
+    index = pd.MultiIndex.from_product([axes[name] for name in AXES], names=AXES)
+    shape = tuple(axes[name].size for name in AXES)
+    return pd.DataFrame({metric: np.broadcast_to(grid[metric] if len(names) == 3 else grid[metric][:, :, None],
+                                                 shape).ravel()
+                         for metric, names in GRID_METRICS.items()}, index=index).reset_index()
@@ -0,0 +1,254 @@
+"""
+Servicio HTTP local (asyncio) que expone el motor de `prepago_revC.py` a `index.html`.
+
+POST /api/summary, /api/prepayment_plan y /api/comparison reciben un JSON con los mismos campos
+del modo streaming (`prepago_stream.py`) y responden NDJSON con codificación chunked:
+primero un registro `metrics` por escenario, luego registros `rows` con el cronograma por
+bloques de `ROWS_PER_CHUNK` cuotas y al final `{"type": "end"}`. Así el gráfico puede dibujar
+las primeras cuotas antes de que el cronograma completo se haya serializado y enviado.
+
+Las respuestas terminadas se guardan en una caché LRU compartida por todos los clientes, y
+las solicitudes idénticas que llegan mientras otra está en curso se suman a la misma respuesta
+en vez de recalcularla.
+"""
+
+# Importaciones
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+
+from prepago_stream import FLOWS, flow_scenarios, json_value, schedule_columns
+
+ROWS_PER_CHUNK = 60
+RESPONSE_CACHE_SIZE = 256
+MAX_BODY_BYTES = 64 * 1024
+STATIC_FILES = {
+    '/': ('index.html', 'text/html; charset=utf-8'),
+    '/index.html': ('index.html', 'text/html; charset=utf-8'),
+    '/scrip.js': ('scrip.js', 'application/javascript; charset=utf-8'),
+    '/style.css': ('style.css', 'text/css; charset=utf-8')
+}
+STATUS_TEXT = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+_response_cache = OrderedDict()
+_in_flight = {}
+
+# Respuestas Compartidas
+class SharedResponse:
+    """Respuesta NDJSON en construcción que varios clientes pueden leer mientras se genera."""
+
+    def __init__(self):
+        self.status = 200
+        self.chunks = []
+        self.done = False
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def append(self, record):
+        self.chunks.append((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._notify()
+
+    def close(self):
+        self.done = True
+        self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def stream(self):
+        """Entregar los bloques ya generados y luego esperar los siguientes hasta el cierre."""
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                return
+            await changed.wait()
+
+def resolve_start_date(request):
+    """Solicitud con la fecha de inicio explícita: sin `start_date`, la fecha de hoy."""
+    return {**request, 'start_date': request.get('start_date') or datetime.now().date().isoformat()}
+
+def request_key(flow, request):
+    """
+    Clave normalizada de la solicitud, para la caché y la agrupación de solicitudes en curso.
+
+    La fecha de inicio por defecto se resuelve antes de armar la clave: una solicitud sin
+    `start_date` no reutiliza después de medianoche un cronograma fechado el día anterior.
+    """
+    request = resolve_start_date(request)
+    key = (flow, float(request['principal']), float(request['annual_rate']), int(request['total_months']),
+           request['start_date'], bool(request.get('schedule', True)))
+    if flow == 'summary':
+        key += (int(request.get('paid_months') or 0),)
+    else:
+        key += (float(request['annual_limit']), int(request['frequency_months']))
+    return key
+
+async def produce_response(request, response):
+    """Calcular el flujo en un hilo aparte y publicar métricas y cronograma por bloques."""
+    loop = asyncio.get_running_loop()
+    try:
+        scenarios = await loop.run_in_executor(None, flow_scenarios, request)
+    except KeyError as e:
+        response.status = 400
+        response.append({'type': 'error', 'error': f"Falta el campo {e}."})
+    except ValueError as e:
+        response.status = 400
+        response.append({'type': 'error', 'error': str(e)})
+    except Exception as e:
+        response.status = 500
+        response.append({'type': 'error', 'error': f"Error inesperado: {e}"})
+    else:
+        # Un fallo a mitad del envío queda como registro de error (y fuera de la caché, por el estado)
+        try:
+            for name, (df, metrics) in scenarios.items():
+                response.append({'type': 'metrics', 'scenario': name, 'rows': len(df),
+                                 'metrics': {metric: json_value(value) for metric, value in metrics.items()}})
+            if request.get('schedule', True):
+                longest = max(len(df) for df, _ in scenarios.values())
+                for start in range(0, longest, ROWS_PER_CHUNK):
+                    for name, (df, _) in scenarios.items():
+                        if start < len(df):
+                            response.append({'type': 'rows', 'scenario': name, 'start': start,
+                                             'schedule': schedule_columns(df.iloc[start:start + ROWS_PER_CHUNK])})
+                    # Ceder el control para que los bloques ya listos se envíen antes de serializar el resto
+                    await asyncio.sleep(0)
+            response.append({'type': 'end'})
+        except Exception as e:
+            response.status = 500
+            response.append({'type': 'error', 'error': f"Error inesperado: {e}"})
+    finally:
+        response.close()
+
+def finish_response(key, response):
+    """Mover una respuesta terminada de las solicitudes en curso a la caché LRU."""
+    _in_flight.pop(key, None)
+    if response.status == 200:
+        _response_cache[key] = response
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+def shared_response(flow, request):
+    """Respuesta en caché, la misma respuesta en curso o una nueva si la solicitud no se ha visto."""
+    request = resolve_start_date(request)
+    key = request_key(flow, request)
+    if key in _response_cache:
+        _response_cache.move_to_end(key)
+        return _response_cache[key]
+    if key in _in_flight:
+        return _in_flight[key]
+
+    response = SharedResponse()
+    _in_flight[key] = response
+    response.task = asyncio.ensure_future(produce_response({**request, 'flow': flow}, response))
+    response.task.add_done_callback(lambda _: finish_response(key, response))
+    return response
+
+# Protocolo HTTP
+def response_head(status, headers):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+    lines += [f"{name}: {value}" for name, value in {**CORS_HEADERS, 'Connection': 'close', **headers}.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+async def send_body(writer, status, body=b'', content_type='application/json; charset=utf-8'):
+    writer.write(response_head(status, {'Content-Type': content_type, 'Content-Length': len(body)}) + body)
+    await writer.drain()
+
+async def send_error(writer, status, message):
+    body = json.dumps({'type': 'error', 'error': message}, ensure_ascii=False) + '\n'
+    await send_body(writer, status, body.encode('utf-8'))
+
+async def send_stream(writer, response):
+    """Enviar una respuesta compartida con Transfer-Encoding chunked, bloque a bloque."""
+    started = False
+    async for chunk in response.stream():
+        if not started:
+            writer.write(response_head(response.status, {'Content-Type': 'application/x-ndjson; charset=utf-8',
+                                                         'Transfer-Encoding': 'chunked'}))
+            started = True
+        writer.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+        await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+async def read_request(reader):
+    """Leer línea de solicitud, encabezados y cuerpo de una solicitud HTTP/1.1."""
+    method, target, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        return method, target.split('?', 1)[0], None
+    return method, target.split('?', 1)[0], await reader.readexactly(length)
+
+async def handle_connection(reader, writer):
+    """Atender una conexión: archivos estáticos de la interfaz o flujos de cálculo en /api/."""
+    try:
+        try:
+            method, path, body = await read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError):
+            await send_error(writer, 400, "Solicitud HTTP inválida.")
+            return
+
+        if method == 'OPTIONS':
+            writer.write(response_head(204, {'Content-Length': 0}))
+            await writer.drain()
+        elif path.startswith('/api/'):
+            flow = path[len('/api/'):]
+            if flow not in FLOWS:
+                await send_error(writer, 404, f"Flujo inválido: '{flow}'. Use uno de: {', '.join(FLOWS)}.")
+            elif method != 'POST':
+                await send_error(writer, 405, "Use POST con un cuerpo JSON.")
+            elif body is None:
+                await send_error(writer, 413, "El cuerpo de la solicitud es demasiado grande.")
+            else:
+                try:
+                    request = json.loads(body or b'{}')
+                    response = shared_response(flow, request)
+                except KeyError as e:
+                    await send_error(writer, 400, f"Falta el campo {e}.")
+                except (ValueError, TypeError, AttributeError) as e:
+                    await send_error(writer, 400, f"Solicitud inválida: {e}")
+                else:
+                    await send_stream(writer, response)
+        elif method == 'GET' and path in STATIC_FILES:
+            name, content_type = STATIC_FILES[path]
+            with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as file:
+                await send_body(writer, 200, file.read(), content_type)
+        else:
+            await send_error(writer, 404, "Recurso no encontrado.")
+    except ConnectionError:
+        pass  # El cliente cerró la conexión; la respuesta compartida sigue disponible para los demás
+    finally:
+        writer.close()
+
+# Punto de Entrada
+async def serve(host='127.0.0.1', port=8000):
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"Servidor disponible en http://{host}:{port}/ (Ctrl+C para detener)")
+    async with server:
+        await server.serve_forever()
+
+def run_server(host='127.0.0.1', port=8000):
+    """Iniciar el servicio HTTP hasta que se interrumpa con Ctrl+C."""
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        print("\nServidor detenido.")
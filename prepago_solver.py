@@ -0,0 +1,216 @@
+"""
+Solvers inversos sobre las funciones de salto del método francés, vectorizados por crédito.
+
+Responden preguntas como "¿cuánto debo prepagar al año para terminar en el mes 180?" sin simular
+mes a mes ni repetir `prepayment_plan` con valores de prueba. Todos los argumentos aceptan escalares
+o arreglos (se combinan por broadcasting), de modo que una cartera completa se resuelve de una vez.
+
+Entre dos prepagos de un plan la cuota se recalcula sobre el plazo restante, así que el saldo tras
+un tramo de f meses con n meses restantes es b·((1+r)^n - (1+r)^f) / ((1+r)^n - 1). Con un monto
+A por prepago, el saldo justo antes del prepago i es lineal en A (alpha_i - beta_i·A): el plan se
+resuelve recorriendo solo los meses de prepago, y el monto requerido queda en forma cerrada.
+Montos en UF y semántica de `prepayment_plan` (monto por prepago de `plan_prepayment`).
+"""
+
+# Importaciones
+import numpy as np
+
+from prepago_core import (calculate_monthly_rate, cumulative_interest, cumulative_principal, french_amortization,
+                          plan_prepayment, remaining_balance)
+
+BISECTION_STEPS = 60
+MAX_ANNUAL_RATE = 100.0
+
+# Funciones de Salto
+def loan_position(principal, annual_rate, total_months, paid_months):
+    """Saldo, capital e intereses pagados y meses restantes tras `paid_months` cuotas, sin prepagos."""
+    principal, annual_rate, total_months, paid_months = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+        np.asarray(total_months, dtype=np.int64), np.asarray(paid_months, dtype=np.int64))
+    if (paid_months < 0).any() or (paid_months > total_months).any():
+        raise ValueError("Los meses pagados deben estar entre 0 y el plazo total.")
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    return {
+        'monthly_payment': french_amortization(principal, monthly_rate, total_months),
+        'balance': remaining_balance(principal, monthly_rate, total_months, paid_months),
+        'paid_principal': cumulative_principal(principal, monthly_rate, total_months, paid_months),
+        'paid_interest': cumulative_interest(principal, monthly_rate, total_months, paid_months),
+        'remaining_months': total_months - paid_months
+    }
+
+def segment_factor(monthly_rate, remaining_months, months):
+    """Fracción del saldo que queda tras `months` cuotas recalculadas sobre `remaining_months` meses."""
+    growth = 1 + monthly_rate
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return (growth ** remaining_months - growth ** months) / (growth ** remaining_months - 1)
+
+def plan_inputs(principal, annual_rate, total_months, frequency_months, *extra):
+    """Normalizar los argumentos de un plan a arreglos con la misma forma."""
+    arrays = np.broadcast_arrays(np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+                                 np.asarray(total_months, dtype=np.int64), np.asarray(frequency_months, dtype=np.int64),
+                                 *(np.asarray(value, dtype=float) for value in extra))
+    if (arrays[3] < 1).any() or (arrays[3] > 12).any():
+        raise ValueError("La frecuencia de prepago debe estar entre 1 y 12 meses.")
+    return arrays
+
+def plan_events(principal, annual_rate, total_months, frequency_months):
+    """
+    Recorrer los meses de prepago de cada crédito, generando (evento, mes, alpha, beta, activo).
+
+    alpha - beta·A es el saldo tras la cuota del mes de prepago y antes de prepagar A.
+    """
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    alpha, beta = principal.astype(float), np.zeros(principal.shape)
+    events = int((total_months // frequency_months).max(initial=0))
+    for event in range(1, events + 1):
+        month = event * frequency_months
+        active = month <= total_months
+        factor = np.where(active, segment_factor(monthly_rate, total_months - month + frequency_months,
+                                                 frequency_months), 1.0)
+        alpha = alpha * factor
+        beta = beta * factor
+        yield event, month, alpha, beta, active
+        beta = beta + 1
+
+def plan_metrics(principal, annual_rate, total_months, annual_limit, frequency_months):
+    """
+    Meses pagados, intereses totales y total prepagado del plan de `prepayment_plan` (UF).
+
+    Recorre los tramos entre prepagos para todos los créditos a la vez. (1+r)^(meses restantes) se
+    actualiza dividiendo por (1+r)^f en cada tramo, de modo que el ciclo no evalúa potencias; la
+    cuota y el saldo final de cada tramo salen de él en forma cerrada, y los intereses son lo pagado
+    en cuotas menos el capital que amortizaron. Los créditos ya pagados salen del ciclo.
+    """
+    principal, annual_rate, total_months, frequency_months, annual_limit = plan_inputs(
+        principal, annual_rate, total_months, frequency_months, annual_limit)
+    shape = principal.shape
+    monthly_rate = calculate_monthly_rate(annual_rate.ravel())
+    months, frequency = total_months.ravel(), frequency_months.ravel()
+    amount = plan_prepayment(annual_limit.ravel(), frequency)
+    step = (1 + monthly_rate) ** frequency
+    remaining_growth = (1 + monthly_rate) ** months
+    balance = principal.ravel()
+    month = np.zeros(balance.size, dtype=np.int64)
+    paid, prepaid = np.zeros(balance.size), np.zeros(balance.size)
+    loans = np.arange(balance.size)
+    result = {'months_paid': months.copy(), 'total_payments': np.zeros(balance.size), 'total_prepaid': np.zeros(balance.size)}
+
+    while loans.size:
+        full = months - month >= frequency
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payment = balance * monthly_rate * remaining_growth / (remaining_growth - 1)
+            # Un tramo final más corto que la frecuencia termina de pagar el crédito
+            end = np.where(full, balance * (remaining_growth - step) / (remaining_growth - 1), 0)
+        length = np.where(full, frequency, months - month)
+        paid += length * payment
+        month += length
+        prepayment = np.where(full, np.minimum(amount, end), 0)
+        prepaid += prepayment
+        paid_off = (prepayment > 0) & (amount >= end)
+        balance = end - prepayment
+        remaining_growth = remaining_growth / step
+
+        done = paid_off | (month >= months)
+        if done.any():
+            finished = loans[done]
+            result['months_paid'][finished] = month[done]
+            result['total_payments'][finished] = paid[done]
+            result['total_prepaid'][finished] = prepaid[done]
+            keep = ~done
+            loans, months, frequency, amount, step, monthly_rate = (
+                loans[keep], months[keep], frequency[keep], amount[keep], step[keep], monthly_rate[keep])
+            remaining_growth, balance, month, paid, prepaid = (
+                remaining_growth[keep], balance[keep], month[keep], paid[keep], prepaid[keep])
+
+    total_prepaid = result['total_prepaid'].reshape(shape)
+    return {'months_paid': result['months_paid'].reshape(shape),
+            'total_interest': result['total_payments'].reshape(shape) + total_prepaid - principal,
+            'total_prepaid': total_prepaid}
+
+# Solvers Inversos
+def payoff_month(principal, annual_rate, total_months, annual_limit, frequency_months):
+    """
+    Mes de pago total del crédito con el plan de `prepayment_plan` (el plazo si nunca se adelanta).
+
+    Equivale a total_months - months_saved, pero solo evalúa los meses de prepago.
+    """
+    principal, annual_rate, total_months, frequency_months, annual_limit = plan_inputs(
+        principal, annual_rate, total_months, frequency_months, annual_limit)
+    amount = plan_prepayment(annual_limit, frequency_months)
+    months = total_months
+    pending = amount > 0
+    for _, month, alpha, beta, active in plan_events(principal, annual_rate, total_months, frequency_months):
+        paid_off = pending & active & (amount * (1 + beta) >= alpha)
+        months = np.where(paid_off, month, months)
+        pending &= ~paid_off
+        if not (pending & active).any():
+            break
+    return months
+
+def required_prepayment(principal, annual_rate, total_months, frequency_months, target_month):
+    """
+    Límite anual mínimo (UF, redondeado hacia arriba a 4 decimales) para pagar el crédito a más
+    tardar en `target_month` con prepagos cada `frequency_months` meses.
+
+    El prepago i salda el crédito si A >= alpha_i / (1 + beta_i), así que el monto requerido es el
+    mínimo de esa cota sobre los prepagos hasta el mes objetivo. Es 0 si el objetivo no es anterior
+    al plazo, y NaN si no hay ningún prepago antes del mes objetivo.
+    """
+    principal, annual_rate, total_months, frequency_months, target_month = plan_inputs(
+        principal, annual_rate, total_months, frequency_months, target_month)
+    amount = np.full(principal.shape, np.inf)
+    for _, month, alpha, beta, active in plan_events(principal, annual_rate, total_months, frequency_months):
+        eligible = active & (month <= target_month)
+        if not eligible.any():
+            break
+        amount = np.where(eligible, np.minimum(amount, alpha / (1 + beta)), amount)
+    annual_limit = np.where(np.isinf(amount), np.nan, np.ceil(amount * (12 / frequency_months) * 10000) / 10000)
+    return np.where(target_month >= total_months, 0.0, annual_limit)
+
+def required_frequency(principal, annual_rate, total_months, annual_limit, target_month, frequencies=range(1, 13)):
+    """
+    Mayor frecuencia (menos prepagos) de `frequencies` con la que el plan termina a más tardar en
+    `target_month`; 0 si ninguna lo logra.
+    """
+    frequencies = sorted({int(frequency) for frequency in frequencies})
+    if not frequencies or frequencies[0] < 1 or frequencies[-1] > 12:
+        raise ValueError("La frecuencia de prepago debe estar entre 1 y 12 meses.")
+    shape = np.broadcast(np.asarray(principal), np.asarray(annual_rate), np.asarray(total_months),
+                         np.asarray(annual_limit), np.asarray(target_month)).shape
+    best = np.zeros(shape, dtype=np.int64)
+    for frequency in frequencies:
+        reached = payoff_month(principal, annual_rate, total_months, annual_limit, frequency) <= target_month
+        best = np.where(reached, frequency, best)
+    return best
+
+def break_even_rate(principal, annual_rate, total_months, paid_months, refinance_cost, new_term=None,
+                    steps=BISECTION_STEPS):
+    """
+    Tasa anual (%) a la que refinanciar el saldo tras `paid_months` cuotas cuesta lo mismo que
+    mantener el crédito.
+
+    Se compara el total nominal de cuotas restantes (como `interest_saved`): n·C contra
+    n'·cuota(saldo, tasa, n') + costo de refinanciar, con n' = `new_term` (por defecto el plazo
+    restante). El costo crece con la tasa, así que la raíz se obtiene por bisección vectorizada
+    entre 0% y MAX_ANNUAL_RATE. NaN si ni a tasa 0% conviene refinanciar.
+    """
+    position = loan_position(principal, annual_rate, total_months, paid_months)
+    balance, remaining = position['balance'], position['remaining_months']
+    new_term = remaining if new_term is None else np.broadcast_to(np.asarray(new_term, dtype=np.int64), balance.shape)
+    if (new_term <= 0).any():
+        raise ValueError("El plazo del refinanciamiento debe ser mayor a 0.")
+    budget = remaining * position['monthly_payment'] - np.asarray(refinance_cost, dtype=float)
+
+    def refinanced_cost(rate):
+        monthly_rate = calculate_monthly_rate(rate)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payment = np.where(monthly_rate > 0, french_amortization(balance, monthly_rate, new_term), balance / new_term)
+        return new_term * payment
+
+    low, high = np.zeros(balance.shape), np.full(balance.shape, MAX_ANNUAL_RATE)
+    for _ in range(steps):
+        middle = (low + high) / 2
+        affordable = refinanced_cost(middle) <= budget
+        low = np.where(affordable, middle, low)
+        high = np.where(affordable, high, middle)
+    return np.where(refinanced_cost(np.zeros(balance.shape)) <= budget, low, np.nan)
@@ -0,0 +1,199 @@
+"""
+Almacén en disco de cronogramas, con columnas NumPy en memoria mapeada e índice por crédito.
+
+Cada columna se guarda como una matriz `.npy` de un crédito por fila y un mes por columna (miles de
+UF, sin redondear, como las matrices de `prepago_batch`), junto con los meses pagados, la fecha de
+inicio y los identificadores de cada crédito. Al abrir el almacén solo se leen los encabezados: las
+matrices se mapean con `np.load(mmap_mode='r')`, de modo que abrir una corrida de un millón de
+créditos toma milisegundos y solo se leen del disco las páginas que se consultan.
+
+El cronograma de un crédito es una fila contigua y un mes de toda la cartera es una columna con
+paso fijo: ambos se devuelven como vistas, sin copiar. El índice guarda los identificadores
+ordenados y su fila, y se consulta por búsqueda binaria.
+
+Estructura del directorio:
+    meta.json            columnas, número de créditos y horizonte (se escribe al final)
+    <columna>.npy        una matriz por columna: capital, interest, prepayment, closing
+    months_paid.npy      meses pagados por crédito
+    start_date.npy       fecha de inicio por crédito (datetime64[D])
+    loan_id.npy          identificador por fila
+    index_id.npy         identificadores ordenados
+    index_row.npy        fila de cada identificador ordenado
+"""
+
+# Importaciones
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from prepago_batch import DEFAULT_CHUNK_SIZE, payoff_dates, portfolio_chunks, validate_loans
+
+META_FILE = 'meta.json'
+STORE_VERSION = 1
+
+# Columnas del cronograma y su archivo en el almacén
+STORE_COLUMNS = {
+    'Amortizacion parcial': 'capital',
+    'INTERES parcial': 'interest',
+    'Prepago': 'prepayment',
+    'SALDO': 'closing'
+}
+
+# Lectura
+class ResultStore:
+    """Almacén abierto en modo lectura; las consultas devuelven vistas de las matrices mapeadas."""
+
+    def __init__(self, path):
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            raise ValueError(f"'{path}' no es un almacén de resultados (falta '{META_FILE}').")
+        with open(meta_path, encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self.path = path
+        self.columns = {column: self._open(name) for column, name in self.meta['columns'].items()}
+        self.months_paid = self._open('months_paid')
+        self.start_date = self._open('start_date')
+        self.loan_id = self._open('loan_id')
+        self.index_id = self._open('index_id')
+        self.index_row = self._open('index_row')
+
+    def _open(self, name):
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return self.meta['loans']
+
+    def __repr__(self):
+        return f"ResultStore('{self.path}', loans={len(self)}, horizon={self.meta['horizon']})"
+
+    def column(self, column):
+        if column not in self.columns:
+            raise KeyError(f"Columna desconocida: '{column}'. Use una de: {', '.join(self.columns)}.")
+        return self.columns[column]
+
+    def row(self, loan_id):
+        """
+        Fila del crédito `loan_id` según el índice ordenado (se acepta '17' para un índice entero).
+
+        La clave convertida al tipo del índice debe volver a ser igual a `loan_id`: así 'abcd' no
+        se trunca a 'abc' en un índice de 3 caracteres, ni 17.5 a 17 en un índice entero.
+        """
+        original = np.asarray(loan_id)
+        try:
+            key = original.astype(self.index_id.dtype)
+        except ValueError:
+            raise KeyError(f"Crédito desconocido: {loan_id}.") from None
+        if key.astype(original.dtype) != original:
+            raise KeyError(f"Crédito desconocido: {loan_id}.")
+        position = int(np.searchsorted(self.index_id, key))
+        if position == len(self.index_id) or self.index_id[position] != key:
+            raise KeyError(f"Crédito desconocido: {loan_id}.")
+        return int(self.index_row[position])
+
+    def loan(self, loan_id, column='SALDO'):
+        """Cronograma mensual de un crédito (vista de sus meses pagados)."""
+        row = self.row(loan_id)
+        return self.column(column)[row, :self.months_paid[row]]
+
+    def month(self, month, column='SALDO'):
+        """Valor del mes `month` (desde 1) para todos los créditos (vista; 0 tras el pago total)."""
+        if not 1 <= month <= self.meta['horizon']:
+            raise ValueError(f"El mes debe estar entre 1 y {self.meta['horizon']}.")
+        return self.column(column)[:, month - 1]
+
+    def value(self, loan_id, month, column='SALDO'):
+        """Valor de una columna para un crédito y mes (0 si el crédito ya estaba pagado)."""
+        return float(self.month(month, column)[self.row(loan_id)])
+
+    def to_frame(self, loan_id):
+        """Cronograma de un crédito como DataFrame, redondeado a 4 decimales como en `prepayment_plan`."""
+        row = self.row(loan_id)
+        months = int(self.months_paid[row])
+        return pd.DataFrame({
+            'NRO de cuota': np.arange(1, months + 1),
+            'FECHA A PAGAR': payoff_dates(np.repeat(self.start_date[row], months), np.arange(1, months + 1)),
+            **{column: np.round(values[row, :months], 4) for column, values in self.columns.items()}
+        })
+
+def open_store(path):
+    """Abrir un almacén existente; solo lee `meta.json` y los encabezados de las matrices."""
+    return ResultStore(path)
+
+# Escritura
+def create_store(path, loan_ids, start_date, horizon):
+    """
+    Crear los archivos del almacén y devolver sus matrices mapeadas en modo escritura.
+
+    Las matrices se crean con ceros (archivos dispersos) y se llenan bloque a bloque; el índice se
+    escribe de inmediato y `meta.json` recién en `close_store`.
+    """
+    loan_ids = np.asarray(loan_ids)
+    if loan_ids.dtype == object:
+        loan_ids = loan_ids.astype(str)
+    if np.unique(loan_ids).size != loan_ids.size:
+        raise ValueError("Los identificadores de crédito deben ser únicos.")
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    order = np.argsort(loan_ids, kind='stable')
+    np.save(os.path.join(path, 'loan_id.npy'), loan_ids)
+    np.save(os.path.join(path, 'index_id.npy'), loan_ids[order])
+    np.save(os.path.join(path, 'index_row.npy'), order.astype(np.int64))
+    np.save(os.path.join(path, 'start_date.npy'), np.asarray(start_date, dtype='datetime64[D]'))
+
+    shape = (loan_ids.size, horizon)
+    arrays = {column: np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+', dtype=np.float64,
+                                                shape=shape)
+              for column, name in STORE_COLUMNS.items()}
+    arrays['months_paid'] = np.lib.format.open_memmap(os.path.join(path, 'months_paid.npy'), mode='w+',
+                                                      dtype=np.int32, shape=(loan_ids.size,))
+    return arrays
+
+def close_store(path, arrays):
+    """Bajar las matrices a disco y escribir `meta.json`, que marca el almacén como completo."""
+    for values in arrays.values():
+        values.flush()
+    loans, horizon = arrays['SALDO'].shape
+    with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as file:
+        json.dump({'version': STORE_VERSION, 'loans': loans, 'horizon': horizon, 'columns': STORE_COLUMNS}, file, indent=2)
+    return ResultStore(path)
+
+def write_portfolio_store(loans, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Simular la cartera por bloques y guardar sus cronogramas en un almacén.
+
+    Los identificadores salen de la columna `loan_id` si existe y, si no, son la fila del crédito
+    (como en `export_portfolio_schedules`). Solo un bloque está en memoria a la vez.
+    """
+    loans = validate_loans(loans)
+    loan_ids = loans['loan_id'].to_numpy() if 'loan_id' in loans.columns else np.arange(len(loans))
+    arrays = create_store(path, loan_ids, loans['start_date'].to_numpy(), int(loans['total_months'].max()))
+    for _, rows, schedules, months_paid in portfolio_chunks(loans, chunk_size):
+        width = schedules['SALDO'].shape[1]
+        for column in STORE_COLUMNS:
+            arrays[column][rows, :width] = schedules[column]
+        arrays['months_paid'][rows] = months_paid
+    return close_store(path, arrays)
+
+def save_results(results, path):
+    """
+    Guardar resultados de `schedule_result`/`prepayment_result` ({identificador: ScheduleResult}).
+
+    Los arreglos internos se guardan en miles de UF, sin redondear.
+    """
+    if not results:
+        raise ValueError("No hay resultados para guardar.")
+    loan_ids = list(results)
+    horizon = max((len(result) for result in results.values()), default=0)
+    start_date = [result.start_date if result.start_date is not None else np.datetime64('NaT')
+                  for result in results.values()]
+    arrays = create_store(path, loan_ids, start_date, horizon)
+    for row, result in enumerate(results.values()):
+        for column, name in STORE_COLUMNS.items():
+            arrays[column][row, :len(result)] = result[column] / 1000
+        arrays['months_paid'][row] = len(result)
+    return close_store(path, arrays)
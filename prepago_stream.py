@@ -0,0 +1,110 @@
+"""
+Modo streaming NDJSON: una solicitud JSON por línea en stdin, un resultado JSON por línea en stdout.
+
+Reutiliza los tres flujos del menú (resumen, plan de prepago y comparación) sin `input()`.
+Las solicitudes se procesan a medida que llegan, al estilo generador, y cada cronograma se
+descarta apenas se escribe su línea, de modo que la memoria no crece con el número de solicitudes.
+
+Ejemplo de solicitud:
+    {"id": 7, "flow": "prepayment_plan", "principal": 3000, "annual_rate": 5.4, "total_months": 300,
+     "annual_limit": 50, "frequency_months": 12, "start_date": "2025-07-01", "schedule": false}
+
+En el resumen, "paid_months" agrega a las métricas el saldo, los intereses y el capital pagados
+tras esas cuotas, calculados en forma cerrada (sin necesidad de pedir el cronograma).
+"""
+
+# Importaciones
+import json
+import sys
+
+import numpy as np
+
+from prepago_revC import comparison_flow, prepayment_flow, summary_flow
+from prepago_solver import loan_position
+
+FLOWS = ['summary', 'prepayment_plan', 'comparison']
+
+# Métricas del resumen con "paid_months" y su clave en `loan_position`
+POSITION_METRICS = {'remaining_balance': 'balance', 'paid_interest': 'paid_interest', 'paid_principal': 'paid_principal'}
+
+# Funciones de Serialización
+def json_value(value):
+    """Convertir escalares de NumPy/pandas a tipos nativos serializables."""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+def schedule_columns(schedule_df):
+    """Cronograma en formato columnar (listas por columna), con fechas ISO."""
+    columns = {column: schedule_df[column].tolist() for column in schedule_df.columns if column != 'FECHA A PAGAR'}
+    columns['FECHA A PAGAR'] = schedule_df['FECHA A PAGAR'].dt.strftime('%Y-%m-%d').tolist()
+    return columns
+
+def scenario_result(schedule_df, metrics, include_schedule):
+    """Métricas (y opcionalmente el cronograma) de un escenario como diccionario serializable."""
+    result = {'metrics': {name: json_value(value) for name, value in metrics.items()}, 'rows': len(schedule_df)}
+    if include_schedule:
+        result['schedule'] = schedule_columns(schedule_df)
+    return result
+
+# Procesamiento de Solicitudes
+def flow_scenarios(request):
+    """Ejecutar el flujo indicado en `flow` y devolver sus escenarios como {nombre: (df, métricas)}."""
+    flow = request.get('flow', 'summary')
+    principal = float(request['principal'])
+    annual_rate = float(request['annual_rate'])
+    total_months = int(request['total_months'])
+    start_date = request.get('start_date') or None
+
+    if flow == 'summary':
+        schedule_df, metrics = summary_flow(principal, annual_rate, total_months, start_date)
+        paid_months = int(request.get('paid_months') or 0)
+        if paid_months:
+            position = loan_position(principal, annual_rate, total_months, paid_months)
+            metrics = {**metrics, 'paid_months': paid_months,
+                       **{name: round(float(position[key]), 4) for name, key in POSITION_METRICS.items()}}
+        return {'summary': (schedule_df, metrics)}
+    if flow == 'prepayment_plan':
+        return {'prepayment': prepayment_flow(principal, annual_rate, total_months, float(request['annual_limit']),
+                                              int(request['frequency_months']), start_date)}
+    if flow == 'comparison':
+        no_prepayment, prepayment = comparison_flow(principal, annual_rate, total_months, float(request['annual_limit']),
+                                                    int(request['frequency_months']), start_date)
+        return {'no_prepayment': no_prepayment, 'prepayment': prepayment}
+    raise ValueError(f"Flujo inválido: '{flow}'. Use uno de: {', '.join(FLOWS)}.")
+
+def handle_request(request):
+    """Resolver una solicitud; la comparación devuelve un resultado por escenario."""
+    include_schedule = bool(request.get('schedule', False))
+    results = {name: scenario_result(df, metrics, include_schedule)
+               for name, (df, metrics) in flow_scenarios(request).items()}
+    return results if len(results) > 1 else next(iter(results.values()))
+
+def process_stream(lines):
+    """Generar una línea JSON de respuesta por cada línea de solicitud no vacía."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        request_id = number
+        try:
+            request = json.loads(line)
+            request_id = request.get('id', number)
+            response = {'id': request_id, 'flow': request.get('flow', 'summary'), **handle_request(request)}
+        except KeyError as e:
+            response = {'id': request_id, 'error': f"Falta el campo {e}."}
+        except ValueError as e:
+            response = {'id': request_id, 'error': str(e)}
+        except Exception as e:
+            response = {'id': request_id, 'error': f"Error inesperado: {e}"}
+        yield json.dumps(response, ensure_ascii=False)
+
+def run_stream(input_stream=None, output_stream=None):
+    """Leer solicitudes de `input_stream` (stdin) y escribir cada respuesta apenas está lista."""
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    for line in process_stream(input_stream):
+        output_stream.write(line + '\n')
+        output_stream.flush()
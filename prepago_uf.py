@@ -0,0 +1,137 @@
+"""
+Indexación UF: valores en pesos (CLP) de los cronogramas en cada `FECHA A PAGAR`.
+
+La serie diaria de la UF (CSV o Parquet con columnas `date` y `uf`) se carga una vez en dos
+arreglos ordenados: días desde 1970-01-01 (int64) y valor de la UF. Cada fecha de un cronograma se
+resuelve con una sola búsqueda binaria vectorizada (`np.searchsorted`) sobre todas las filas a la
+vez; un día sin dato toma el último valor publicado, y las fechas posteriores a la serie se
+proyectan desde el último valor con una inflación anual supuesta (en %, como en `prepago_montecarlo`).
+Una tabla creada con `backcast=True` (p. ej. un solo valor de hoy) también retroproyecta las fechas
+anteriores a su primer dato, descontando la misma inflación; sin esa opción esas fechas son un error.
+
+La lectura de la serie queda en caché por (ruta, fecha de modificación, tamaño): convertir los
+bloques de una cartera, o varios cronogramas seguidos, no vuelve a leer ni a parsear el archivo.
+"""
+
+# Importaciones
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+UF_COLUMNS = ['date', 'uf']
+DEFAULT_INFLATION = 3.0  # Inflación UF anual supuesta para proyectar (%)
+UF_CACHE_SIZE = 8
+DAYS_PER_YEAR = 365
+
+# Columnas en pesos y columna de origen
+CLP_COLUMNS = {
+    'TOTAL CUOTA CLP': 'TOTAL CUOTA mensual',
+    'INTERES CLP': 'INTERES parcial',
+    'Prepago CLP': 'Prepago',
+    'SALDO CLP': 'SALDO'
+}
+
+# Tabla de Indexación
+class UFTable:
+    """Serie UF ordenada por día, proyectada por inflación después de su último dato (y antes, con `backcast`)."""
+
+    __slots__ = ('days', 'values', 'inflation', 'backcast')
+
+    def __init__(self, days, values, inflation=DEFAULT_INFLATION, backcast=False):
+        self.days = days
+        self.values = values
+        self.inflation = float(inflation)
+        self.backcast = bool(backcast)
+
+    def __len__(self):
+        return self.days.size
+
+    def __repr__(self):
+        first, last = (str(np.datetime64(int(day), 'D')) for day in self.days[[0, -1]])
+        return f"UFTable({first} a {last}, {len(self)} días, inflación {self.inflation:g}%)"
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(np.datetime64(int(self.days[-1]), 'D'))
+
+    def lookup(self, dates):
+        """
+        Valor UF (2 decimales) y si es proyectado, para un arreglo de fechas.
+
+        Devuelve (valores, proyectado). Las fechas anteriores al primer dato de la serie se
+        retroproyectan si la tabla tiene `backcast` y, si no, lanzan ValueError.
+        """
+        days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+        position = np.searchsorted(self.days, days, side='right') - 1
+        before = position < 0
+        if before.any() and not self.backcast:
+            raise ValueError(f"Hay fechas anteriores al inicio de la serie UF "
+                             f"({np.datetime64(int(self.days[0]), 'D')}).")
+        values = self.values[np.maximum(position, 0)]
+        after = days > self.days[-1]
+        growth = 1 + self.inflation / 100
+        if after.any():
+            values[after] = self.values[-1] * growth ** ((days[after] - self.days[-1]) / DAYS_PER_YEAR)
+        if before.any():
+            values[before] = self.values[0] * growth ** ((days[before] - self.days[0]) / DAYS_PER_YEAR)
+        return np.round(values, 2), after | before
+
+def uf_table(dates, values, inflation=DEFAULT_INFLATION, backcast=False):
+    """Crear la tabla desde fechas y valores (sin orden requerido; ante fechas repetidas vale la última)."""
+    series = pd.Series(pd.to_numeric(np.asarray(values), errors='coerce'),
+                       index=pd.to_datetime(np.asarray(dates), errors='coerce'))
+    series = series[series.index.notna() & series.notna()]
+    if series.empty:
+        raise ValueError("La serie UF no tiene valores válidos.")
+    if (series <= 0).any():
+        raise ValueError("Los valores de la UF deben ser mayores a 0.")
+    series = series[~series.index.duplicated(keep='last')].sort_index()
+    days = series.index.values.astype('datetime64[D]').astype(np.int64)
+    values = series.to_numpy(dtype=np.float64)
+    days.flags.writeable = values.flags.writeable = False
+    return UFTable(days, values, inflation, backcast)
+
+@lru_cache(maxsize=UF_CACHE_SIZE)
+def _read_uf_series(path, modified, size):
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        series = pd.read_parquet(path)
+    else:
+        series = pd.read_csv(path)
+    missing = [column for column in UF_COLUMNS if column not in series.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en la serie UF: {', '.join(missing)}.")
+    table = uf_table(series['date'], series['uf'])
+    return table.days, table.values
+
+def load_uf_table(path, inflation=DEFAULT_INFLATION):
+    """
+    Leer la serie UF de `path` (.csv o .parquet), con caché mientras el archivo no cambie.
+
+    La inflación no forma parte de la caché: la misma serie se reutiliza con distintos supuestos.
+    """
+    stat = os.stat(path)
+    days, values = _read_uf_series(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    return UFTable(days, values, inflation)
+
+# Conversión de Cronogramas
+def add_clp_columns(df, table, date_column='FECHA A PAGAR'):
+    """
+    Agregar a un cronograma el valor UF de cada fecha y sus montos en pesos.
+
+    Sirve para `generate_schedule`, `prepayment_plan` y los cronogramas largos de la cartera (sin
+    `TOTAL CUOTA mensual`, la cuota es amortización + interés). Cada monto se multiplica por el
+    valor UF de su fecha, tal como se publica en el cronograma, y los pesos se redondean al entero.
+    """
+    uf, projected = table.lookup(df[date_column].to_numpy())
+    columns = {'VALOR UF': uf, 'UF proyectada': projected}
+    for clp_column, column in CLP_COLUMNS.items():
+        if column in df.columns:
+            values = df[column].to_numpy()
+        elif column == 'TOTAL CUOTA mensual' and {'Amortizacion parcial', 'INTERES parcial'} <= set(df.columns):
+            values = df['Amortizacion parcial'].to_numpy() + df['INTERES parcial'].to_numpy()
+        else:
+            continue
+        columns[clp_column] = np.round(values * uf).astype(np.int64)
+    return df.assign(**columns)
@@ -0,0 +1,81 @@
+"""
+Recalculo incremental de escenarios "qué pasa si" sobre un mismo crédito.
+
+`IncrementalSchedule` guarda los arreglos del cronograma de `generate_schedule`, que sirven como
+puntos de control mes a mes (saldo, cuota vigente, interés y amortización acumulados). Al editar
+los prepagos solo se recalcula desde el primer periodo modificado; el tramo anterior se reutiliza.
+"""
+
+# Importaciones
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from prepago_core import calculate_monthly_rate
+from prepago_engine import schedule_arrays, schedule_frame, schedule_metrics
+
+ARRAY_KEYS = ['interest', 'capital', 'total_payment', 'scheduled_payment', 'prepayment', 'closing',
+              'total_interest', 'total_principal']
+
+def valid_prepayments(prepayments):
+    """Calendario {periodo: monto} sin los montos en 0; como en `validate_inputs`, el período parte en 1."""
+    prepayments = {int(period): amount for period, amount in (prepayments or {}).items()}
+    if any(period < 1 for period in prepayments):
+        raise ValueError("El período de prepago debe ser mayor a 0.")
+    return {period: amount for period, amount in prepayments.items() if amount > 0}
+
+class IncrementalSchedule:
+    """Cronograma con puntos de control que se recalcula solo desde el primer prepago modificado."""
+
+    def __init__(self, principal, annual_rate, total_months, prepayments=None, start_date=None):
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.total_months = total_months
+        # Igual que `validate_inputs`: sin fecha de inicio, el cronograma parte hoy
+        self.start_date = pd.to_datetime(start_date or datetime.now().date())
+        self.monthly_rate = calculate_monthly_rate(annual_rate)
+        self.prepayments = valid_prepayments(prepayments)
+        self.arrays = schedule_arrays(principal, self.monthly_rate, total_months, self.prepayments)
+        self.recomputed_months = self.arrays['months']
+
+    def checkpoint(self, month):
+        """Estado del crédito tras `month` cuotas, listo para reanudar el cálculo."""
+        if month == 0:
+            return None
+        return {
+            'month': month,
+            'balance': float(self.arrays['closing'][month - 1]),
+            'monthly_payment': float(self.arrays['scheduled_payment'][month]),
+            'total_interest': float(self.arrays['total_interest'][month - 1]),
+            'total_principal': float(self.arrays['total_principal'][month - 1])
+        }
+
+    def update(self, prepayments):
+        """Reemplazar el calendario de prepagos y recalcular desde el primer periodo que cambia."""
+        prepayments = valid_prepayments(prepayments)
+        changed = [period for period in set(prepayments) | set(self.prepayments)
+                   if prepayments.get(period, 0) != self.prepayments.get(period, 0)]
+        self.prepayments = prepayments
+        self.recomputed_months = 0
+        # Cambios posteriores al pago total del crédito no alteran el cronograma
+        if not changed or min(changed) > self.arrays['months']:
+            return self
+
+        month = min(changed) - 1
+        tail = schedule_arrays(self.principal, self.monthly_rate, self.total_months, prepayments, self.checkpoint(month))
+        for key in ARRAY_KEYS:
+            self.arrays[key] = np.concatenate((self.arrays[key][:month], tail[key]))
+        self.arrays['months'] = tail['months']
+        self.arrays['monthly_payment'] = tail['monthly_payment']
+        self.recomputed_months = tail['months'] - month
+        return self
+
+    def set_prepayment(self, period, amount):
+        """Agregar, modificar o eliminar (monto 0) el prepago de un periodo."""
+        return self.update({**self.prepayments, int(period): amount})
+
+    def to_frame(self):
+        """Devolver el DataFrame y las métricas, con el mismo formato que `generate_schedule`."""
+        return (schedule_frame(self.arrays, self.start_date),
+                schedule_metrics(self.arrays, self.principal, self.monthly_rate, self.total_months))
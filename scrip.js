@@ -7,6 +7,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const paidMonthsInput = document.getElementById('paidMonths');
     const annualLimitInput = document.getElementById('annualLimit');
     const frequencyMonthsSelect = document.getElementById('frequencyMonths');
+    const startDateInput = document.getElementById('startDate');
     const resultsDiv = document.getElementById('results');
 
     const btnSummary = document.getElementById('btnSummary');
@@ -15,71 +16,65 @@ document.addEventListener('DOMContentLoaded', () => {
     const btnExplain = document.getElementById('btnExplain');
 
     let chartInstance = null;
+    let chartType = 'balance';
     let fullScheduleData = null; 
 
-    // --- Funciones de Cálculo ---
-    function calculateMonthlyRate(annualRate) {
-        return Math.pow(1 + annualRate / 100, 1 / 12) - 1;
-    }
+    // El servicio local (`python prepago_revC.py serve`) sirve esta página y calcula los cronogramas.
+    const API_BASE = window.location.protocol === 'file:' ? 'http://127.0.0.1:8000' : '';
 
-    function frenchAmortization(principal, monthlyRate, totalMonths) {
-        if (principal <= 0 || totalMonths <= 0) return 0;
-        if (monthlyRate === 0) return principal / totalMonths;
-        const factor = Math.pow(1 + monthlyRate, totalMonths);
-        return principal * (monthlyRate * factor) / (factor - 1);
+    // --- Funciones de Cálculo (servicio Python) ---
+    function columnsToRows(schedule) {
+        const names = Object.keys(schedule);
+        return schedule[names[0]].map((_, i) => Object.fromEntries(names.map(name => [name, schedule[name][i]])));
     }
 
-    function generateSchedule(principal, annualRate, totalMonths, prepayments = {}) {
-        const monthlyRate = calculateMonthlyRate(annualRate);
-        let monthlyPayment = frenchAmortization(principal, monthlyRate, totalMonths);
-        
-        let balance = principal;
-        let schedule = [];
-        let totalInterest = 0;
-        let totalPrincipalPaid = 0;
-
-        for (let month = 0; month < totalMonths; month++) {
-            if (balance < 0.01) break;
-
-            const interest = balance * monthlyRate;
-            let capitalPayment = monthlyPayment - interest;
-            
-            const prepayment = prepayments[month + 1] || 0;
-
-            if (prepayment > 0) {
-                balance -= prepayment;
-                totalPrincipalPaid += prepayment;
-                if (balance > 0) {
-                    monthlyPayment = frenchAmortization(balance, monthlyRate, totalMonths - (month + 1));
-                }
-            }
-
-            if (balance < capitalPayment) {
-                capitalPayment = balance;
-            }
-            
-            balance -= capitalPayment;
-            totalInterest += interest;
-            totalPrincipalPaid += capitalPayment;
-            
-            if (balance < 0.01) balance = 0;
-
-            schedule.push({
-                'Mes': month + 1,
-                'Cuota (UF)': (monthlyPayment + (prepayment > 0 ? prepayment : 0)).toFixed(4),
-                'Interés (UF)': interest.toFixed(4),
-                'Amortización (UF)': capitalPayment.toFixed(4),
-                'Prepago (UF)': prepayment.toFixed(4),
-                'Saldo Pendiente (UF)': balance.toFixed(4)
-            });
+    async function streamFlow(flow, payload, onRecord) {
+        // La respuesta es NDJSON por bloques: métricas, luego cuotas en tramos y un registro final.
+        const response = await fetch(`${API_BASE}/api/${flow}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        if (!response.ok) {
+            // Los errores llegan como un registro JSON `{"type": "error"}`, solo o dentro del NDJSON.
+            const text = await response.text();
+            let message = `Error HTTP ${response.status}`;
+            try {
+                message = JSON.parse(text.split('\n')[0]).error || message;
+            } catch (e) { /* Cuerpo no JSON: se informa el estado HTTP */ }
+            throw new Error(message);
         }
-        
+        const handleLine = (line) => {
+            if (!line.trim()) return;
+            const record = JSON.parse(line);
+            if (record.type === 'error') throw new Error(record.error);
+            onRecord(record);
+        };
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        // Último registro sin salto de línea final (y bytes pendientes del decodificador)
+        buffer += decoder.decode();
+        buffer.split('\n').forEach(handleLine);
+    }
+
+    function loanPayload(inputs, schedule) {
         return {
-            metrics: {
-                totalInterest: totalInterest,
-                totalPrincipal: totalPrincipalPaid,
-                finalMonths: schedule.length
-            },
+            principal: inputs.principal,
+            annual_rate: inputs.annualRate,
+            total_months: inputs.totalMonths,
+            annual_limit: inputs.annualLimit,
+            frequency_months: inputs.frequencyMonths,
+            start_date: inputs.startDate || null,
+            paid_months: inputs.paidMonths,
             schedule: schedule
         };
     }
@@ -92,13 +87,14 @@ document.addEventListener('DOMContentLoaded', () => {
         const paidMonths = parseInt(paidMonthsInput.value, 10) || 0;
         const annualLimit = parseFloat(annualLimitInput.value) || 0;
         const frequencyMonths = parseInt(frequencyMonthsSelect.value, 10);
+        const startDate = startDateInput.value;
         
         if (isNaN(principal) || principal <= 0) return "Por favor, ingrese un monto de crédito válido (> 0).";
         if (isNaN(annualRate) || annualRate < 0) return "Por favor, ingrese una tasa anual válida (>= 0).";
         if (isNaN(totalMonths) || totalMonths <= 0) return "Por favor, ingrese un plazo en meses válido (> 0).";
         if (paidMonths < 0 || paidMonths > totalMonths) return "Los meses pagados deben ser un número no negativo y menor o igual al plazo total.";
 
-        return { principal, annualRate, totalMonths, paidMonths, annualLimit, frequencyMonths };
+        return { principal, annualRate, totalMonths, paidMonths, annualLimit, frequencyMonths, startDate };
     }
 
     function displayError(message) {
@@ -118,128 +114,141 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // --- Handlers de Botones ---
-    function handleSummary() {
+    async function handleSummary() {
          const inputs = getInputs();
         if (typeof inputs === 'string') { displayError(inputs); return; }
-        const { principal, annualRate, totalMonths, paidMonths } = inputs;
+        const { principal, totalMonths, paidMonths } = inputs;
         displayLoading();
 
-        setTimeout(() => {
-            const fullScheduleData = generateSchedule(principal, annualRate, totalMonths);
-            const schedule = fullScheduleData.schedule;
+        try {
+            let metrics = null;
+            // El saldo tras las cuotas pagadas llega en las métricas; no hace falta el cronograma
+            await streamFlow('summary', loanPayload(inputs, false), record => {
+                if (record.type === 'metrics') metrics = record.metrics;
+            });
             
-            const monthlyPayment = schedule.length > 0 ? parseFloat(schedule[0]['Cuota (UF)']) : 0;
-            const remainingBalance = paidMonths > 0 ? parseFloat(schedule[paidMonths - 1]['Saldo Pendiente (UF)']) : principal;
+            const monthlyPayment = metrics.new_monthly_payment;
+            const remainingBalance = paidMonths > 0 ? metrics.remaining_balance : principal;
             const remainingMonths = totalMonths - paidMonths;
 
             const htmlContent = `<div class="space-y-4 text-left w-full"><h2 class="text-xl font-semibold text-gray-800">Resumen de tu Crédito Actual</h2><p class="text-gray-700"><strong>Monto Original (UF):</strong> ${principal.toFixed(2)}</p><p class="text-gray-700"><strong>Cuota mensual (UF):</strong> ${monthlyPayment.toFixed(4)}</p><p class="text-gray-700"><strong>Saldo pendiente (UF):</strong> ${remainingBalance.toFixed(2)}</p><p class="text-gray-700"><strong>Meses restantes:</strong> ${remainingMonths} (${(remainingMonths / 12).toFixed(1)} años)</p></div>`;
             displayResults(htmlContent);
-        }, 500);
+        } catch (error) {
+            displayError(error.message);
+        }
     }
 
-    function handlePrepayment() {
+    async function handlePrepayment() {
         const inputs = getInputs();
         if (typeof inputs === 'string') { displayError(inputs); return; }
-        const { principal, annualRate, totalMonths, paidMonths, annualLimit, frequencyMonths } = inputs;
+        const { totalMonths, annualLimit } = inputs;
+        if (annualLimit <= 0) { displayError("Para el plan de prepago, el límite anual debe ser mayor a 0."); return; }
         displayLoading();
 
-        setTimeout(() => {
-            if (annualLimit <= 0) { displayError("Para el plan de prepago, el límite anual debe ser mayor a 0."); return; }
-            
-            const noPrepData = generateSchedule(principal, annualRate, totalMonths);
-            
-            const prepayments = {};
-            const prepaymentAmount = annualLimit / (12 / frequencyMonths);
-            for (let i = frequencyMonths; i <= totalMonths; i += frequencyMonths) {
-                prepayments[i] = prepaymentAmount;
-            }
-            const prepData = generateSchedule(principal, annualRate, totalMonths, prepayments);
+        try {
+            const metrics = {};
+            await streamFlow('comparison', loanPayload(inputs, false), record => {
+                if (record.type === 'metrics') metrics[record.scenario] = record.metrics;
+            });
             
-            const monthsSaved = noPrepData.metrics.finalMonths - prepData.metrics.finalMonths;
-            const interestSaved = noPrepData.metrics.totalInterest - prepData.metrics.totalInterest;
+            const monthsSaved = metrics.prepayment.months_saved;
+            const interestSaved = metrics.no_prepayment.total_interest - metrics.prepayment.total_interest;
 
-            const htmlContent = `<div class="space-y-4 text-left w-full"><h2 class="text-xl font-semibold text-gray-800">Métricas del Plan de Prepago</h2><p class="text-green-700 font-bold"><strong>Meses ahorrados:</strong> ${monthsSaved}</p><p class="text-green-700 font-bold"><strong>Intereses ahorrados (UF):</strong> ${interestSaved.toFixed(4)}</p><p class="text-gray-700"><strong>Nuevo plazo total:</strong> ${prepData.metrics.finalMonths} meses</p></div>`;
+            const htmlContent = `<div class="space-y-4 text-left w-full"><h2 class="text-xl font-semibold text-gray-800">Métricas del Plan de Prepago</h2><p class="text-green-700 font-bold"><strong>Meses ahorrados:</strong> ${monthsSaved}</p><p class="text-green-700 font-bold"><strong>Intereses ahorrados (UF):</strong> ${interestSaved.toFixed(4)}</p><p class="text-gray-700"><strong>Nuevo plazo total:</strong> ${totalMonths - monthsSaved} meses</p></div>`;
             displayResults(htmlContent);
-        }, 500);
+        } catch (error) {
+            displayError(error.message);
+        }
     }
     
-    function handleComparison() {
-        const inputs = getInputs();
-        if (typeof inputs === 'string') { displayError(inputs); return; }
-        const { principal, annualRate, totalMonths, paidMonths, annualLimit, frequencyMonths } = inputs;
-        displayLoading();
-
-        setTimeout(() => {
-            const noPrepaymentData = generateSchedule(principal, annualRate, totalMonths);
-            
-            const prepayments = {};
-            const prepaymentAmount = annualLimit / (12 / frequencyMonths);
-            for (let i = frequencyMonths; i <= totalMonths; i += frequencyMonths) {
-                prepayments[i] = prepaymentAmount;
-            }
-            const prepaymentData = generateSchedule(principal, annualRate, totalMonths, prepayments);
-            
-            fullScheduleData = { noPrepayment: noPrepaymentData, prepayment: prepaymentData };
-
-            const noPrepMetrics = noPrepaymentData.metrics;
-            const prepMetrics = prepaymentData.metrics;
-            
-            const monthsRemainingNoPrepayment = totalMonths - paidMonths;
-            const totalInterestNoPrepayment = noPrepMetrics.totalInterest.toFixed(4);
-            const totalAmortizationNoPrepayment = principal.toFixed(4);
+    function renderComparisonSummary(inputs) {
+        const { principal, totalMonths, paidMonths } = inputs;
+        const noPrepMetrics = fullScheduleData.no_prepayment.metrics;
+        const prepMetrics = fullScheduleData.prepayment.metrics;
+        
+        const monthsRemainingNoPrepayment = totalMonths - paidMonths;
+        const totalInterestNoPrepayment = noPrepMetrics.total_interest.toFixed(4);
+        const totalAmortizationNoPrepayment = principal.toFixed(4);
 
-            const monthsRemainingWithPrepayment = prepMetrics.finalMonths > paidMonths ? prepMetrics.finalMonths - paidMonths : 0;
-            const yearsRemainingWithPrepayment = (monthsRemainingWithPrepayment / 12).toFixed(1);
-            const totalInterestWithPrepayment = prepMetrics.totalInterest.toFixed(4);
-            
-            const monthsSaved = noPrepMetrics.finalMonths - prepMetrics.finalMonths;
-            const interestSaved = (noPrepMetrics.totalInterest - prepMetrics.totalInterest).toFixed(4);
+        const prepaymentMonths = totalMonths - prepMetrics.months_saved;
+        const monthsRemainingWithPrepayment = prepaymentMonths > paidMonths ? prepaymentMonths - paidMonths : 0;
+        const yearsRemainingWithPrepayment = (monthsRemainingWithPrepayment / 12).toFixed(1);
+        const totalInterestWithPrepayment = prepMetrics.total_interest.toFixed(4);
+        
+        const monthsSaved = prepMetrics.months_saved - noPrepMetrics.months_saved;
+        const interestSaved = (noPrepMetrics.total_interest - prepMetrics.total_interest).toFixed(4);
 
-            const htmlContent = `
-                <div class="flex flex-col w-full gap-6 text-left">
-                    <h2 class="text-xl font-semibold text-gray-800 text-center">--- Resumen Comparativo ---</h2>
-                    <div class="grid grid-cols-1 md:grid-cols-2 w-full gap-8">
-                        <div class="space-y-2">
-                            <h3 class="text-lg font-medium text-blue-600">Escenario Sin Prepago</h3>
-                            <p class="text-gray-700"><strong>Meses restantes sin prepago:</strong> ${monthsRemainingNoPrepayment} (${(monthsRemainingNoPrepayment/12).toFixed(1)} años)</p>
-                            <p class="text-gray-700"><strong>Total intereses pagados (UF):</strong> ${totalInterestNoPrepayment}</p>
-                            <p class="text-gray-700"><strong>Total amortización (UF):</strong> ${totalAmortizationNoPrepayment}</p>
-                        </div>
-                        <div class="space-y-2">
-                            <h3 class="text-lg font-medium text-green-600">Escenario Con Prepago</h3>
-                            <p class="text-gray-700"><strong>Meses restantes con prepago:</strong> ${monthsRemainingWithPrepayment} (${yearsRemainingWithPrepayment} años)</p>
-                            <p class="text-gray-700"><strong>Total intereses pagados (UF):</strong> ${totalInterestWithPrepayment}</p>
-                            <p class="text-gray-700"><strong>Meses ahorrados:</strong> ${monthsSaved}</p>
-                            <p class="font-bold text-green-700"><strong>Intereses ahorrados (UF):</strong> ${interestSaved}</p>
-                        </div>
+        const htmlContent = `
+            <div class="flex flex-col w-full gap-6 text-left">
+                <h2 class="text-xl font-semibold text-gray-800 text-center">--- Resumen Comparativo ---</h2>
+                <div class="grid grid-cols-1 md:grid-cols-2 w-full gap-8">
+                    <div class="space-y-2">
+                        <h3 class="text-lg font-medium text-blue-600">Escenario Sin Prepago</h3>
+                        <p class="text-gray-700"><strong>Meses restantes sin prepago:</strong> ${monthsRemainingNoPrepayment} (${(monthsRemainingNoPrepayment/12).toFixed(1)} años)</p>
+                        <p class="text-gray-700"><strong>Total intereses pagados (UF):</strong> ${totalInterestNoPrepayment}</p>
+                        <p class="text-gray-700"><strong>Total amortización (UF):</strong> ${totalAmortizationNoPrepayment}</p>
                     </div>
-                    
-                    <div class="flex flex-wrap justify-center gap-4 border-t border-gray-300/80 pt-6">
-                        <button id="btnShowBalanceChart" class="bg-sky-600 hover:bg-sky-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md">Evolución de Saldo</button>
-                        <button id="btnShowInterestChart" class="bg-rose-600 hover:bg-rose-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md">Intereses Acumulados</button>
-                        <button id="btnExportExcel" class="bg-green-600 hover:bg-green-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md flex items-center gap-2">
-                            <svg xmlns="http://www.w3.org/2000/svg" class="h-5 w-5" viewBox="0 0 20 20" fill="currentColor"><path fill-rule="evenodd" d="M3 17a1 1 0 011-1h12a1 1 0 110 2H4a1 1 0 01-1-1zM6.293 6.707a1 1 0 010-1.414l3-3a1 1 0 011.414 0l3 3a1 1 0 01-1.414 1.414L11 5.414V13a1 1 0 11-2 0V5.414L7.707 6.707a1 1 0 01-1.414 0z" clip-rule="evenodd" /></svg>
-                            Exportar a Excel
-                        </button>
+                    <div class="space-y-2">
+                        <h3 class="text-lg font-medium text-green-600">Escenario Con Prepago</h3>
+                        <p class="text-gray-700"><strong>Meses restantes con prepago:</strong> ${monthsRemainingWithPrepayment} (${yearsRemainingWithPrepayment} años)</p>
+                        <p class="text-gray-700"><strong>Total intereses pagados (UF):</strong> ${totalInterestWithPrepayment}</p>
+                        <p class="text-gray-700"><strong>Meses ahorrados:</strong> ${monthsSaved}</p>
+                        <p class="font-bold text-green-700"><strong>Intereses ahorrados (UF):</strong> ${interestSaved}</p>
                     </div>
-
-                    <div id="chartContainer" class="relative w-full mt-2 min-h-[300px] md:min-h-[400px]"></div>
                 </div>
-            `;
-            displayResults(htmlContent);
-            
-            document.getElementById('btnShowBalanceChart').addEventListener('click', () => renderComparisonChart('balance'));
-            document.getElementById('btnShowInterestChart').addEventListener('click', () => renderComparisonChart('interest'));
-            document.getElementById('btnExportExcel').addEventListener('click', handleExportToExcel);
-            
-            renderComparisonChart('balance');
-        }, 500);
+                
+                <div class="flex flex-wrap justify-center gap-4 border-t border-gray-300/80 pt-6">
+                    <button id="btnShowBalanceChart" class="bg-sky-600 hover:bg-sky-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md">Evolución de Saldo</button>
+                    <button id="btnShowInterestChart" class="bg-rose-600 hover:bg-rose-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md">Intereses Acumulados</button>
+                    <button id="btnExportExcel" class="bg-green-600 hover:bg-green-700 text-white font-semibold py-2 px-5 rounded-lg transition-all duration-200 shadow-md flex items-center gap-2">
+                        <svg xmlns="http://www.w3.org/2000/svg" class="h-5 w-5" viewBox="0 0 20 20" fill="currentColor"><path fill-rule="evenodd" d="M3 17a1 1 0 011-1h12a1 1 0 110 2H4a1 1 0 01-1-1zM6.293 6.707a1 1 0 010-1.414l3-3a1 1 0 011.414 0l3 3a1 1 0 01-1.414 1.414L11 5.414V13a1 1 0 11-2 0V5.414L7.707 6.707a1 1 0 01-1.414 0z" clip-rule="evenodd" /></svg>
+                        Exportar a Excel
+                    </button>
+                </div>
+
+                <div id="chartContainer" class="relative w-full mt-2 min-h-[300px] md:min-h-[400px]"></div>
+            </div>
+        `;
+        displayResults(htmlContent);
+        
+        document.getElementById('btnShowBalanceChart').addEventListener('click', () => renderComparisonChart('balance'));
+        document.getElementById('btnShowInterestChart').addEventListener('click', () => renderComparisonChart('interest'));
+        document.getElementById('btnExportExcel').addEventListener('click', handleExportToExcel);
+        
+        renderComparisonChart('balance');
+    }
+
+    async function handleComparison() {
+        const inputs = getInputs();
+        if (typeof inputs === 'string') { displayError(inputs); return; }
+        displayLoading();
+
+        // Las métricas llegan primero; las cuotas se agregan al gráfico a medida que llegan sus bloques.
+        fullScheduleData = null;
+        const scenarios = {};
+        try {
+            await streamFlow('comparison', loanPayload(inputs, true), record => {
+                if (record.type === 'metrics') {
+                    scenarios[record.scenario] = { metrics: record.metrics, schedule: [] };
+                    if (scenarios.no_prepayment && scenarios.prepayment) {
+                        fullScheduleData = scenarios;
+                        renderComparisonSummary(inputs);
+                    }
+                } else if (record.type === 'rows') {
+                    scenarios[record.scenario].schedule.push(...columnsToRows(record.schedule));
+                    updateComparisonChart();
+                }
+            });
+        } catch (error) {
+            fullScheduleData = null;
+            displayError(error.message);
+        }
     }
 
     function handleExportToExcel() {
         if (!fullScheduleData) { alert("Primero debes comparar los escenarios para generar los datos."); return; }
         try {
-            const wsNoPrepayment = XLSX.utils.json_to_sheet(fullScheduleData.noPrepayment.schedule);
+            const wsNoPrepayment = XLSX.utils.json_to_sheet(fullScheduleData.no_prepayment.schedule);
             const wsPrepayment = XLSX.utils.json_to_sheet(fullScheduleData.prepayment.schedule);
             const wb = XLSX.utils.book_new();
             XLSX.utils.book_append_sheet(wb, wsNoPrepayment, "Sin Prepago");
@@ -251,28 +260,37 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function comparisonSeries() {
+        // El servicio ya entrega el saldo y los intereses acumulados por cuota.
+        const column = chartType === 'balance' ? 'SALDO' : 'Acumulado de Interes';
+        const noPrepSchedule = fullScheduleData.no_prepayment.schedule;
+        const prepSchedule = fullScheduleData.prepayment.schedule;
+        return {
+            labels: Array.from({ length: Math.max(noPrepSchedule.length, prepSchedule.length) }, (_, i) => i + 1),
+            noPrepChartData: noPrepSchedule.map(d => d[column]),
+            prepChartData: prepSchedule.map(d => d[column])
+        };
+    }
+
+    function updateComparisonChart() {
+        if (!chartInstance || !fullScheduleData) return;
+        const { labels, noPrepChartData, prepChartData } = comparisonSeries();
+        chartInstance.data.labels = labels;
+        chartInstance.data.datasets[0].data = noPrepChartData;
+        chartInstance.data.datasets[1].data = prepChartData;
+        chartInstance.update('none');
+    }
+
     function renderComparisonChart(type) {
         const chartContainer = document.getElementById('chartContainer');
         if (!chartContainer || !fullScheduleData) return;
 
+        chartType = type;
         chartContainer.innerHTML = '<canvas id="comparisonChart"></canvas>';
         const ctx = document.getElementById('comparisonChart').getContext('2d');
         if (chartInstance) chartInstance.destroy();
 
-        const noPrepSchedule = fullScheduleData.noPrepayment.schedule;
-        const prepSchedule = fullScheduleData.prepayment.schedule;
-        
-        let noPrepChartData = noPrepSchedule.map(d => type === 'balance' ? parseFloat(d['Saldo Pendiente (UF)']) : parseFloat(d['Interés (UF)']));
-        let prepChartData = prepSchedule.map(d => type === 'balance' ? parseFloat(d['Saldo Pendiente (UF)']) : parseFloat(d['Interés (UF)']));
-        
-        if (type === 'interest') {
-            noPrepChartData = noPrepChartData.reduce((acc, val) => [...acc, (acc.length > 0 ? acc[acc.length - 1] : 0) + val], []);
-            prepChartData = prepChartData.reduce((acc, val) => [...acc, (acc.length > 0 ? acc[acc.length - 1] : 0) + val], []);
-        }
-
-        const labels = Array.from({ length: noPrepSchedule.length }, (_, i) => i + 1);
-        const dataPrepPadded = Array(noPrepSchedule.length).fill(null);
-        prepChartData.forEach((d, i) => { dataPrepPadded[i] = d; });
+        const { labels, noPrepChartData, prepChartData } = comparisonSeries();
 
         chartInstance = new Chart(ctx, {
             type: 'line',
@@ -286,7 +304,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     fill: true, tension: 0.1
                 }, {
                     label: 'Con Prepago',
-                    data: dataPrepPadded,
+                    data: prepChartData,
                     borderColor: 'rgba(16, 185, 129, 0.8)',
                     backgroundColor: 'rgba(16, 185, 129, 0.1)',
                     fill: true, tension: 0.1
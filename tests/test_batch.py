@@ -0,0 +1,57 @@
+"""Modo cartera: matrices por bloque contra `prepayment_plan` crédito a crédito."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_batch import SCHEDULE_COLUMNS, run_batch, simulate_portfolio, validate_loans
+from prepago_engine import prepayment_plan
+
+START_DATE = pd.Timestamp('2025-01-01')
+LOANS = pd.DataFrame({
+    'principal': [3000, 4800, 1500, 8000, 2500],
+    'annual_rate': [5.4, 4.1, 6.9, 3.2, 0.5],
+    'total_months': [300, 240, 120, 360, 180],
+    'start_date': [START_DATE] * 5,
+    'annual_limit': [100, 50, 400, 250, 60],
+    'frequency_months': [12, 6, 1, 4, 3]
+})
+TOLERANCE = 1e-3
+
+def plans():
+    return [prepayment_plan(*loan, START_DATE) for loan in
+            LOANS[['principal', 'annual_rate', 'total_months', 'annual_limit', 'frequency_months']].itertuples(index=False)]
+
+@pytest.mark.parametrize('chunk_size', [2, 5000])
+def test_batch_matches_prepayment_plan(chunk_size):
+    schedules, metrics = simulate_portfolio(LOANS, chunk_size=chunk_size, workers=1)
+    for row, (df, plan) in enumerate(plans()):
+        assert metrics['months_paid'][row] == len(df)
+        for column in SCHEDULE_COLUMNS:
+            assert np.abs(schedules[column][row, :len(df)] - df[column].to_numpy()).max() < TOLERANCE, column
+        for metric in ['months_saved', 'interest_saved', 'total_interest']:
+            assert metrics[metric][row] == pytest.approx(plan[metric], abs=TOLERANCE), metric
+
+def test_process_pool_matches_serial():
+    _, serial = simulate_portfolio(LOANS, chunk_size=2, workers=1, keep_schedules=False)
+    _, pooled = simulate_portfolio(LOANS, chunk_size=2, workers=2, keep_schedules=False)
+    for name, values in serial.items():
+        assert (np.asarray(pooled[name]) == np.asarray(values)).all(), name
+
+def test_run_batch_exports_metrics(tmp_path):
+    LOANS.to_csv(tmp_path / 'cartera.csv', index=False)
+    result, path, schedule_paths = run_batch(str(tmp_path / 'cartera.csv'), str(tmp_path / 'metricas.csv'), workers=1,
+                                             schedules_path=str(tmp_path / 'cronogramas.csv'))
+    exported = pd.read_csv(path)
+    assert len(exported) == len(LOANS)
+    assert (exported['months_saved'] == result['months_saved']).all()
+    assert len(pd.read_csv(schedule_paths[0])) == result['months_paid'].sum()
+
+@pytest.mark.parametrize('column, value', [('principal', 0), ('annual_rate', -1), ('total_months', 0),
+                                           ('annual_limit', -1), ('frequency_months', 13)])
+def test_validate_loans_rejects_invalid_values(column, value):
+    with pytest.raises(ValueError):
+        validate_loans(LOANS.assign(**{column: value}))
+    with pytest.raises(ValueError):
+        validate_loans(LOANS.drop(columns=column))
@@ -0,0 +1,28 @@
+"""Suite de benchmarks: paridad golden, línea base y detección de regresiones."""
+
+# Importaciones
+import pytest
+
+from prepago_bench import benchmark_cases, check_golden, compare_timings, load_baseline, run_benchmarks, save_baseline
+
+def test_golden_parity():
+    assert check_golden() == []
+
+@pytest.mark.parametrize('quick', [False, True])
+def test_every_case_has_a_baseline(quick):
+    baseline = load_baseline()
+    missing = [name for name, _ in benchmark_cases(quick) if name not in baseline]
+    assert missing == []
+
+def test_compare_timings_flags_regressions():
+    table = compare_timings({'a': 0.0013, 'b': 0.002, 'c': 0.001}, {'a': 0.001, 'b': 0.001})
+    assert table.set_index('benchmark')['regression'].to_dict() == {'a': False, 'b': True, 'c': False}
+
+def test_baseline_round_trip(tmp_path):
+    path = save_baseline({'a': 0.5}, str(tmp_path / 'baseline.json'))
+    assert load_baseline(path) == {'a': 0.5}
+    assert load_baseline(str(tmp_path / 'otra.json')) is None
+
+def test_run_benchmarks_filters_by_name():
+    timings = run_benchmarks(quick=True, pattern='french_amortization[scalar]', repeat=1)
+    assert list(timings) == ['french_amortization[scalar]'] and timings['french_amortization[scalar]'] > 0
@@ -0,0 +1,89 @@
+"""Motor de cronogramas: tramos en forma cerrada contra el recorrido mes a mes."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_engine import (generate_schedule, payment_dates, prepayment_plan, prepayment_result,
+                            schedule_result)
+from prepago_revC import validate_inputs
+
+START_DATE = pd.Timestamp('2025-01-01')
+
+def reference_schedule(principal, annual_rate, total_months, prepayments):
+    """Saldos de cierre e intereses totales recorriendo mes a mes, como el cronograma original."""
+    monthly_rate = calculate_monthly_rate(annual_rate)
+    payment = french_amortization(principal, monthly_rate, total_months)
+    balance, balances, total_interest = principal, [], 0
+    for month in range(total_months):
+        interest = balance * monthly_rate
+        total_interest += interest
+        prepayment = prepayments.get(month + 1, 0)
+        capital = payment - interest
+        if prepayment > 0:
+            balance -= prepayment
+            if balance > 0:
+                payment = french_amortization(balance, monthly_rate, total_months - month - 1)
+        balance -= capital
+        balances.append(max(balance, 0))
+        if balance <= 0:
+            break
+    return np.array(balances), total_interest
+
+@pytest.mark.parametrize('prepayments', [{}, {12: 100000}, {6: 50000, 30: 400000, 31: 20000}, {24: 5000000}])
+def test_generate_schedule_matches_monthly_recurrence(prepayments):
+    df, metrics = generate_schedule(3000000, 5.4, 120, prepayments, START_DATE)
+    balances, total_interest = reference_schedule(3000000, 5.4, 120, prepayments)
+
+    ordinary = df.drop_duplicates('NRO de cuota', keep='first')
+    assert len(ordinary) == len(balances)
+    assert np.abs(ordinary['SALDO'].to_numpy() - balances / 1000).max() < 1e-3
+    assert metrics['total_interest'] == pytest.approx(total_interest / 1000, abs=1e-3)
+    assert metrics['months_saved'] == 120 - len(balances)
+
+def test_prepayment_months_add_a_prepayment_row():
+    df, _ = generate_schedule(3000000, 5.4, 120, {12: 100000}, START_DATE)
+    rows = df[df['NRO de cuota'] == 12]
+    assert len(rows) == 2
+    assert rows['Amortizacion parcial'].iloc[1] == rows['TOTAL CUOTA mensual'].iloc[1] == 100
+    assert rows['INTERES parcial'].iloc[1] == 0
+
+def test_payment_dates_fall_on_the_tenth():
+    assert payment_dates(START_DATE, 3).strftime('%Y-%m-%d').tolist() == ['2025-01-10', '2025-02-10', '2025-03-10']
+    assert payment_dates(pd.Timestamp('2025-01-15'), 3).strftime('%Y-%m-%d').tolist() == [
+        '2025-02-10', '2025-02-10', '2025-03-10']
+
+@pytest.mark.parametrize('frequency', [6, 12])
+def test_prepayment_plan_prepays_the_annual_limit(frequency):
+    df, metrics = prepayment_plan(3000, 5.4, 300, 100, frequency, START_DATE)
+    prepaid = df.loc[df['Prepago'] > 0]
+    assert (prepaid['NRO de cuota'].iloc[:-1] % frequency == 0).all()
+    assert prepaid['Prepago'].iloc[:-1].sum() == pytest.approx(100 * len(prepaid.iloc[:-1]) * frequency / 12, abs=1e-2)
+    assert df['SALDO'].iloc[-1] == 0
+    assert metrics['months_saved'] > 0 and metrics['interest_saved'] > 0
+
+def test_schedule_result_matches_the_frames():
+    result = schedule_result(3000000, 5.4, 120, {12: 100000}, START_DATE)
+    df, metrics = generate_schedule(3000000, 5.4, 120, {12: 100000}, START_DATE)
+    pd.testing.assert_frame_equal(result.to_frame(), df)
+    assert result.metrics() == metrics
+
+    plan = prepayment_result(3000, 5.4, 300, 100, 12, START_DATE)
+    df, metrics = prepayment_plan(3000, 5.4, 300, 100, 12, START_DATE)
+    pd.testing.assert_frame_equal(plan.to_frame(), df)
+    assert plan.metrics() == metrics
+
+def test_schedule_result_columns_are_stored_arrays():
+    result = prepayment_result(3000, 5.4, 300, 100, 12, START_DATE)
+    assert result['SALDO'] is result.closing and len(result) == result['NRO de cuota'][-1]
+    assert (result.display('SALDO') == np.round(result.closing / 1000, 4)).all()
+    with pytest.raises(KeyError):
+        result['Saldo']
+
+@pytest.mark.parametrize('arguments', [(0, 5, 120), (3000, 0, 120), (3000, 5, 0), (3000, 5, 120, 'fecha'),
+                                       (3000, 5, 120, None, '12:0'), (3000, 5, 120, None, 'doce:10')])
+def test_validate_inputs_rejects_invalid_values(arguments):
+    with pytest.raises(ValueError):
+        validate_inputs(*arguments)
@@ -0,0 +1,58 @@
+"""Exportación por bloques: mismo contenido que pandas en cada formato y cronogramas de la cartera."""
+
+# Importaciones
+import pandas as pd
+import pytest
+
+from prepago_batch import export_portfolio_schedules, simulate_portfolio
+from prepago_engine import generate_schedule
+from prepago_export import export_frame, partition_path
+
+START_DATE = pd.Timestamp('2025-01-01')
+LOANS = pd.DataFrame({'principal': [3000, 4800, 1500], 'annual_rate': [5.4, 4.1, 6.9], 'total_months': [300, 240, 120],
+                      'start_date': [START_DATE] * 3, 'annual_limit': [100, 50, 400], 'frequency_months': [12, 6, 12]})
+
+@pytest.fixture(scope='module')
+def schedule():
+    return generate_schedule(3000000, 5.4, 300, {12: 100000}, START_DATE)[0]
+
+def test_csv_in_chunks_matches_pandas(schedule, tmp_path):
+    assert export_frame(schedule, tmp_path / 'cronograma.csv', rows=7) == len(schedule)
+    schedule.to_csv(tmp_path / 'pandas.csv', index=False)
+    assert (tmp_path / 'cronograma.csv').read_text(encoding='utf-8') == (tmp_path / 'pandas.csv').read_text(encoding='utf-8')
+
+@pytest.mark.parametrize('extension, module', [('.xlsx', 'openpyxl'), ('.parquet', 'pyarrow'), ('.arrow', 'pyarrow')])
+def test_binary_formats_round_trip(schedule, tmp_path, extension, module):
+    pytest.importorskip(module)
+    path = tmp_path / f'cronograma{extension}'
+    export_frame(schedule, path, rows=7)
+    readers = {'.xlsx': pd.read_excel, '.parquet': pd.read_parquet, '.arrow': pd.read_feather}
+    exported = readers[extension](path)
+    assert len(exported) == len(schedule)
+    assert (exported['SALDO'].to_numpy() == schedule['SALDO'].to_numpy()).all()
+
+def test_unknown_format_is_rejected(schedule, tmp_path):
+    with pytest.raises(ValueError):
+        export_frame(schedule, tmp_path / 'cronograma.txt')
+
+def test_portfolio_schedules_by_partition(tmp_path):
+    _, metrics = simulate_portfolio(LOANS, workers=1, keep_schedules=False)
+    paths, rows = export_portfolio_schedules(LOANS, str(tmp_path / 'cronogramas.csv'), chunk_size=1, partition=True)
+    assert paths == [partition_path(str(tmp_path / 'cronogramas.csv'), group) for group in ['f6', 'f12']]
+    assert rows == metrics['months_paid'].sum()
+    f12 = pd.read_csv(paths[1])
+    assert len(f12) == metrics['months_paid'][[0, 2]].sum()
+    assert (f12.groupby('loan_id')['NRO de cuota'].max().to_numpy() == metrics['months_paid'][[0, 2]]).all()
+
+@pytest.mark.parametrize('extension, module', [('.csv', None), ('.xlsx', 'openpyxl'), ('.parquet', 'pyarrow'),
+                                               ('.arrow', 'pyarrow')])
+def test_portfolio_schedules_keep_the_loan_ids(tmp_path, extension, module):
+    if module:
+        pytest.importorskip(module)
+    loans = LOANS.assign(loan_id=['A-17', 'B-99', 'C-03'])
+    _, metrics = simulate_portfolio(loans, workers=1, keep_schedules=False)
+    path = tmp_path / f'cronogramas{extension}'
+    export_portfolio_schedules(loans, str(path), chunk_size=2)
+    readers = {'.csv': pd.read_csv, '.xlsx': pd.read_excel, '.parquet': pd.read_parquet, '.arrow': pd.read_feather}
+    exported = readers[extension](path)
+    assert exported['loan_id'].value_counts().to_dict() == dict(zip(loans['loan_id'], metrics['months_paid']))
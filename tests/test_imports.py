@@ -0,0 +1,34 @@
+"""Arranque liviano: el núcleo y la línea de comandos no cargan NumPy, pandas ni matplotlib."""
+
+# Importaciones
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['numpy', 'pandas', 'matplotlib']
+
+def loaded_modules(statement):
+    """Módulos pesados cargados tras ejecutar `statement` en un intérprete nuevo."""
+    code = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return output.stdout.strip()
+
+@pytest.mark.parametrize('statement', ['import prepago_core', 'import prepago_revC',
+                                       'import prepago_revC; prepago_revC.build_parser().parse_args([])',
+                                       "import prepago_revC; hasattr(prepago_revC, 'no_existe')"])
+def test_startup_does_not_load_heavy_modules(statement):
+    assert loaded_modules(statement) == ''
+
+def test_compatibility_names_load_their_module():
+    import prepago_engine
+    import prepago_plots
+    import prepago_revC
+    assert prepago_revC.generate_schedule is prepago_engine.generate_schedule
+    assert prepago_revC.plot_summary is prepago_plots.plot_summary
+    assert prepago_revC.cached_prepayment_plan is prepago_engine.cached_prepayment_plan
+    assert all(hasattr(prepago_revC, name) for name in prepago_revC.LAZY_EXPORTS)
+    with pytest.raises(AttributeError):
+        prepago_revC.no_existe
@@ -0,0 +1,48 @@
+"""Motor Monte Carlo: caso determinista contra `prepayment_plan`, semillas y resumen."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_montecarlo import PERCENTILES, monte_carlo, simulate_paths
+from prepago_engine import prepayment_plan
+
+START_DATE = pd.Timestamp('2025-01-01')
+# Sin reajustes ni volatilidad, cada trayectoria es el plan de `prepayment_plan`
+DETERMINISTIC = {'fixed_months': 300, 'rate_volatility': 0, 'inflation_volatility': 0}
+
+@pytest.mark.parametrize('frequency', [1, 6, 12])
+def test_deterministic_paths_match_prepayment_plan(frequency):
+    metrics, mean_balance = simulate_paths(3000, 5.4, 300, 100, frequency, paths=3, model=DETERMINISTIC)
+    df, plan = prepayment_plan(3000, 5.4, 300, 100, frequency, START_DATE)
+    assert (metrics['months_saved'] == plan['months_saved']).all()
+    assert metrics['total_interest'] == pytest.approx(np.full(3, plan['total_interest']), abs=1e-3)
+    assert metrics['total_prepaid'] == pytest.approx(np.full(3, df['Prepago'].sum()), abs=1e-2)
+    assert np.abs(mean_balance[1, :len(df)] - df['SALDO'].to_numpy()).max() < 1e-3
+
+def test_same_seed_gives_same_paths():
+    first, _ = simulate_paths(3000, 5.4, 300, 100, 12, paths=50, model={'seed': 7})
+    second, _ = simulate_paths(3000, 5.4, 300, 100, 12, paths=50, model={'seed': 7})
+    other, _ = simulate_paths(3000, 5.4, 300, 100, 12, paths=50, model={'seed': 8})
+    assert all((first[name] == second[name]).all() for name in first)
+    assert (first['interest_saved'] != other['interest_saved']).any()
+
+def test_summary_in_batches():
+    summary, balance = monte_carlo(3000, 5.4, 300, 100, 12, paths=250, batch_paths=100, invest_rates=(3.0, 8.0))
+    assert balance.shape == (2, 300)
+    assert {'prepay_advantage_3', 'prepay_advantage_8', 'interest_saved', 'months_saved'} <= set(summary)
+    for stats in summary.values():
+        percentiles = [stats[f'p{q}'] for q in PERCENTILES]
+        assert percentiles == sorted(percentiles)
+    assert 0 <= summary['prepay_advantage_3']['prob_positive'] <= 1
+
+@pytest.mark.parametrize('simulate', [simulate_paths, monte_carlo])
+@pytest.mark.parametrize('annual_limit, frequency_months, paths, message', [
+    (100, 0, 2, 'frecuencia'),
+    (-100, 12, 2, 'negativo'),
+    (100, 12, 0, 'trayectorias')
+])
+def test_invalid_inputs_are_rejected(simulate, annual_limit, frequency_months, paths, message):
+    with pytest.raises(ValueError, match=message):
+        simulate(3000, 5.4, 300, annual_limit, frequency_months, paths=paths)
@@ -0,0 +1,45 @@
+"""Optimizador de estrategias: candidatos contra `prepayment_plan` y frente de Pareto."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_optimizer import optimize_prepayments
+from prepago_engine import prepayment_plan
+
+START_DATE = pd.Timestamp('2025-01-01')
+DIVISORS = [1, 2, 3, 4, 6, 12]
+
+def test_strategies_match_prepayment_plan():
+    ranking, _ = optimize_prepayments(3000, 5.4, 300, [50, 100, 200], DIVISORS, range(1, 13), workers=1)
+    assert len(ranking) == 3 * len(DIVISORS) * 12
+    # Con el primer prepago en el mes `frecuencia`, la estrategia es el plan de `prepayment_plan`
+    aligned = ranking[ranking['first_month'] == ranking['frequency_months']]
+    assert len(aligned) == 3 * len(DIVISORS)
+    for strategy in aligned.itertuples():
+        _, plan = prepayment_plan(3000, 5.4, 300, strategy.annual_limit, strategy.frequency_months, START_DATE)
+        assert strategy.months_saved == plan['months_saved']
+        assert strategy.interest_saved == pytest.approx(plan['interest_saved'], abs=1e-3)
+        assert strategy.total_interest == pytest.approx(plan['total_interest'], abs=1e-3)
+
+def test_pareto_front_is_not_dominated():
+    ranking, front = optimize_prepayments(3000, 5.4, 300, [50, 100, 200], DIVISORS, [1, 6, 12], workers=1)
+    assert front['total_prepaid'].is_monotonic_increasing
+    assert front['interest_saved'].is_monotonic_increasing
+    for strategy in ranking.itertuples():
+        dominated = ((front['total_prepaid'] <= strategy.total_prepaid)
+                     & (front['interest_saved'] > strategy.interest_saved)).any()
+        assert dominated != strategy.pareto
+
+@pytest.mark.parametrize('objective, column', [('interest_saved', 'interest_saved'),
+                                               ('months_per_uf', 'months_saved_per_uf')])
+def test_ranking_follows_the_objective(objective, column):
+    ranking, _ = optimize_prepayments(3000, 5.4, 300, [50, 100], [6, 12], [1, 12], objective=objective, workers=1)
+    assert (np.diff(ranking[column].to_numpy()) <= 1e-12).all()
+
+@pytest.mark.parametrize('arguments', [{'annual_limits': [0]}, {'frequencies': [13]}, {'first_months': [0, 400]},
+                                       {'objective': 'cuota'}])
+def test_invalid_grid_is_rejected(arguments):
+    with pytest.raises(ValueError):
+        optimize_prepayments(3000, 5.4, 300, **{'annual_limits': [100], 'workers': 1, **arguments})
@@ -0,0 +1,84 @@
+"""Paridad de los modos vectorizados (cartera, qué pasa si, solver, optimizador, almacén) con el motor base."""
+
+# Importaciones
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_batch import SCHEDULE_COLUMNS, simulate_portfolio
+from prepago_engine import generate_schedule, prepayment_plan
+from prepago_optimizer import optimize_prepayments
+from prepago_solver import payoff_month, plan_metrics
+from prepago_store import write_portfolio_store
+from prepago_whatif import IncrementalSchedule
+
+START_DATE = pd.Timestamp('2025-01-01')
+LOANS = pd.DataFrame({
+    'principal': [3000, 4800, 1500, 8000, 2500],
+    'annual_rate': [5.4, 4.1, 6.9, 3.2, 0.5],
+    'total_months': [300, 240, 120, 360, 180],
+    'start_date': [START_DATE] * 5,
+    'annual_limit': [100, 50, 400, 250, 60],
+    'frequency_months': [12, 6, 1, 7, 3]
+})
+TOLERANCE = 1e-3
+
+def plans():
+    return [prepayment_plan(*loan, START_DATE) for loan in
+            LOANS[['principal', 'annual_rate', 'total_months', 'annual_limit', 'frequency_months']].itertuples(index=False)]
+
+def test_batch_matches_prepayment_plan():
+    schedules, metrics = simulate_portfolio(LOANS, chunk_size=2, workers=1)
+    for row, (df, plan) in enumerate(plans()):
+        assert metrics['months_paid'][row] == len(df)
+        for column in SCHEDULE_COLUMNS:
+            assert np.abs(schedules[column][row, :len(df)] - df[column].to_numpy()).max() < TOLERANCE, column
+        for metric in ['months_saved', 'interest_saved', 'total_interest']:
+            assert metrics[metric][row] == pytest.approx(plan[metric], abs=TOLERANCE), metric
+
+def test_solver_matches_prepayment_plan():
+    loans = [LOANS[column].to_numpy() for column in ['principal', 'annual_rate', 'total_months', 'annual_limit',
+                                                       'frequency_months']]
+    metrics = plan_metrics(*loans)
+    months = payoff_month(*loans)
+    for row, (df, plan) in enumerate(plans()):
+        assert metrics['months_paid'][row] == months[row] == len(df)
+        assert metrics['total_interest'][row] == pytest.approx(plan['total_interest'], abs=TOLERANCE)
+        # Cada prepago del cronograma está redondeado a 4 decimales
+        assert metrics['total_prepaid'][row] == pytest.approx(df['Prepago'].sum(), abs=0.5e-4 * len(df))
+
+def test_optimizer_matches_prepayment_plan():
+    ranking, _ = optimize_prepayments(3000, 5.4, 300, [50, 100, 200], range(1, 13), range(1, 13), workers=1)
+    aligned = ranking[ranking['first_month'] == ranking['frequency_months']]
+    assert len(aligned) == 36
+    for strategy in aligned.itertuples():
+        _, plan = prepayment_plan(3000, 5.4, 300, strategy.annual_limit, strategy.frequency_months, START_DATE)
+        assert strategy.months_saved == plan['months_saved']
+        assert strategy.interest_saved == pytest.approx(plan['interest_saved'], abs=TOLERANCE)
+
+def test_whatif_matches_generate_schedule():
+    prepayments = {12: 100000, 30: 50000, 31: 20000}
+    schedule = IncrementalSchedule(3000, 5.4, 300, prepayments, START_DATE)
+    for edit in [{30: 0}, {12: 250000}, {200: 400000}, {5: 10000}]:
+        prepayments = {**prepayments, **edit}
+        schedule.set_prepayment(*next(iter(edit.items())))
+        df, metrics = schedule.to_frame()
+        expected_df, expected = generate_schedule(3000, 5.4, 300, prepayments, START_DATE)
+        pd.testing.assert_frame_equal(df, expected_df)
+        assert metrics == expected
+
+def test_store_matches_prepayment_plan(tmp_path):
+    store = write_portfolio_store(LOANS, str(tmp_path / 'store'), chunk_size=2)
+    for row, (df, _) in enumerate(plans()):
+        frame = store.to_frame(row)
+        assert (frame['FECHA A PAGAR'].to_numpy() == df['FECHA A PAGAR'].to_numpy()).all()
+        for column in SCHEDULE_COLUMNS:
+            assert np.abs(frame[column].to_numpy() - df[column].to_numpy()).max() < TOLERANCE, column
+
+def test_whatif_default_start_date_matches_generate_schedule():
+    df, _ = IncrementalSchedule(3000, 5.4, 120, {12: 100000}).to_frame()
+    # Como `validate_inputs`: sin fecha de inicio, el cronograma parte hoy
+    expected_df, _ = generate_schedule(3000, 5.4, 120, {12: 100000}, pd.Timestamp(datetime.now().date()))
+    pd.testing.assert_series_equal(df['FECHA A PAGAR'], expected_df['FECHA A PAGAR'])
@@ -0,0 +1,88 @@
+"""Gráficos: reducción de series, formatos de salida y renderizado en lote."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_batch import export_portfolio_plots
+from prepago_engine import generate_schedule, prepayment_plan
+from prepago_plots import (downsample, image_path, plot_comparison, plot_scenarios, plot_simulation,
+                           plot_summary, render_figures)
+
+START_DATE = pd.Timestamp('2025-01-01')
+PNG = b'\x89PNG'
+LEGEND_SERIES = 25  # Más que LEGEND_LIMIT: se dibuja con escala de color
+
+def test_menu_plots_write_png(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df_no_prepayment, _ = generate_schedule(3000000, 5.4, 120, None, START_DATE)
+    df_prepayment, _ = prepayment_plan(3000, 5.4, 120, 100, 12, START_DATE)
+    plot_summary(df_no_prepayment)
+    plot_simulation(df_prepayment)
+    plot_comparison(df_no_prepayment, df_prepayment)
+    for name in ['mortgage_summary.png', 'mortgage_simulation.png', 'mortgage_comparison.png']:
+        assert (tmp_path / name).read_bytes().startswith(PNG)
+
+def test_plot_path_sets_the_format(tmp_path):
+    df, _ = generate_schedule(3000000, 5.4, 120, None, START_DATE)
+    path = str(tmp_path / 'graficos' / 'resumen.svg')
+    assert plot_summary(df, path) == path
+    assert b'<svg' in (tmp_path / 'graficos' / 'resumen.svg').read_bytes()
+
+def test_image_path_rejects_unknown_format():
+    assert image_path('mortgage_summary', 'graficos', 'svg').endswith('mortgage_summary.svg')
+    with pytest.raises(ValueError, match='Formato de imagen inválido'):
+        image_path('mortgage_summary', None, 'gif')
+
+def test_downsample_keeps_short_series():
+    x, y = np.arange(10), np.linspace(5.0, 1.0, 10)
+    kept_x, kept_y = downsample(x, y)
+    assert np.array_equal(kept_x, x) and np.array_equal(kept_y, y)
+
+def test_downsample_bounds_points_and_keeps_extremes():
+    x = np.arange(100000)
+    y = np.sin(x / 700.0)
+    y[43210] = 9.0  # Un pico aislado debe seguir visible
+    y[77777] = -9.0
+    kept_x, kept_y = downsample(x, y, max_points=500)
+    assert len(kept_y) <= 500 + 2
+    assert kept_x[0] == 0 and kept_x[-1] == x[-1]
+    assert np.all(np.diff(kept_x) > 0)
+    assert kept_y.max() == 9.0 and kept_y.min() == -9.0
+    assert np.array_equal(y[kept_x], kept_y)
+
+def test_plot_scenarios_with_many_series(tmp_path):
+    months = np.arange(1, 241)
+    series = {f'escenario {i}': (months, np.linspace(3000 - i, 0, months.size)) for i in range(LEGEND_SERIES)}
+    path = plot_scenarios(series, str(tmp_path / 'escenarios.png'))
+    assert (tmp_path / 'escenarios.png').read_bytes().startswith(PNG)
+    assert path.endswith('escenarios.png')
+
+def test_render_figures_keeps_job_order(tmp_path):
+    months = np.arange(1, 61)
+    jobs = [('scenarios', ({i: (months, months * float(i))}, f'Escenario {i}'), str(tmp_path / f'g{i}.png'))
+            for i in range(3)]
+    assert render_figures(jobs, workers=2) == [job[2] for job in jobs]
+    for job in jobs:
+        assert open(job[2], 'rb').read().startswith(PNG)
+
+def test_render_figures_rejects_unknown_kind(tmp_path):
+    with pytest.raises(ValueError, match='Tipo de gráfico inválido'):
+        render_figures([('torta', (), str(tmp_path / 'g.png'))], workers=1)
+
+def test_export_portfolio_plots_names_files_by_loan_id(tmp_path):
+    loans = pd.DataFrame({
+        'loan_id': ['A-17', 'B-99', 'C-03'],
+        'principal': [3000.0, 2500.0, 4000.0],
+        'annual_rate': [5.4, 4.5, 6.0],
+        'total_months': [240, 180, 300],
+        'annual_limit': [100.0, 0.0, 250.0],
+        'frequency_months': [12, 6, 3],
+        'start_date': ['2025-01-01', None, '2024-06-15']
+    })
+    paths = export_portfolio_plots(loans, str(tmp_path), limit=2, workers=1)
+    names = sorted(p.split('/')[-1] for p in paths)
+    assert names == ['loan_A-17.png', 'loan_B-99.png', 'portfolio_balances.png']
+    for path in paths:
+        assert open(path, 'rb').read().startswith(PNG)
@@ -0,0 +1,51 @@
+"""Regla común del monto por prepago (`plan_prepayment`) en el motor, la cartera, el optimizador y el solver."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_batch import simulate_portfolio
+from prepago_core import plan_prepayment
+from prepago_engine import prepayment_plan
+from prepago_montecarlo import simulate_paths
+from prepago_optimizer import optimize_prepayments
+from prepago_solver import payoff_month, required_prepayment
+
+START_DATE = pd.Timestamp('2025-01-01')
+
+def test_plan_prepayment_matches_divisors_and_prorates_the_rest():
+    assert plan_prepayment(100.0, 6) == 100.0 / 2
+    assert plan_prepayment(100.0, 12) == 100.0
+    assert plan_prepayment(120.0, 7) == pytest.approx(70.0)
+    assert np.allclose(plan_prepayment(np.array([120.0, 120.0]), np.array([5, 7])), [50.0, 70.0])
+
+@pytest.mark.parametrize('frequency', [1, 5, 6, 7, 11, 12])
+def test_modes_agree_on_months_saved(frequency):
+    loans = pd.DataFrame({'principal': [3000], 'annual_rate': [5.4], 'total_months': [300], 'start_date': [START_DATE],
+                          'annual_limit': [100], 'frequency_months': [frequency]})
+    _, batch = simulate_portfolio(loans, workers=1, keep_schedules=False)
+    ranking, _ = optimize_prepayments(3000, 5.4, 300, [100], [frequency], [frequency], workers=1)
+    _, plan = prepayment_plan(3000, 5.4, 300, 100, frequency, START_DATE)
+    solver = 300 - int(payoff_month(3000, 5.4, 300, 100, frequency))
+
+    assert batch['months_saved'][0] == plan['months_saved'] == ranking['months_saved'][0] == solver
+
+@pytest.mark.parametrize('frequency', [5, 7, 11])
+def test_prepayments_stay_within_the_prorated_annual_limit(frequency):
+    df, _ = prepayment_plan(3000, 5.4, 300, 100, frequency, START_DATE)
+    prepaid = df['Prepago'].cumsum().to_numpy()
+    # Lo acumulado hasta la cuota m no supera m/12 años de límite (el cronograma redondea a 4 decimales)
+    assert (prepaid <= 100 * df['NRO de cuota'].to_numpy() / 12 + 0.01).all()
+
+def test_required_prepayment_is_annual_for_non_divisor_frequency():
+    limit = float(required_prepayment(3000, 5.4, 300, 7, 200))
+    assert payoff_month(3000, 5.4, 300, limit, 7) <= 200
+    assert payoff_month(3000, 5.4, 300, limit - 0.01, 7) > 200
+
+@pytest.mark.parametrize('frequency', [5, 7])
+def test_monte_carlo_without_resets_matches_the_plan(frequency):
+    model = {'fixed_months': 300, 'rate_volatility': 0, 'inflation_volatility': 0}
+    metrics, _ = simulate_paths(3000, 5.4, 300, 100, frequency, paths=2, model=model)
+    _, plan = prepayment_plan(3000, 5.4, 300, 100, frequency, START_DATE)
+    assert (metrics['months_saved'] == plan['months_saved']).all()
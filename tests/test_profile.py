@@ -0,0 +1,72 @@
+"""Instrumentación por etapas: registros anidados, formatos de salida y límite de registros."""
+
+# Importaciones
+import json
+
+import pytest
+
+import prepago_profile
+from prepago_profile import configure, stage, write_profile
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """Activar la instrumentación sin tracemalloc ni escritura al salir, con un límite pequeño."""
+    monkeypatch.setitem(prepago_profile._settings, 'path', str(tmp_path / 'perfil.json'))
+    monkeypatch.setattr(prepago_profile, '_records', prepago_profile.deque(maxlen=3))
+    monkeypatch.setattr(prepago_profile, '_counts', {'recorded': 0})
+    return tmp_path / 'perfil.json'
+
+def test_nested_stages_share_the_flow(profiling):
+    with stage('batch'):
+        with stage('load_loans') as record:
+            record['rows'] = 20
+    with pytest.raises(ValueError):
+        with stage('export', flow='menu'):
+            raise ValueError("fallo")
+    content = json.loads(open(write_profile(), encoding='utf-8').read())
+
+    stages = {record['name']: record for record in content['stages']}
+    assert stages['load_loans']['flow'] == 'batch' and stages['load_loans']['depth'] == 1
+    assert stages['load_loans']['rows'] == 20
+    assert stages['batch']['duration'] >= stages['load_loans']['duration']
+    assert stages['export']['flow'] == 'menu' and stages['export']['error'] == 'ValueError'
+
+def test_chrome_trace(profiling, monkeypatch):
+    monkeypatch.setitem(prepago_profile._settings, 'format', 'chrome')
+    with stage('schedule_frame') as record:
+        record['rows'] = 3
+    [event] = json.loads(open(write_profile(), encoding='utf-8').read())['traceEvents']
+    assert event['ph'] == 'X' and event['name'] == 'schedule_frame' and event['args']['rows'] == 3
+
+def test_disabled_stage_records_nothing():
+    assert not prepago_profile.enabled()
+    records = list(prepago_profile._records)
+    with stage('nada') as record:
+        record['rows'] = 1
+    assert list(prepago_profile._records) == records
+
+def test_disabled_stage_yields_a_fresh_record():
+    with stage('a') as first:
+        first['rows'] = 10
+    with stage('b') as second:
+        assert second == {}
+    assert first is not second
+
+@pytest.mark.parametrize('profile_format', ['json', 'chrome'])
+def test_records_are_capped(profiling, monkeypatch, profile_format):
+    monkeypatch.setitem(prepago_profile._settings, 'format', profile_format)
+    for index in range(5):
+        with stage(f'etapa {index}') as record:
+            record['rows'] = index
+    content = json.loads(open(write_profile(), encoding='utf-8').read())
+
+    if profile_format == 'json':
+        assert [record['name'] for record in content['stages']] == ['etapa 2', 'etapa 3', 'etapa 4']
+        assert content['dropped_stages'] == 2
+    else:
+        assert len(content['traceEvents']) == 3
+        assert content['otherData'] == {'dropped_stages': 2}
+
+def test_invalid_format_is_rejected():
+    with pytest.raises(ValueError):
+        configure('perfil.json', 'xml')
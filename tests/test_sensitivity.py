@@ -0,0 +1,49 @@
+"""Grilla de sensibilidad tasa × plazo × límite contra el motor de cronogramas."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_engine import generate_schedule, prepayment_plan
+from prepago_plots import plot_sensitivity
+from prepago_sensitivity import AXES, GRID_METRICS, grid_frame, sensitivity_grid
+
+START_DATE = pd.Timestamp('2025-01-01')
+RATES, TERMS, LIMITS = [3.0, 5.4], [120, 300], [0, 50, 200]
+
+@pytest.fixture(scope='module')
+def grid():
+    return sensitivity_grid(3000, RATES, TERMS, LIMITS, frequency_months=6)
+
+def test_cells_match_the_engine(grid):
+    for i, rate in enumerate(RATES):
+        for j, term in enumerate(TERMS):
+            _, baseline = generate_schedule(3000000, rate, term, None, START_DATE)
+            assert grid['baseline_interest'][i, j] == pytest.approx(baseline['total_interest'], abs=1e-3)
+            for k, limit in enumerate(LIMITS):
+                df, plan = prepayment_plan(3000, rate, term, limit, 6, START_DATE)
+                assert grid['months_saved'][i, j, k] == plan['months_saved']
+                assert grid['total_interest'][i, j, k] == pytest.approx(plan['total_interest'], abs=1e-3)
+                assert grid['total_prepaid'][i, j, k] == pytest.approx(df['Prepago'].sum(), abs=1e-2)
+
+def test_shapes_and_long_format(grid):
+    assert grid['monthly_payment'].shape == (2, 2)
+    assert grid['months_saved'].shape == (2, 2, 3)
+    assert (grid['months_saved'][:, :, 0] == 0).all()
+    assert np.abs(grid['interest_reduction'][:, :, 0]).max() < 1e-6
+    frame = grid_frame(grid)
+    assert len(frame) == 12 and list(frame.columns) == AXES + list(GRID_METRICS)
+    row = frame[(frame['annual_rate'] == 5.4) & (frame['total_months'] == 300) & (frame['annual_limit'] == 50)]
+    assert row['months_saved'].item() == grid['months_saved'][1, 1, 1]
+
+@pytest.mark.parametrize('arguments', [(0, RATES, TERMS, LIMITS), (3000, [], TERMS, LIMITS),
+                                       (3000, [0], TERMS, LIMITS), (3000, RATES, TERMS, [-1])])
+def test_invalid_grid_is_rejected(arguments):
+    with pytest.raises(ValueError):
+        sensitivity_grid(*arguments)
+
+@pytest.mark.parametrize('metric', ['monthly_payment', 'months_saved'])
+def test_heatmap_png(grid, tmp_path, metric):
+    path = plot_sensitivity(grid, metric, str(tmp_path / f'{metric}.png'))
+    assert open(path, 'rb').read(4) == b'\x89PNG'
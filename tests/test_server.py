@@ -0,0 +1,117 @@
+"""Servicio HTTP local: respuestas NDJSON por bloques, errores y caché compartida."""
+
+# Importaciones
+import asyncio
+import json
+from datetime import datetime
+
+import prepago_server
+from prepago_server import SharedResponse, handle_connection, produce_response, request_key, send_error
+
+REQUEST = {'principal': 3000, 'annual_rate': 5.4, 'total_months': 120, 'annual_limit': 100,
+           'frequency_months': 12, 'schedule': False}
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+def fake_today(day):
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromisoformat(day)
+    return FakeDatetime
+
+def post(flow, request):
+    """Enviar una solicitud al servicio en un puerto libre y devolver estado y registros NDJSON."""
+    async def exchange():
+        server = await asyncio.start_server(handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = json.dumps(request).encode('utf-8')
+            writer.write(b'POST /api/%s HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s'
+                         % (flow.encode(), len(body), body))
+            raw = await reader.read()
+            writer.close()
+        return raw
+    head, payload = asyncio.run(exchange()).split(b'\r\n\r\n', 1)
+    status = int(head.split(b' ', 2)[1])
+    if b'Transfer-Encoding: chunked' in head:
+        data = b''
+        while True:
+            size, _, payload = payload.partition(b'\r\n')
+            if int(size, 16) == 0:
+                break
+            data, payload = data + payload[:int(size, 16)], payload[int(size, 16) + 2:]
+        payload = data
+    return status, [json.loads(line) for line in payload.splitlines() if line.strip()]
+
+def test_stream_response_records():
+    status, records = post('prepayment_plan', {**REQUEST, 'start_date': '2025-01-01', 'schedule': True})
+    assert status == 200
+    assert records[0]['type'] == 'metrics'
+    assert records[-1] == {'type': 'end'}
+    assert sum(len(next(iter(record['schedule'].values()))) for record in records
+               if record['type'] == 'rows') == records[0]['rows']
+
+def test_comparison_interleaves_both_scenarios():
+    status, records = post('comparison', {**REQUEST, 'start_date': '2025-01-01', 'schedule': True})
+    assert status == 200
+    assert [record['scenario'] for record in records if record['type'] == 'metrics'] == ['no_prepayment', 'prepayment']
+    assert {record['scenario'] for record in records if record['type'] == 'rows'} == {'no_prepayment', 'prepayment'}
+
+def test_finished_responses_are_cached():
+    request = {**REQUEST, 'start_date': '2025-02-01'}
+    first = post('summary', request)
+    assert request_key('summary', request) in prepago_server._response_cache
+    assert post('summary', request) == first
+
+def test_error_responses():
+    assert post('unknown', REQUEST) == (404, [{'type': 'error', 'error': "Flujo inválido: 'unknown'. "
+                                                 "Use uno de: summary, prepayment_plan, comparison."}])
+    status, records = post('prepayment_plan', {key: value for key, value in REQUEST.items() if key != 'principal'})
+    assert status == 400 and records[0]['type'] == 'error'
+
+def test_request_key_resolves_default_start_date(monkeypatch):
+    monkeypatch.setattr(prepago_server, 'datetime', fake_today('2026-03-01T23:59:59'))
+    before = request_key('prepayment_plan', REQUEST)
+    monkeypatch.setattr(prepago_server, 'datetime', fake_today('2026-03-02T00:00:01'))
+    after = request_key('prepayment_plan', REQUEST)
+
+    assert before != after
+    assert after == request_key('prepayment_plan', {**REQUEST, 'start_date': '2026-03-02'})
+
+def test_send_error_body_ends_with_newline():
+    writer = FakeWriter()
+    asyncio.run(send_error(writer, 404, "Recurso no encontrado."))
+    body = writer.data.split(b'\r\n\r\n', 1)[1]
+
+    assert body.endswith(b'\n')
+    assert json.loads(body) == {'type': 'error', 'error': "Recurso no encontrado."}
+
+def test_failed_stream_closes_the_response(monkeypatch):
+    def broken(df):
+        raise RuntimeError("sin memoria")
+    monkeypatch.setattr(prepago_server, 'schedule_columns', broken)
+
+    async def produce():
+        response = SharedResponse()
+        await produce_response({**REQUEST, 'flow': 'prepayment_plan', 'start_date': '2025-01-01',
+                                'schedule': True}, response)
+        return response
+    response = asyncio.run(produce())
+
+    assert response.done and response.status == 500
+    records = [json.loads(chunk) for chunk in response.chunks]
+    assert records[0]['type'] == 'metrics'
+    assert records[-1] == {'type': 'error', 'error': "Error inesperado: sin memoria"}
@@ -0,0 +1,72 @@
+"""Solvers inversos: funciones de salto y planes contra el motor de cronogramas."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_core import calculate_monthly_rate, french_amortization
+from prepago_engine import generate_schedule, prepayment_plan
+from prepago_solver import (break_even_rate, loan_position, payoff_month, plan_metrics, required_frequency,
+                            required_prepayment)
+
+START_DATE = pd.Timestamp('2025-01-01')
+LOANS = {'principal': np.array([3000, 4800, 1500, 8000]), 'annual_rate': np.array([5.4, 4.1, 6.9, 3.2]),
+         'total_months': np.array([300, 240, 120, 360]), 'annual_limit': np.array([100, 50, 400, 250]),
+         'frequency_months': np.array([12, 6, 1, 3])}
+
+def test_loan_position_matches_the_schedule():
+    df, _ = generate_schedule(3000000, 5.4, 300, None, START_DATE)
+    paid_months = np.array([0, 1, 120, 299, 300])
+    position = loan_position(3000, 5.4, 300, paid_months)
+    balance = np.concatenate(([3000], df['SALDO'].to_numpy()))[paid_months]
+    interest = np.concatenate(([0], df['Acumulado de Interes'].to_numpy()))[paid_months]
+    assert np.abs(position['balance'] - balance).max() < 1e-3
+    assert np.abs(position['paid_interest'] - interest).max() < 1e-3
+    assert np.abs(position['paid_principal'] + position['balance'] - 3000).max() < 1e-6
+    assert (position['remaining_months'] == 300 - paid_months).all()
+    with pytest.raises(ValueError):
+        loan_position(3000, 5.4, 300, 301)
+
+def test_payoff_month_matches_prepayment_plan():
+    months = payoff_month(*LOANS.values())
+    for row in range(len(months)):
+        df, _ = prepayment_plan(*(values[row] for values in LOANS.values()), START_DATE)
+        assert months[row] == len(df)
+    assert payoff_month(3000, 5.4, 300, 0, 12) == 300
+
+def test_required_prepayment_is_the_minimum_limit():
+    limit = required_prepayment(3000, 5.4, 300, 12, np.array([120, 200, 300, 6]))
+    assert (payoff_month(3000, 5.4, 300, limit[:2], 12) <= [120, 200]).all()
+    assert (payoff_month(3000, 5.4, 300, limit[:2] - 0.01, 12) > [120, 200]).all()
+    assert limit[2] == 0 and np.isnan(limit[3])
+
+def test_required_frequency_is_the_largest_that_reaches_the_target():
+    frequency = int(required_frequency(3000, 5.4, 300, 200, 150))
+    assert payoff_month(3000, 5.4, 300, 200, frequency) <= 150
+    assert all(payoff_month(3000, 5.4, 300, 200, larger) > 150 for larger in range(frequency + 1, 13))
+    assert required_frequency(3000, 5.4, 300, 1, 24) == 0
+    with pytest.raises(ValueError):
+        required_frequency(3000, 5.4, 300, 200, 150, [0])
+
+def test_break_even_rate_equalizes_the_remaining_cost():
+    rate = float(break_even_rate(3000, 5.4, 300, 60, 50))
+    position = loan_position(3000, 5.4, 300, 60)
+    remaining = int(position['remaining_months'])
+    refinanced = remaining * french_amortization(position['balance'], calculate_monthly_rate(rate), remaining) + 50
+    assert refinanced == pytest.approx(remaining * position['monthly_payment'], rel=1e-9)
+    assert 0 < rate < 5.4
+    assert np.isnan(break_even_rate(3000, 5.4, 300, 60, 1e9))
+
+def test_invalid_frequency_is_rejected():
+    with pytest.raises(ValueError):
+        payoff_month(3000, 5.4, 300, 100, 13)
+
+def test_plan_metrics_match_prepayment_plan():
+    metrics = plan_metrics(*LOANS.values())
+    for row in range(len(metrics['months_paid'])):
+        df, plan = prepayment_plan(*(values[row] for values in LOANS.values()), START_DATE)
+        assert metrics['months_paid'][row] == len(df)
+        assert metrics['total_interest'][row] == pytest.approx(plan['total_interest'], abs=1e-3)
+        # Cada prepago del cronograma está redondeado a 4 decimales
+        assert metrics['total_prepaid'][row] == pytest.approx(df['Prepago'].sum(), abs=0.5e-4 * len(df))
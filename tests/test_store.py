@@ -0,0 +1,77 @@
+"""Almacén de resultados mapeado en memoria: cronogramas por crédito e índice por identificador."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepago_engine import prepayment_plan, prepayment_result
+from prepago_store import STORE_COLUMNS, open_store, save_results, write_portfolio_store
+
+START_DATE = pd.Timestamp('2025-01-01')
+LOANS = pd.DataFrame({
+    'loan_id': ['A-17', 'B-99', 'C-03', 'D-42'],
+    'principal': [3000, 4800, 1500, 8000],
+    'annual_rate': [5.4, 4.1, 6.9, 3.2],
+    'total_months': [300, 240, 120, 360],
+    'start_date': [START_DATE, START_DATE, pd.Timestamp('2024-06-15'), START_DATE],
+    'annual_limit': [100, 50, 400, 250],
+    'frequency_months': [12, 6, 1, 3]
+})
+
+def portfolio(loan_ids):
+    size = len(loan_ids)
+    return pd.DataFrame({'loan_id': loan_ids, 'principal': [3000] * size, 'annual_rate': [5.4] * size,
+                         'total_months': [120] * size, 'start_date': ['2025-01-01'] * size,
+                         'annual_limit': [100] * size, 'frequency_months': [12] * size})
+
+def test_store_matches_prepayment_plan(tmp_path):
+    write_portfolio_store(LOANS, str(tmp_path / 'store'), chunk_size=2)
+    store = open_store(str(tmp_path / 'store'))
+    assert len(store) == len(LOANS)
+    for loan in LOANS.itertuples(index=False):
+        df, _ = prepayment_plan(*loan[1:4], *loan[5:], loan.start_date)
+        frame = store.to_frame(loan.loan_id)
+        assert (frame['FECHA A PAGAR'].to_numpy() == df['FECHA A PAGAR'].to_numpy()).all()
+        for column in STORE_COLUMNS:
+            assert np.abs(frame[column].to_numpy() - df[column].to_numpy()).max() < 1e-3, column
+        assert store.value(loan.loan_id, 12) == pytest.approx(df['SALDO'].iloc[11], abs=1e-3)
+        assert store.loan(loan.loan_id).size == len(df)
+
+def test_month_views_and_errors(tmp_path):
+    store = write_portfolio_store(LOANS, str(tmp_path / 'store'))
+    assert store.month(1).shape == (len(LOANS),)
+    assert (store.month(store.meta['horizon']) == 0).all()
+    with pytest.raises(ValueError):
+        store.month(0)
+    with pytest.raises(KeyError):
+        store.column('Saldo')
+    with pytest.raises(KeyError):
+        store.row('Z-00')
+
+def test_save_results_keeps_internal_precision(tmp_path):
+    results = {7: prepayment_result(3000, 5.4, 300, 100, 12, START_DATE), 3: prepayment_result(1500, 6.9, 120, 400, 1)}
+    store = save_results(results, str(tmp_path / 'store'))
+    assert (store.loan(7) == results[7].closing / 1000).all()
+    assert store.to_frame(3)['FECHA A PAGAR'].isna().all()
+
+def test_string_keys_are_not_truncated(tmp_path):
+    store = write_portfolio_store(portfolio(['abc', 'xyz']), str(tmp_path / 'store'))
+    assert store.row('abc') == 0
+    with pytest.raises(KeyError):
+        store.row('abcd')
+    with pytest.raises(KeyError):
+        store.row('xyz-1')
+
+def test_integer_keys(tmp_path):
+    store = write_portfolio_store(portfolio([17, 4]), str(tmp_path / 'store'))
+    assert store.row(4) == store.row('4') == 1
+    for key in (17.5, '17.5', 'x', 5):
+        with pytest.raises(KeyError):
+            store.row(key)
+
+def test_default_ids_are_rows_and_must_be_unique(tmp_path):
+    store = write_portfolio_store(LOANS.drop(columns='loan_id'), str(tmp_path / 'store'))
+    assert store.row(2) == 2
+    with pytest.raises(ValueError):
+        write_portfolio_store(portfolio(['a', 'a']), str(tmp_path / 'duplicado'))
@@ -0,0 +1,52 @@
+"""Modo streaming NDJSON: una respuesta por solicitud, con errores por línea."""
+
+# Importaciones
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from prepago_engine import prepayment_plan
+from prepago_stream import process_stream, run_stream
+
+REQUEST = {'principal': 3000, 'annual_rate': 5.4, 'total_months': 300, 'annual_limit': 100,
+           'frequency_months': 12, 'start_date': '2025-01-01'}
+
+def responses(*requests):
+    lines = [request if isinstance(request, str) else json.dumps(request) for request in requests]
+    return [json.loads(line) for line in process_stream(lines)]
+
+def test_prepayment_plan_matches_the_engine():
+    [response] = responses({**REQUEST, 'id': 'a', 'flow': 'prepayment_plan', 'schedule': True})
+    df, metrics = prepayment_plan(3000, 5.4, 300, 100, 12, pd.Timestamp('2025-01-01'))
+    assert response['id'] == 'a' and response['rows'] == len(df)
+    assert response['metrics'] == metrics
+    assert response['schedule']['SALDO'] == df['SALDO'].tolist()
+    assert response['schedule']['FECHA A PAGAR'][0] == '2025-01-10'
+
+def test_flows_and_line_numbers():
+    summary, comparison = responses({**REQUEST, 'flow': 'summary'}, '   ', {**REQUEST, 'flow': 'comparison'})
+    assert summary['id'] == 1 and 'schedule' not in summary
+    # Las líneas vacías se omiten, pero el identificador por defecto sigue siendo el número de línea
+    assert comparison['id'] == 3 and set(comparison) >= {'no_prepayment', 'prepayment'}
+
+def test_errors_do_not_stop_the_stream():
+    missing, invalid_json, invalid_flow, valid = responses(
+        {'flow': 'summary', 'annual_rate': 5}, '{no es json', {**REQUEST, 'flow': 'otro'}, REQUEST)
+    assert missing['error'] == "Falta el campo 'principal'."
+    assert 'error' in invalid_json
+    assert invalid_flow['error'].startswith("Flujo inválido: 'otro'")
+    assert 'metrics' in valid
+
+def test_run_stream_writes_one_line_per_request():
+    output = io.StringIO()
+    run_stream(io.StringIO(json.dumps(REQUEST) + '\n\n' + json.dumps(REQUEST) + '\n'), output)
+    assert len(output.getvalue().splitlines()) == 2
+
+def test_summary_with_paid_months_reports_the_position():
+    [response] = responses({**REQUEST, 'flow': 'summary', 'paid_months': 120, 'schedule': True})
+    metrics, schedule = response['metrics'], response['schedule']
+    assert metrics['paid_months'] == 120
+    assert metrics['remaining_balance'] == pytest.approx(schedule['SALDO'][119], abs=1e-3)
+    assert metrics['paid_interest'] == pytest.approx(schedule['Acumulado de Interes'][119], abs=1e-3)
@@ -0,0 +1,94 @@
+"""Indexación UF: búsqueda por fecha, proyección y montos en pesos."""
+
+# Importaciones
+import numpy as np
+import pandas as pd
+import pytest
+
+import prepago_revC
+from prepago_batch import export_portfolio_schedules
+from prepago_engine import prepayment_plan
+from prepago_uf import _read_uf_series, add_clp_columns, load_uf_table, uf_table
+
+def test_lookup_uses_last_published_value_and_projects_after_the_series():
+    table = uf_table(['2025-01-01', '2025-01-03'], [100.0, 102.0], inflation=10)
+    values, projected = table.lookup(np.array(['2025-01-02', '2025-01-03', '2026-01-03'], dtype='datetime64[D]'))
+    assert values.tolist() == [100.0, 102.0, 112.2]
+    assert projected.tolist() == [False, False, True]
+    with pytest.raises(ValueError):
+        table.lookup(np.array(['2024-12-31'], dtype='datetime64[D]'))
+
+def test_backcast_discounts_dates_before_the_first_value():
+    table = uf_table(['2026-01-01'], [110.0], inflation=10, backcast=True)
+    values, projected = table.lookup(np.array(['2025-01-01', '2026-01-01'], dtype='datetime64[D]'))
+    assert values.tolist() == [100.0, 110.0]
+    assert projected.tolist() == [True, False]
+
+def test_uf_value_converts_loans_that_already_started(monkeypatch):
+    monkeypatch.setitem(prepago_revC.export_settings, 'uf_value', 39500.0)
+    monkeypatch.setitem(prepago_revC.export_settings, 'uf_path', None)
+    df, _ = prepayment_plan(3000, 5.4, 120, 100, 12, pd.Timestamp('2020-01-01'))
+    df = add_clp_columns(df, prepago_revC.uf_indexation())
+
+    past = df['FECHA A PAGAR'] < pd.Timestamp.now().normalize()
+    assert past.any() and df.loc[past, 'UF proyectada'].all()
+    assert (df.loc[past, 'VALOR UF'] < 39500).all()
+    assert df['VALOR UF'].is_monotonic_increasing
+    assert (df['TOTAL CUOTA CLP'] == np.round(df['TOTAL CUOTA mensual'] * df['VALOR UF'])).all()
+
+def test_uf_table_rejects_invalid_values():
+    with pytest.raises(ValueError, match='mayores a 0'):
+        uf_table(['2025-01-01'], [0.0])
+
+def test_load_uf_table_is_cached_while_the_file_does_not_change(tmp_path):
+    path = tmp_path / 'uf.csv'
+    pd.DataFrame({'date': ['2025-01-02', '2025-01-01'], 'uf': [38001.0, 38000.0]}).to_csv(path, index=False)
+    _read_uf_series.cache_clear()
+    first = load_uf_table(str(path), inflation=3)
+    second = load_uf_table(str(path), inflation=5)
+    assert _read_uf_series.cache_info().hits == 1
+    assert first.values.tolist() == [38000.0, 38001.0]
+    assert second.days is first.days and second.inflation == 5
+
+    pd.DataFrame({'fecha': ['2025-01-01'], 'uf': [38000.0]}).to_csv(tmp_path / 'mala.csv', index=False)
+    with pytest.raises(ValueError, match='Faltan columnas en la serie UF'):
+        load_uf_table(str(tmp_path / 'mala.csv'))
+
+def test_add_clp_columns_multiplies_each_amount_by_its_uf_value():
+    df, _ = prepayment_plan(3000, 5.4, 120, 100, 12, pd.Timestamp('2025-01-01'))
+    days = pd.date_range('2024-12-01', '2030-12-31')
+    table = uf_table(days, np.linspace(38000, 45000, len(days)))
+    df = add_clp_columns(df, table)
+
+    assert df['VALOR UF'].is_monotonic_increasing
+    assert df['UF proyectada'].any() and not df['UF proyectada'].all()
+    for clp_column, column in [('TOTAL CUOTA CLP', 'TOTAL CUOTA mensual'), ('INTERES CLP', 'INTERES parcial'),
+                               ('Prepago CLP', 'Prepago'), ('SALDO CLP', 'SALDO')]:
+        assert (df[clp_column] == np.round(df[column] * df['VALOR UF'])).all()
+
+def test_portfolio_schedules_in_pesos(tmp_path):
+    loans = pd.DataFrame({
+        'principal': [3000.0, 2500.0],
+        'annual_rate': [5.4, 4.5],
+        'total_months': [120, 60],
+        'annual_limit': [100.0, 0.0],
+        'frequency_months': [12, 6],
+        'start_date': ['2025-01-01', '2025-03-01']
+    })
+    table = uf_table(['2025-01-01'], [38000.0])
+    path = tmp_path / 'cronogramas.csv'
+    export_portfolio_schedules(loans, str(path), uf_table=table)
+    df = pd.read_csv(path)
+    payment = df['Amortizacion parcial'] + df['INTERES parcial']
+    assert (df['TOTAL CUOTA CLP'] - payment * df['VALOR UF']).abs().max() <= 0.5 + 1e-6
+    assert (df['SALDO CLP'] - df['SALDO'] * df['VALOR UF']).abs().max() <= 0.5 + 1e-6
+
+MONTECARLO = ['montecarlo', '--principal', '3000', '--rate', '5.4', '--months', '300', '--limit', '100']
+
+def test_uf_inflation_does_not_share_montecarlo_inflation():
+    args = prepago_revC.build_parser().parse_args(['--uf-inflation', '7', *MONTECARLO, '--inflation', '4'])
+    assert (args.uf_inflation, args.inflation) == (7, 4)
+    args = prepago_revC.build_parser().parse_args(['--uf-inflation', '7', *MONTECARLO])
+    assert (args.uf_inflation, args.inflation) == (7, 3)
+    with pytest.raises(SystemExit):
+        prepago_revC.build_parser().parse_args(['--inflation', '7', *MONTECARLO])
@@ -0,0 +1,54 @@
+"""Escenarios "qué pasa si": recálculo incremental y caché LRU de cronogramas."""
+
+# Importaciones
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from prepago_engine import _cached_schedule, cached_prepayment_plan, cached_schedule, generate_schedule
+from prepago_whatif import IncrementalSchedule
+
+START_DATE = pd.Timestamp('2025-01-01')
+
+def test_edits_match_generate_schedule():
+    prepayments = {12: 100000, 30: 50000, 31: 20000}
+    schedule = IncrementalSchedule(3000000, 5.4, 300, prepayments, START_DATE)
+    for period, amount in [(30, 0), (12, 250000), (200, 400000), (5, 10000)]:
+        prepayments = {**prepayments, period: amount}
+        schedule.set_prepayment(period, amount)
+        df, metrics = schedule.to_frame()
+        expected_df, expected = generate_schedule(3000000, 5.4, 300, prepayments, START_DATE)
+        pd.testing.assert_frame_equal(df, expected_df)
+        assert metrics == expected
+
+def test_only_months_after_the_edit_are_recomputed():
+    schedule = IncrementalSchedule(3000000, 5.4, 300, {12: 100000}, START_DATE)
+    schedule.set_prepayment(240, 50000)
+    assert schedule.recomputed_months == schedule.arrays['months'] - 239
+    assert schedule.update({12: 100000, 240: 50000}).recomputed_months == 0
+
+@pytest.mark.parametrize('period', [0, -3])
+def test_periods_start_at_one(period):
+    schedule = IncrementalSchedule(3000000, 5.4, 300, {12: 100000}, START_DATE)
+    with pytest.raises(ValueError, match='mayor a 0'):
+        schedule.set_prepayment(period, 50000)
+    assert schedule.prepayments == {12: 100000}
+    with pytest.raises(ValueError, match='mayor a 0'):
+        IncrementalSchedule(3000000, 5.4, 300, {period: 0}, START_DATE)
+
+def test_default_start_date_matches_generate_schedule():
+    df, _ = IncrementalSchedule(3000000, 5.4, 120, {12: 100000}).to_frame()
+    # Como `validate_inputs`: sin fecha de inicio, el cronograma parte hoy
+    expected_df, _ = generate_schedule(3000000, 5.4, 120, {12: 100000}, pd.Timestamp(datetime.now().date()))
+    pd.testing.assert_series_equal(df['FECHA A PAGAR'], expected_df['FECHA A PAGAR'])
+
+def test_cache_returns_independent_copies():
+    _cached_schedule.cache_clear()
+    first, _ = cached_schedule(3000000, 5.4, 120, {12: 100000}, START_DATE)
+    first['SALDO'] = 0
+    second, metrics = cached_schedule(3000000.0, 5.4, 120, {12: 100000.0, 24: 0}, START_DATE)
+    assert _cached_schedule.cache_info().hits == 1
+    pd.testing.assert_frame_equal(second, generate_schedule(3000000, 5.4, 120, {12: 100000}, START_DATE)[0])
+    df, plan = cached_prepayment_plan(3000, 5.4, 300, 100, 12, START_DATE)
+    assert plan['months_saved'] > 0 and len(df) > 0